@@ -0,0 +1,4 @@
+import os
+
+# The widgets import qtpy, run them without a display
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from scipy import ndimage
+
+from tomobase.data import Sinogram, alignment
+
+
+def _sinogram(n: int = 4) -> Sinogram:
+    data = np.random.default_rng(0).random((n, 16, 16))
+    return Sinogram(data, np.linspace(-60, 60, n))
+
+
+def _eager(data, matrices):
+    return np.stack([ndimage.affine_transform(p, m, order=1, mode='constant') for p, m in zip(data, matrices)])
+
+
+def test_shift_matches_ndimage():
+    sino = _sinogram()
+    shifts = np.array([[0.5, -1.25], [2, 0], [0, 0], [-3, 1.5]])
+    result = alignment.resample(sino.data, alignment.shift_matrices(shifts))
+    expected = np.stack([ndimage.shift(p, s, order=1, mode='constant') for p, s in zip(sino.data, shifts)])
+    np.testing.assert_allclose(result, expected, atol=1e-12)
+
+
+def test_rotation_matches_ndimage():
+    sino = _sinogram()
+    angles = np.array([0, 10, -35, 60])
+    result = alignment.resample(sino.data, alignment.rotation_matrices(angles, sino.data.shape))
+    expected = np.stack([ndimage.rotate(p, a, reshape=False, order=1, mode='constant')
+                         for p, a in zip(sino.data, angles)])
+    np.testing.assert_allclose(result, expected, atol=1e-6)
+
+
+def test_deferred_equals_eager():
+    # Integer shifts and quarter turns, rounded to whole numbers, sample the pixel grid exactly, so two passes
+    # equal one pass
+    sino = _sinogram()
+    shifts = alignment.shift_matrices([[1, -2], [0, 3], [2, 2], [-1, 0]])
+    rotations = np.round(alignment.rotation_matrices([90, 0, -90, 180], sino.data.shape), 9)
+    expected = _eager(_eager(sino.data, shifts), rotations)
+
+    sino.add_transforms(shifts)
+    sino.add_transforms(rotations)
+    assert sino.has_pending_transforms
+    np.testing.assert_allclose(sino.aligned_data(), expected, atol=1e-9)
+    sino.apply_transforms()
+    assert not sino.has_pending_transforms
+    np.testing.assert_allclose(sino.data, expected, atol=1e-9)
+
+
+@pytest.mark.parametrize('deferred', [True, False])
+def test_composition_is_one_pass(deferred):
+    # Fractional transforms differ from resampling twice, the composite is a single interpolation of the raw data
+    sino = _sinogram()
+    first = alignment.shift_matrices(np.full((4, 2), 0.5))
+    second = alignment.rotation_matrices(np.full(4, 12.0), sino.data.shape)
+    expected = _eager(sino.data, alignment.compose(first, second))
+    if deferred:
+        sino.add_transforms(first)
+        np.testing.assert_allclose(sino.aligned_data(second), expected)
+    else:
+        sino.add_transforms(alignment.compose(first, second))
+        sino.apply_transforms()
+        np.testing.assert_allclose(sino.data, expected)
+
+
+def test_aligned_data_leaves_the_sinogram():
+    sino = _sinogram()
+    raw = sino.data.copy()
+    sino.add_transforms(alignment.shift_matrices(np.ones((4, 2))))
+    sino.aligned_data()
+    np.testing.assert_array_equal(sino.data, raw)
+    assert sino.has_pending_transforms
+
+
+def test_select_keeps_pending_transforms():
+    sino = _sinogram()
+    sino.add_transforms(alignment.shift_matrices([[1, 0], [2, 0], [3, 0], [4, 0]]))
+    selection = sino.select(indices=slice(1, 3))
+    np.testing.assert_array_equal(selection.transforms[:, 0, 2], [-2, -3])
+    np.testing.assert_allclose(selection.aligned_data(), sino.aligned_data()[1:3])
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from tomobase import cache
+from tomobase.data import Volume, Sinogram
+from tomobase.hooks import tomobase_hook_process
+from tomobase.registrations.transforms import TOMOBASE_TRANSFORM_CATEGORIES
+
+CATEGORY = TOMOBASE_TRANSFORM_CATEGORIES.IMAGE_PROCESSING.value
+calls = []
+
+
+@tomobase_hook_process(category=CATEGORY)
+def offset(volume: Volume, value: float = 1.0):
+    calls.append('offset')
+    volume.data = volume.data + value
+    return volume
+
+
+@tomobase_hook_process(category=CATEGORY, cacheable=False)
+def noise(volume: Volume):
+    calls.append('noise')
+    volume.data = volume.data + np.random.random(volume.data.shape)
+    return volume
+
+
+@pytest.fixture
+def store(tmp_path):
+    calls.clear()
+    with cache.caching(str(tmp_path)) as store:
+        yield store
+
+
+def _volume() -> Volume:
+    return Volume(np.arange(24, dtype=np.float32).reshape(2, 3, 4))
+
+
+def test_hit_restores_an_equal_result(store):
+    first = offset(_volume(), 2.0, inplace=False)
+    second = offset(_volume(), 2.0, inplace=False)
+    assert calls == ['offset']
+    np.testing.assert_array_equal(second.data, first.data)
+    assert second.data.flags.writeable
+
+    offset(_volume(), 3.0, inplace=False)
+    assert calls == ['offset', 'offset']
+
+
+def test_inplace_hit_updates_the_input(store):
+    offset(_volume(), 2.0)
+    volume = _volume()
+    result = offset(volume, 2.0)
+    assert calls == ['offset']
+    assert result is volume
+    np.testing.assert_array_equal(volume.data, np.arange(24).reshape(2, 3, 4) + 2)
+
+
+def test_uncacheable_processes_always_run(store):
+    first = noise(_volume(), inplace=False)
+    second = noise(_volume(), inplace=False)
+    assert calls == ['noise', 'noise']
+    assert not np.array_equal(first.data, second.data)
+    assert store.size() == 0
+
+
+def test_disabled():
+    calls.clear()
+    offset(_volume(), inplace=False)
+    offset(_volume(), inplace=False)
+    assert calls == ['offset', 'offset']
+
+
+def test_key_ignores_spare_capacity(store):
+    data = np.ones((3, 4, 4), dtype=np.float32)
+    grown = Sinogram(data.copy(), np.arange(3.0))
+    grown.reserve(10)
+    plain = Sinogram(data.copy(), np.arange(3.0))
+    assert store.key(offset, (), {'sino': grown}) == store.key(offset, (), {'sino': plain})
+    grown.insert(np.ones((4, 4), dtype=np.float32), 3.0)
+    assert store.key(offset, (), {'sino': grown}) != store.key(offset, (), {'sino': plain})
+
+
+def test_eviction_respects_the_size_limit(tmp_path):
+    store = cache.ResultCache(str(tmp_path), max_size=3 * 2**12)
+    payload = np.zeros(2**12 - 256, dtype=np.uint8)
+    for i in range(5):
+        store.put(f'entry{i}', {'results': payload, 'alias': None})
+    assert store.size() <= store.max_size
+    assert store.get('entry4') is not None
+    assert store.get('entry0') is None
+
+    # Reading an entry marks it as the most recently used
+    assert store.get('entry2') is not None
+    store.put('entry5', {'results': payload, 'alias': None})
+    assert store.get('entry2') is not None
@@ -0,0 +1,55 @@
+import types
+
+import numpy as np
+import pytest
+
+from tomobase.registrations.environment import xp, BackendProxy, GPUContext
+
+
+@pytest.fixture
+def fake_backend():
+    # A stand-in array module, switched to the way set_context switches to cupy
+    module = types.SimpleNamespace(zeros=lambda shape: 'fake zeros', ndarray=object)
+    modules = dict(xp._modules)
+    xp._set_modules(xupy=lambda: module)
+    yield module
+    xp._set_modules(**modules)
+
+
+def test_attributes_are_resolved_once():
+    assert xp.xupy.zeros is np.zeros
+    assert 'zeros' in xp.xupy.__dict__
+    ndimage = xp.scipy.ndimage
+    assert isinstance(ndimage, BackendProxy)
+    assert xp.scipy.ndimage is ndimage
+
+
+def test_switch_clears_resolved_attributes(fake_backend):
+    assert xp.xupy.zeros((2,)) == 'fake zeros'
+    assert xp.backend().xupy is fake_backend
+
+
+def test_switch_back_restores_numpy():
+    resolved = xp.xupy.zeros
+    module = types.SimpleNamespace(zeros=None)
+    modules = dict(xp._modules)
+    xp._set_modules(xupy=lambda: module)
+    assert xp.xupy.zeros is None
+    xp._set_modules(**modules)
+    assert xp.xupy.zeros is resolved is np.zeros
+    assert xp.backend().xupy is np
+
+
+def test_nested_proxies_are_cleared():
+    filters = xp.scipy.ndimage.gaussian_filter
+    xp.scipy.ndimage.__dict__['gaussian_filter'] = 'stale'
+    BackendProxy.invalidate()
+    assert xp.scipy.ndimage.gaussian_filter is filters
+
+
+def test_same_context_keeps_resolved_attributes():
+    xp.xupy.zeros
+    backend = xp.backend()
+    xp.set_context(GPUContext.NUMPY, 0)
+    assert 'zeros' in xp.xupy.__dict__
+    assert xp.backend() is backend
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from tomobase.data import Volume
+from tomobase.hooks import tomobase_hook_process
+from tomobase.registrations.transforms import TOMOBASE_TRANSFORM_CATEGORIES
+
+CATEGORY = TOMOBASE_TRANSFORM_CATEGORIES.IMAGE_PROCESSING.value
+
+
+@tomobase_hook_process(category=CATEGORY, cacheable=False)
+def scale(volume: Volume, factor: float = 2.0):
+    volume.ensure_writable()
+    volume.data *= factor
+    return volume
+
+
+@tomobase_hook_process(category=CATEGORY, cacheable=False)
+def unchanged(volume: Volume):
+    return volume
+
+
+@tomobase_hook_process(category=CATEGORY, cacheable=False)
+def careless(volume: Volume):
+    # Writes in-place without ensure_writable
+    volume.data[0, 0, 0] = -1
+    return volume
+
+
+def _volume() -> Volume:
+    return Volume(np.arange(24, dtype=np.float32).reshape(2, 3, 4))
+
+
+def test_inplace_false_leaves_the_input():
+    volume = _volume()
+    original = volume.data
+    result = scale(volume, inplace=False)
+    np.testing.assert_array_equal(volume.data, np.arange(24).reshape(2, 3, 4))
+    assert volume.data is original
+    np.testing.assert_array_equal(result.data, 2 * original)
+    assert result.data.flags.writeable
+    assert not np.shares_memory(result.data, original)
+
+
+def test_inplace_true_changes_the_input():
+    volume = _volume()
+    result = scale(volume)
+    assert result is volume
+    np.testing.assert_array_equal(volume.data, 2 * np.arange(24).reshape(2, 3, 4))
+
+
+def test_unchanged_result_is_detached():
+    volume = _volume()
+    result = unchanged(volume, inplace=False)
+    assert result is not volume
+    assert result.data.flags.writeable
+    assert not np.shares_memory(result.data, volume.data)
+    result.data[0, 0, 0] = 100
+    assert volume.data[0, 0, 0] == 0
+
+
+def test_writing_to_the_shared_data_raises():
+    volume = _volume()
+    with pytest.raises(ValueError, match='read-only'):
+        careless(volume, inplace=False)
+    assert volume.data[0, 0, 0] == 0
+    # In-place calls own their data
+    careless(volume)
+    assert volume.data[0, 0, 0] == -1
@@ -0,0 +1,23 @@
+import subprocess
+import sys
+
+MODULES = ('tomobase', 'tomobase.data', 'tomobase.processes', 'tomobase.globals')
+# The modules take about 0.1 s to import, mostly numpy, and took about 0.7 s when every backend was imported
+# eagerly. The budget leaves room for slow machines
+BUDGET = 0.3
+HEAVY = ('astra', 'cupy', 'qtpy', 'pandas', 'h5py', 'mrcz', 'plotly', 'magicgui')
+
+
+def _python(code: str) -> str:
+    return subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+
+
+def test_import_time():
+    code = f"import time; start = time.perf_counter(); import {', '.join(MODULES)}; print(time.perf_counter() - start)"
+    # The fastest of a few runs, the first run may also compile the sources
+    assert min(float(_python(code)) for _ in range(3)) < BUDGET
+
+
+def test_imports_are_lazy():
+    code = f"import sys, {', '.join(MODULES)}; print(*(m for m in {HEAVY!r} if m in sys.modules))"
+    assert _python(code).split() == []
@@ -0,0 +1,56 @@
+from tomobase.registrations.base import ItemDictNonSingleton
+
+
+def _consistent(items: ItemDictNonSingleton):
+    # loc and key agree with a linear scan for the values of every item
+    for key, item in items.items():
+        first = next(k for k, i in items.items() if i.value == item.value)
+        assert items.key(item.value) == first
+        assert items.loc(item.value) is items[first]
+
+
+def test_register():
+    items = ItemDictNonSingleton()
+    assert items.register('Bin Data', 'bin').name == 'Bin Data'
+    assert 'bin data' in items and 'BIN_DATA' in items
+    assert items.register('Bin Data', 'other').value == 'bin'
+    assert items.key('bin') == 'BIN_DATA'
+    _consistent(items)
+
+
+def test_delete_and_register_again():
+    items = ItemDictNonSingleton()
+    items.append({'Bin Data': 'bin', 'Crop': 'crop'}, Pad='pad')
+    del items['Crop']
+    assert 'Crop' not in items
+    assert items.key('crop') is None and items.loc('crop') is None
+    items.register('Crop Data', 'crop')
+    assert items.key('crop') == 'CROP_DATA'
+    _consistent(items)
+
+
+def test_remove_keeps_duplicate_values():
+    items = ItemDictNonSingleton()
+    items.append({'A': 1, 'B': 1, 'C': 2})
+    assert items.key(1) == 'A'
+    items.remove('A')
+    items.remove('Unknown')
+    assert items.key(1) == 'B'
+    _consistent(items)
+
+
+def test_value_changed_in_place():
+    items = ItemDictNonSingleton()
+    items.append({'A': 1, 'B': 2})
+    items['A'].value = 3
+    assert items.key(3) == 'A'
+    assert items.key(1) is None
+    _consistent(items)
+
+
+def test_default_values_are_indices():
+    items = ItemDictNonSingleton()
+    items.register('First')
+    items.register('Second')
+    assert items.key(0) == 'FIRST' and items.key(1) == 'SECOND'
+    _consistent(items)
@@ -0,0 +1,74 @@
+import os
+import inspect
+import importlib
+
+import pytest
+
+import tomobase
+from tomobase.registrations.base import ItemDictNonSingleton
+from tomobase.registrations.manifest import build_manifest, load_manifest, LazyHook
+
+ROOT = os.path.dirname(tomobase.__file__)
+FOLDERS = [('processes', 'is_tomobase_process'),
+           ('phantoms', 'is_tomobase_phantom'),
+           ('tiltschemes', 'is_tomobase_tiltscheme')]
+
+
+def _modules(folder: str) -> list:
+    return sorted({entry['module'] for entry in build_manifest('tomobase', folder, ROOT)})
+
+
+def _describe(module: str, attribute: str, obj) -> tuple:
+    category = getattr(obj, 'tomobase_category', None)
+    subcategories = getattr(obj, 'tomobase_subcategories', None)
+    return (module, attribute, obj.tomobase_name, category, None if subcategories is None else tuple(subcategories))
+
+
+def _imported(module_name: str, hook: str) -> set:
+    # The hooks found by importing the module and inspecting its members, as the registries did before the manifest
+    module = importlib.import_module(module_name)
+    return {_describe(module_name, name, obj) for name, obj in inspect.getmembers(module)
+            if (inspect.isclass(obj) or inspect.isfunction(obj)) and hasattr(obj, hook) and obj.__module__ == module_name}
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.parametrize('folder, hook', FOLDERS)
+def test_manifest_matches_import(folder, hook):
+    expected, found = set(), set()
+    for module in _modules(folder):
+        expected |= _imported(module, hook)
+
+    for entry in load_manifest('tomobase', folder, ROOT):
+        if entry.get('dynamic', False):
+            found |= _imported(entry['module'], hook)
+        elif entry['hook'] == hook:
+            found.add(_describe(entry['module'], entry['attribute'], LazyHook(entry)))
+    assert found == expected
+
+
+@pytest.mark.parametrize('folder, hook', FOLDERS)
+def test_registry_matches_import(folder, hook):
+    registry = ItemDictNonSingleton()
+    registry._folder, registry._hook = folder, hook
+    registry.update()
+
+    expected = set()
+    for module in _modules(folder):
+        expected |= {name for _, _, name, _, _ in _imported(module, hook)}
+    assert {item.name for item in registry._dict.values()} == expected
+    # Every proxy resolves to the object it describes
+    for item in registry._dict.values():
+        if isinstance(item.value, LazyHook):
+            assert item.value.load().tomobase_name == item.name
+
+
+def test_manifest_is_cached(cache):
+    entries = load_manifest('tomobase', 'phantoms', ROOT)
+    cached = os.listdir(os.path.join(cache, 'tomobase', 'registry'))
+    assert len(cached) == 1
+    assert load_manifest('tomobase', 'phantoms', ROOT) == entries
@@ -0,0 +1,46 @@
+import numpy as np
+
+from tomobase.data import Sinogram
+from tomobase.pipeline import Pipeline
+from tomobase.processes.image_processing.scaling import normalize
+from tomobase.processes.image_processing.misalignments import poisson_noise
+from tomobase.processes.image_processing.background import background_subtract_median
+
+
+def _sinogram(n: int = 6) -> Sinogram:
+    data = np.random.default_rng(0).random((n, 8, 8)) * 5 + 2
+    return Sinogram(data, np.linspace(-60, 60, n))
+
+
+def _pipeline(slab_size: int) -> Pipeline:
+    pipe = Pipeline(slab_size=slab_size)
+    pipe.add('Normalize')
+    pipe.add(background_subtract_median)
+    pipe.add('poisson_noise', rescale=100)
+    return pipe
+
+
+def test_fused_equals_steps():
+    sino = _sinogram()
+    np.random.seed(0)
+    expected = poisson_noise(background_subtract_median(normalize(sino, inplace=False)), rescale=100)
+    for slab_size in (2**20, 2 * 8 * 8 * 8):
+        np.random.seed(0)
+        result = _pipeline(slab_size).run(sino)
+        np.testing.assert_array_equal(result.data, expected.data)
+
+
+def test_input_is_unchanged():
+    sino = _sinogram()
+    original = sino.data.copy()
+    sino.add_transforms(np.tile(np.eye(3), (len(sino.angles), 1, 1)))
+    _pipeline(2**20).run(sino)
+    np.testing.assert_array_equal(sino.data, original)
+    assert sino.transforms is not None
+
+
+def test_empty_data():
+    sino = Sinogram(np.zeros((0, 8, 8)), np.zeros(0))
+    pipe = Pipeline()
+    pipe.add('poisson_noise', rescale=100)
+    assert pipe.run(sino).data.shape == (0, 8, 8)
@@ -0,0 +1,142 @@
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from tomobase import planner
+from tomobase.data import Volume, Sinogram
+from tomobase.registrations.environment import xp
+from tomobase.phantoms.nanorod import get_nanorod
+from tomobase.processes.quantification.properties import surface_area, _surface_area_memory
+from tomobase.processes.deformations.beamdamage import beamdamage, _beamdamage_memory
+from tomobase.processes.reconstruct import astra_reconstruct
+
+
+def _sphere(dim: int = 32, radius: float = 10) -> np.ndarray:
+    y, x, z = np.indices((dim, dim, dim)) - dim / 2
+    return (x**2 + y**2 + z**2 <= radius**2).astype(np.float32)
+
+
+def _slabbed():
+    # Records whether a call was split into slabs
+    return mock.patch.object(planner.logger, 'info')
+
+
+def test_parse_size():
+    assert planner.parse_size('512M') == 512 * 2**20
+    assert planner.parse_size('1.5kb') == 1536
+    assert planner.parse_size(None) is None
+    with pytest.raises(ValueError):
+        planner.parse_size('lots')
+
+
+def test_budget_is_restored():
+    previous = planner.get_budget()
+    with planner.budget('1G'):
+        assert planner.get_budget() == 2**30
+    assert planner.get_budget() == previous
+
+
+@pytest.mark.parametrize('halo', [0, 1, 3])
+def test_slabs_cover_the_data(halo):
+    data = np.arange(20 * 4 * 4, dtype=np.float32).reshape(20, 4, 4)
+    covered = np.zeros(data.shape[0], dtype=int)
+    with planner.budget(2 * data.nbytes):
+        for block, inner, region in planner.slabs(data, lambda shape, dtype: 4 * int(np.prod(shape)), halo=halo):
+            np.testing.assert_array_equal(block[inner], data[region])
+            covered[region[0]] += 1
+    np.testing.assert_array_equal(covered, 1)
+
+
+@pytest.mark.parametrize('planes', [1, 4, 10])
+def test_map_slabs_matches_whole(planes):
+    data = np.random.default_rng(0).random((32, 16, 16)).astype(np.float32)
+    def smooth(block):
+        return xp.scipy.ndimage.gaussian_filter(block, 1, truncate=3)
+    memory = lambda shape, dtype: 8 * int(np.prod(shape))
+
+    expected = smooth(data)
+    # The input and the output are resident, slabs of planes with a halo of 3 fit the rest
+    budget = 2 * data.nbytes + memory((planes + 6, 16, 16), data.dtype)
+    with _slabbed() as info, planner.budget(budget):
+        result = planner.map_slabs(smooth, data, memory, halo=3)
+    assert info.called
+    np.testing.assert_allclose(result, expected, rtol=1e-6)
+
+
+@pytest.mark.parametrize('planes', [1, 5, 12])
+def test_surface_area_in_slabs(planes):
+    volume = Volume(_sphere())
+    expected = surface_area(volume, threshold=0.5)
+    # The input is resident, slabs of planes with a halo of 1 fit the rest
+    budget = volume.data.nbytes + _surface_area_memory((planes + 2, 32, 32), volume.data.dtype)
+    with _slabbed() as info, planner.budget(budget):
+        result = surface_area(volume, threshold=0.5)
+    assert info.called
+    assert result['y'].tolist() == expected['y'].tolist()
+
+
+@pytest.mark.parametrize('planes', [1, 8, 30])
+def test_beamdamage_in_slabs(planes):
+    # An ellipsoid long enough along y to be split into several slabs with the halo of the deformation
+    y, x, z = np.indices((120, 24, 24)) - np.array([60, 12, 12])[:, None, None, None]
+    data = ((y / 50)**2 + (x / 9)**2 + (z / 9)**2 <= 1).astype(np.float32)
+    np.random.seed(0)
+    whole = beamdamage(Volume(data), knock_on=0.05, elastic_deform=1.5, inplace=False)
+    np.random.seed(0)
+    # The input and the output are resident, slabs of planes with the halo of the smoothing fit the rest
+    budget = 2 * data.nbytes + _beamdamage_memory((planes + 80, 24, 24), data.dtype)
+    with _slabbed() as info, planner.budget(budget):
+        slabbed = beamdamage(Volume(data), knock_on=0.05, elastic_deform=1.5, inplace=False)
+    assert info.called
+    np.testing.assert_array_equal(slabbed.data, whole.data)
+
+
+def test_beamdamage_keeps_the_volume():
+    data = _sphere()
+    damaged = beamdamage(Volume(data), knock_on=0.0, elastic_deform=1.0, inplace=False)
+    assert np.count_nonzero(damaged.data) == np.count_nonzero(data)
+    # Every voxel moves by a voxel, the sphere stays in place
+    assert np.count_nonzero(damaged.data * data) > 0.8 * np.count_nonzero(data)
+
+
+def _nanorod_reference(dim, length, radius, proportion, intensity):
+    # The phantom built from 3D meshgrids of the whole volume
+    pradius = 2*(radius/dim)
+    obj = np.zeros((dim, dim, dim), dtype=np.float32)
+    x = y = z = np.linspace(-1, 1, dim)
+    X, Y = np.meshgrid(x, y)
+    img = np.zeros((dim, dim), dtype=np.float32)
+    img[(X**2 + Y**2) <= pradius**2] = intensity
+    img[(X**2 + Y**2) <= (pradius*proportion)**2] = 1
+
+    L = length - 2*radius
+    z1, z2 = dim//2 - L//2, dim//2 + L//2
+    obj[:, :, z1:z2 + 1] = img[:, :, None]
+
+    X, Y, Z = np.meshgrid(x, y, z)
+    a, b, c = pradius*proportion, pradius*proportion, pradius
+    sphere = np.zeros((dim, dim, dim), dtype=np.float32)
+    sphere[(X**2 + Y**2 + Z**2) <= pradius**2] = intensity
+    sphere[((X**2)/(a**2) + (Y**2)/(b**2) + (Z**2)/(c**2)) <= 1] = 1
+
+    xz1, xz2 = dim//2 - radius, dim//2 + radius
+    obj[xz1:xz2, xz1:xz2, z2:z2 + radius] = sphere[xz1:xz2, xz1:xz2, dim//2:dim//2 + radius]
+    obj[xz1:xz2, xz1:xz2, z1 - radius:z1] = sphere[xz1:xz2, xz1:xz2, dim//2 - radius:dim//2]
+    return obj
+
+
+@pytest.mark.parametrize('dim, length, radius', [(64, 40, 10), (48, 30, 8), (65, 41, 11)])
+def test_nanorod_matches_meshgrid(dim, length, radius):
+    volume = get_nanorod(dim, length, radius, proportion=0.5, intensity=0.3)
+    np.testing.assert_array_equal(volume.data, _nanorod_reference(dim, length, radius, 0.5, 0.3))
+
+
+def test_warns_when_a_process_cannot_slab():
+    sino = Sinogram(np.random.default_rng(0).random((10, 16, 16)).astype(np.float32), np.linspace(-70, 70, 10))
+    with mock.patch.object(planner.logger, 'warning') as warning, planner.budget('1K'):
+        astra_reconstruct(sino, method='bp', use_gpu=False)
+    assert warning.call_count == 1 and 'Astra' in warning.call_args[0][0]
+    with mock.patch.object(planner.logger, 'warning') as warning:
+        astra_reconstruct(sino, method='bp', use_gpu=False)
+    warning.assert_not_called()
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('astra')
+
+from tomobase import utils
+from tomobase.data import Sinogram
+from tomobase.processes.alignments import projection_matching
+from tomobase.processes.alignments.projection_matching import align_projection_matching
+
+ANGLES = np.linspace(-70, 70, 29)
+
+
+def _phantom(x: int = 4, y: int = 48) -> np.ndarray:
+    # Discs of different sizes and intensities, the same in every slice along x
+    rng = np.random.default_rng(0)
+    yy, zz = np.meshgrid(np.linspace(-1, 1, y), np.linspace(-1, 1, y), indexing='ij')
+    vol = np.zeros((x, y, y), dtype=np.float32)
+    for _ in range(6):
+        cy, cz = rng.uniform(-0.5, 0.5, 2)
+        vol[:] += rng.uniform(0.5, 1) * ((yy - cy)**2 + (zz - cz)**2 < rng.uniform(0.08, 0.2)**2)
+    return vol
+
+
+@pytest.fixture(scope='module')
+def projections():
+    return projection_matching._reproject(_phantom(), ANGLES, False)
+
+
+def test_recovers_angle_offsets(projections):
+    # Offsets of up to a degree without a common offset or a scaling of the tilt range
+    offsets = np.random.default_rng(1).uniform(-1, 1, len(ANGLES))
+    offsets -= np.polyval(np.polyfit(ANGLES, offsets, 1), ANGLES)
+    sino = Sinogram(projections.copy(), ANGLES + offsets)
+
+    sino, shifts, found = align_projection_matching(sino, iterations=10, reconstruction_iterations=50, tolerance=0.01,
+                                                    use_gpu=False, verbose_outputs=True)
+    error = sino.angles - ANGLES
+    assert np.abs(error).max() < 0.3
+    assert np.abs(error).mean() < 0.1 * np.abs(offsets).mean()
+    np.testing.assert_allclose(found, sino.angles - ANGLES - offsets)
+    assert np.abs(shifts).max() < 0.1
+
+
+def test_recovers_shifts(projections):
+    shifts = np.zeros((len(ANGLES), 2))
+    shifts[:, 1] = np.random.default_rng(2).integers(-3, 4, len(ANGLES))
+    data = np.stack([np.roll(p, int(s), axis=1) for p, s in zip(projections, shifts[:, 1])])
+    sino = Sinogram(data, ANGLES)
+
+    sino, found, _ = align_projection_matching(sino, iterations=10, estimate_angles=False, tolerance=0.01,
+                                               use_gpu=False, verbose_outputs=True)
+    # A translation of the object shifts the projections by a combination of the cosine and sine of their
+    # angles, the shifts are only determined up to such a translation
+    error = found[:, 1] + shifts[:, 1]
+    theta = np.deg2rad(ANGLES)
+    basis = np.stack((np.cos(theta), np.sin(theta)), axis=1)
+    error -= basis @ np.linalg.lstsq(basis, error, rcond=None)[0]
+    assert np.abs(error).max() < 0.25
+    np.testing.assert_array_equal(sino.angles, ANGLES)
+
+
+def test_projectors_in_use_are_kept(monkeypatch):
+    deleted = []
+    monkeypatch.setattr(utils.astra.astra, 'delete', lambda proj_id: deleted.append(proj_id))
+    monkeypatch.setattr(utils, '_projectors', type(utils._projectors)())
+    with utils._get_projector(8, 8, ANGLES, False, maxsize=1) as held:
+        for i in range(3):
+            with utils._get_projector(8, 8, ANGLES + i + 1, False, maxsize=1):
+                pass
+        # The least recently used projector is in use, the others are deleted instead
+        assert held not in deleted
+        assert list(utils._projectors.values()) == [held]
+    assert len(deleted) == 3
@@ -0,0 +1,78 @@
+import pickle
+from copy import copy, deepcopy
+
+import numpy as np
+import pytest
+
+from tomobase.data import Sinogram
+
+
+def _sinogram(n: int = 3) -> Sinogram:
+    data = np.arange(n * 4 * 4, dtype=np.float32).reshape(n, 4, 4)
+    return Sinogram(data, np.linspace(-60, 60, n))
+
+
+def test_insert_appends():
+    sino = _sinogram()
+    expected = sino.data.copy()
+    for i in range(5):
+        image = np.full((4, 4), i, dtype=np.float32)
+        sino.insert(image, 70 + i)
+        expected = np.concatenate((expected, image[None]))
+    np.testing.assert_array_equal(sino.data, expected)
+    np.testing.assert_array_equal(sino.angles[3:], 70 + np.arange(5))
+    np.testing.assert_array_equal(sino.times, np.arange(1, 9))
+
+
+def test_reserve_avoids_reallocation():
+    sino = _sinogram()
+    sino.reserve(10)
+    buffer = sino._buffer
+    for i in range(7):
+        sino.insert(np.zeros((4, 4), dtype=np.float32), i)
+    assert sino._buffer is buffer
+    assert sino.data.shape == (10, 4, 4)
+    sino.insert(np.zeros((4, 4), dtype=np.float32), 7)
+    assert sino._buffer is not buffer and sino._buffer.shape[0] == 20
+
+
+def test_insert_promotes_dtype():
+    sino = Sinogram(np.ones((2, 4, 4), dtype=np.uint8), np.array([0.0, 1.0]))
+    sino.insert(np.full((4, 4), 0.5), 2.0)
+    assert sino.data.dtype == np.float64
+    assert sino.data[2, 0, 0] == 0.5
+
+
+def test_remove_from_storage():
+    sino = _sinogram(4)
+    sino.reserve(8)
+    expected = np.delete(sino.data, 1, axis=0)
+    sino.remove(1)
+    np.testing.assert_array_equal(sino.data, expected)
+    np.testing.assert_array_equal(sino.angles, np.delete(np.linspace(-60, 60, 4), 1))
+
+
+@pytest.mark.parametrize('duplicate', [copy, deepcopy, lambda sino: pickle.loads(pickle.dumps(sino))])
+def test_copies_do_not_share_storage(duplicate):
+    sino = _sinogram()
+    sino.reserve(10)
+    original = sino.data.copy()
+    other = duplicate(sino)
+    other.data = other.data * 5
+    other.insert(np.zeros((4, 4), dtype=np.float32), 70)
+    np.testing.assert_array_equal(other.data[:3], original * 5)
+    other.data *= 2
+    sino.insert(np.ones((4, 4), dtype=np.float32), 80)
+    np.testing.assert_array_equal(sino.data[:3], original)
+    np.testing.assert_array_equal(other.data[3], 0)
+    np.testing.assert_array_equal(sino.data[3], 1)
+
+
+@pytest.mark.parametrize('duplicate', [deepcopy, lambda sino: pickle.loads(pickle.dumps(sino))])
+def test_edits_of_a_copy_survive_insert(duplicate):
+    sino = _sinogram()
+    sino.reserve(10)
+    other = duplicate(sino)
+    other.data *= 5
+    other.insert(np.zeros((4, 4), dtype=np.float32), 70)
+    np.testing.assert_array_equal(other.data[:3], sino.data * 5)
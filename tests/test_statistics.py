@@ -0,0 +1,44 @@
+import pickle
+from copy import copy, deepcopy
+
+import numpy as np
+import pytest
+
+from tomobase.data import Volume, Sinogram
+
+
+def _sinogram() -> Sinogram:
+    return Sinogram(np.ones((3, 4, 4), dtype=np.float32), np.array([-10.0, 0.0, 10.0]))
+
+
+def test_statistics_are_cached_until_invalidated():
+    volume = Volume(np.arange(8, dtype=np.float32).reshape(2, 2, 2))
+    assert volume.statistics.max() == 7
+    volume.data[0, 0, 0] = 100
+    assert volume.statistics.max() == 7
+    volume.invalidate()
+    assert volume.statistics.max() == 100
+    volume.data = volume.data / 2
+    assert volume.statistics.max() == 50
+
+
+@pytest.mark.parametrize('duplicate', [copy, deepcopy, lambda data: pickle.loads(pickle.dumps(data))])
+def test_copies_have_their_own_statistics(duplicate):
+    sino = _sinogram()
+    assert sino.statistics.max() == 1
+    other = duplicate(sino)
+    other.data = sino.data * 10
+    assert other.statistics.max() == 10
+    assert sino.statistics.max() == 1
+    assert other.statistics._owner is other
+
+
+def test_apply_transforms_invalidates():
+    sino = Sinogram(np.random.default_rng(0).random((3, 8, 8)), np.array([-10.0, 0.0, 10.0]))
+    before = sino.statistics.mean()
+    shift = np.tile(np.eye(3), (3, 1, 1))
+    shift[:, 0, 2] = 3
+    sino.add_transforms(shift)
+    sino.apply_transforms()
+    assert sino.statistics.mean() == pytest.approx(float(np.mean(sino.data)))
+    assert sino.statistics.mean() != pytest.approx(before)
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from tomobase.data import Sinogram, Volume
+
+
+@pytest.mark.parametrize('n', [1, 3])
+@pytest.mark.parametrize('mmap', [True, False])
+def test_sinogram_round_trip(tmp_path, n, mmap):
+    data = np.random.default_rng(0).random((n, 5, 6)).astype(np.float32)
+    sino = Sinogram(data, np.linspace(-60, 60, n), pixelsize=0.5)
+    sino.to_file(tmp_path / 'sino.tif')
+    result = Sinogram.from_file(tmp_path / 'sino.tif', mmap=mmap)
+    np.testing.assert_array_equal(result.data, data)
+    np.testing.assert_array_equal(result.angles, sino.angles)
+    assert result.pixelsize == 0.5
+
+
+@pytest.mark.parametrize('shape', [(5, 6, 1), (5, 6, 4)])
+@pytest.mark.parametrize('mmap', [True, False])
+def test_volume_round_trip(tmp_path, shape, mmap):
+    data = np.random.default_rng(0).random(shape).astype(np.float32)
+    Volume(data).to_file(tmp_path / 'volume.tif')
+    result = Volume.from_file(tmp_path / 'volume.tif', mmap=mmap)
+    np.testing.assert_array_equal(result.data, data)
+
+
+def test_read_projections(tmp_path):
+    data = np.random.default_rng(0).random((4, 5, 6)).astype(np.float32)
+    Sinogram(data, np.arange(4.0)).to_file(tmp_path / 'sino.tif')
+    result = Sinogram.from_file(tmp_path / 'sino.tif', projections=slice(1, 3))
+    np.testing.assert_array_equal(result.data, data[1:3])
+    np.testing.assert_array_equal(result.angles, [1.0, 2.0])
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from tomobase.data import Volume, Sinogram
+from tomobase.processes.image_processing.scaling import bin
+from tomobase.registrations.environment import xp, GPUContext
+from tomobase.registrations.transfers import ImplicitConversionError
+
+
+class ArrayLike:
+    """A lazy array-like, converting it reads the data like a chunked store"""
+
+    def __init__(self, array):
+        self.array = array
+        self.shape = array.shape
+        self.dtype = array.dtype
+        self.nbytes = array.nbytes
+
+    def __array__(self, dtype=None, copy=None):
+        return self.array
+
+
+def test_records_conversions():
+    array = np.ones((4, 5), dtype=np.float32)
+    with xp.track_transfers() as transfers:
+        assert xp.asarray(array) is array
+        xp.asarray(array, dtype=np.float64)
+        xp.asarray(ArrayLike(array))
+    assert [record['kind'] for record in transfers.records] == ['dtype', 'array-like->host']
+    assert [record['explicit'] for record in transfers.records] == [True, False]
+    assert transfers.nbytes == 2 * array.nbytes
+    assert transfers.records[0]['site'].startswith('test_transfers.py')
+
+
+def test_strict_mode():
+    array = ArrayLike(np.ones((4, 5), dtype=np.float32))
+    with xp.track_transfers(strict=True) as transfers:
+        with pytest.raises(ImplicitConversionError):
+            xp.asarray(array)
+        np.testing.assert_array_equal(xp.asarray(array, GPUContext.NUMPY), array.array)
+        assert xp.asarray(array, dtype=np.float64).dtype == np.float64
+    assert all(record['explicit'] for record in transfers.records)
+
+
+def test_no_tracker():
+    array = ArrayLike(np.ones((4, 5), dtype=np.float32))
+    with xp.track_transfers() as transfers:
+        pass
+    np.testing.assert_array_equal(xp.asarray(array), array.array)
+    assert transfers.records == []
+
+
+def test_helper_attributed_to_caller():
+    volume = Volume(ArrayLike(np.ones((4, 5, 6), dtype=np.float32)))
+    with xp.track_transfers() as transfers:
+        volume._set_context()
+    assert isinstance(volume.data, np.ndarray)
+    site, = (record['site'] for record in transfers.records)
+    assert site.startswith('test_transfers.py') and 'test_helper_attributed_to_caller' in site
+
+
+def test_set_context_is_implicit():
+    volume = Volume(ArrayLike(np.ones((4, 5, 6), dtype=np.float32)))
+    with xp.track_transfers() as transfers:
+        volume._set_context()
+    assert [record['explicit'] for record in transfers.records] == [False]
+
+    volume = Volume(ArrayLike(np.ones((4, 5, 6), dtype=np.float32)))
+    with xp.track_transfers() as transfers:
+        volume._set_context(GPUContext.NUMPY)
+    assert [record['explicit'] for record in transfers.records] == [True]
+
+
+def test_hooks_convert_implicitly():
+    def sinogram():
+        return Sinogram(ArrayLike(np.ones((3, 4, 4), dtype=np.float32)), np.array([-10.0, 0.0, 10.0]))
+
+    with xp.track_transfers() as transfers:
+        bin(sinogram(), 2)
+    assert transfers.records and not any(record['explicit'] for record in transfers.records)
+
+    with xp.track_transfers(strict=True):
+        with pytest.raises(ImplicitConversionError):
+            bin(sinogram(), 2)
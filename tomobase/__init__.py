@@ -1,5 +1,14 @@
-from . import processes
-from . import plots
+import importlib
+
+__version__ = '0.0.4'
 
 from .log import logger
 
+# The processes and plots are imported on first access, the registries find processes without importing them
+_SUBMODULES = ('processes', 'plots')
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f'.{name}', __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,277 @@
+"""
+Content-addressed, disk-backed cache of process results.
+
+When the cache is enabled, every call of a ``tomobase_hook_process`` function
+(and of a phantom) is keyed on a BLAKE2 hash of the function code, the input
+arrays, the attributes of the data objects such as angles and pixel size, and
+the parameters. Repeating a call with identical inputs, also in a later
+session, loads the stored result instead of recomputing it. Processes that
+draw random numbers are registered with ``cacheable=False`` and always run.
+
+The store is a directory of pickled results. The least recently used entries
+are removed when the total size exceeds the limit.
+
+Example:
+
+    from tomobase import cache
+    cache.enable(max_size=2**34)
+    volume = astra_reconstruct(sino, method='sirt', iterations=100)  # computed and stored
+    volume = astra_reconstruct(sino, method='sirt', iterations=100)  # loaded from the cache
+"""
+import os
+import enum
+import pickle
+import hashlib
+import tempfile
+import contextlib
+import numpy as np
+
+from .registrations.environment import xp, GPUContext
+from .data.base import Data
+from .log import logger
+
+_SUFFIX = '.pkl'
+# Attributes of data objects that hold caches or state of the backend rather than content. The growth buffers of
+# Sinogram.insert are excluded, their live part is hashed through the data, angles and times views
+_TRANSIENT = {'_version', '_statistics', '_multiscale', '_context', '_device', '_buffer', '_angle_buffer',
+              '_time_buffer', '_views', '_index', '_pyramid'}
+
+
+class _Unhashable(Exception):
+    pass
+
+
+def _update_array(h, array, slab_size: int = 2**26):
+    h.update(f"{np.dtype(array.dtype).str}{tuple(array.shape)}".encode())
+    if array.ndim == 0:
+        h.update(np.ascontiguousarray(xp.asarray(array, GPUContext.NUMPY)).tobytes())
+        return
+    # Hash large and memory-mapped arrays in slabs to avoid a contiguous copy of the whole array
+    step = max(1, slab_size // max(1, int(np.prod(array.shape[1:])) * np.dtype(array.dtype).itemsize))
+    for start in range(0, array.shape[0], step):
+        h.update(np.ascontiguousarray(xp.asarray(array[start:start + step], GPUContext.NUMPY)).data)
+
+
+def _update(h, value):
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+        h.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, enum.Enum):
+        h.update(f"{type(value).__qualname__}.{value.name};".encode())
+    elif isinstance(value, Data):
+        h.update(f"{type(value).__qualname__}(".encode())
+        for name, item in sorted(vars(value).items()):
+            if name not in _TRANSIENT:
+                h.update(name.encode())
+                _update(h, item)
+        h.update(b");")
+    elif isinstance(value, np.generic):
+        h.update(f"{value.dtype.str}:{value!r};".encode())
+    elif hasattr(value, 'shape') and hasattr(value, 'dtype') and hasattr(value, '__getitem__'):
+        _update_array(h, value)
+    elif isinstance(value, (list, tuple)):
+        h.update(f"{type(value).__name__}[".encode())
+        for item in value:
+            _update(h, item)
+        h.update(b"];")
+    elif isinstance(value, dict):
+        h.update(b"{")
+        for name, item in sorted(value.items(), key=lambda kv: repr(kv[0])):
+            _update(h, name)
+            _update(h, item)
+        h.update(b"};")
+    elif callable(value) and hasattr(value, '__code__'):
+        _update_function(h, value)
+    else:
+        raise _Unhashable(type(value).__name__)
+
+
+def _update_function(h, func):
+    # The code of the function is part of the key so results are recomputed after the implementation changes
+    h.update(f"{func.__module__}.{func.__qualname__}:".encode())
+    h.update(func.__code__.co_code)
+    h.update(repr(func.__code__.co_consts).encode())
+
+
+class ResultCache:
+    """A disk-backed least recently used store of process results.
+
+    Args:
+        path (str): The directory of the store, it is created if it does not exist
+        max_size (int): The maximum total size of the stored results in bytes (default: 2**33)
+    """
+
+    def __init__(self, path: str, max_size: int = 2**33):
+        self.path = path
+        self.max_size = max_size
+        os.makedirs(path, exist_ok=True)
+
+    def key(self, func, args: tuple, kwargs: dict) -> str | None:
+        """The hex digest identifying a call, None if an argument cannot be hashed"""
+        h = hashlib.blake2b(digest_size=20)
+        try:
+            _update_function(h, func)
+            _update(h, list(args))
+            _update(h, kwargs)
+        except _Unhashable as error:
+            logger.debug(f"Not caching {func.__name__}, an argument of type {error} cannot be hashed")
+            return None
+        return h.hexdigest()
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, key + _SUFFIX)
+
+    def get(self, key: str):
+        """Load a stored entry and mark it as recently used, None if it is not stored"""
+        filename = self._file(key)
+        try:
+            with open(filename, 'rb') as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as error:
+            logger.warning(f"Removing unreadable cache entry {filename}: {error}")
+            self._remove(filename)
+            return None
+        os.utime(filename)
+        return entry
+
+    def put(self, key: str, entry):
+        """Store an entry and remove the least recently used entries when the store is too large"""
+        fd, temporary = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                # Protocol 5 would restore the read-only views of _storable as read-only arrays
+                pickle.dump(entry, f, protocol=4)
+            os.replace(temporary, self._file(key))
+        except BaseException:
+            self._remove(temporary)
+            raise
+        self._evict()
+
+    def _entries(self) -> list:
+        return [e for e in os.scandir(self.path) if e.is_file() and e.name.endswith(_SUFFIX)]
+
+    def _remove(self, filename: str):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(filename)
+
+    def _evict(self):
+        entries = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in self._entries()]
+        total = sum(size for _, size, _ in entries)
+        for _, size, filename in sorted(entries):
+            if total <= self.max_size:
+                break
+            self._remove(filename)
+            total -= size
+
+    def size(self) -> int:
+        """The total size of the stored results in bytes"""
+        return sum(e.stat().st_size for e in self._entries())
+
+    def clear(self):
+        """Remove every stored result"""
+        for e in self._entries():
+            self._remove(e.path)
+
+
+_cache = None
+
+
+def default_path() -> str:
+    """The default cache directory, ``$XDG_CACHE_HOME/tomobase`` or ``~/.cache/tomobase``"""
+    return os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')), 'tomobase')
+
+
+def enable(path: str | None = None, max_size: int = 2**33) -> ResultCache:
+    """Enable caching of process results.
+
+    Args:
+        path (str | None): The directory of the store, see ``default_path`` if None (default: None)
+        max_size (int): The maximum total size of the stored results in bytes (default: 2**33)
+
+    Returns:
+        ResultCache: The active cache
+    """
+    global _cache
+    _cache = ResultCache(default_path() if path is None else path, max_size)
+    return _cache
+
+
+def disable():
+    """Disable caching of process results, stored results are kept"""
+    global _cache
+    _cache = None
+
+
+def active() -> ResultCache | None:
+    """The active cache, None if caching is disabled"""
+    return _cache
+
+
+@contextlib.contextmanager
+def caching(path: str | None = None, max_size: int = 2**33):
+    """Enable caching of process results inside a ``with`` block.
+
+    Args:
+        path (str | None): The directory of the store, see ``default_path`` if None (default: None)
+        max_size (int): The maximum total size of the stored results in bytes (default: 2**33)
+    """
+    global _cache
+    previous = _cache
+    try:
+        yield enable(path, max_size)
+    finally:
+        _cache = previous
+
+
+def _storable(value):
+    # Store data objects without their caches and the spare capacity of their buffers
+    if isinstance(value, Data):
+        return value._copy_on_write()
+    if isinstance(value, tuple):
+        return tuple(_storable(item) for item in value)
+    return value
+
+
+def lookup(func, args: tuple, kwargs: dict):
+    """Find the stored result of a call, used by the process and phantom wrappers.
+
+    Returns:
+        str | None: The key of the call, None if caching is disabled or the call cannot be hashed
+        dict | None: The stored entry, None on a cache miss
+    """
+    if _cache is None:
+        return None, None
+    key = _cache.key(func, args, kwargs)
+    if key is None:
+        return None, None
+    entry = _cache.get(key)
+    if entry is not None:
+        logger.debug(f"Loaded the result of {func.__name__} from the cache")
+    return key, entry
+
+
+def store(key: str | None, results, kwargs: dict):
+    """Store the result of a call under the key returned by ``lookup``"""
+    if key is None or _cache is None:
+        return
+    # Remember which input the result is, so a cache hit of an in-place call updates that input
+    first = results[0] if isinstance(results, tuple) else results
+    alias = next((name for name, value in kwargs.items() if value is first and isinstance(value, Data)), None)
+    try:
+        _cache.put(key, {'results': _storable(results), 'alias': alias})
+    except (pickle.PicklingError, TypeError, AttributeError) as error:
+        logger.debug(f"Not caching a result that cannot be pickled: {error}")
+
+
+def restore(entry: dict, kwargs: dict, inplace: bool):
+    """Get the results of a stored entry, in-place calls update the input they returned"""
+    results = entry['results']
+    alias = entry['alias']
+    if inplace and alias is not None and isinstance(kwargs.get(alias), Data):
+        target = kwargs[alias]
+        first = results[0] if isinstance(results, tuple) else results
+        target.__dict__.update(vars(first))
+        target.invalidate()
+        results = (target, *results[1:]) if isinstance(results, tuple) else target
+    return results
@@ -0,0 +1,251 @@
+"""
+Headless batch processing of many datasets with a pipeline of registered processes.
+
+The pipeline is described by a YAML or JSON spec:
+
+    input: sinogram            # the data type the inputs are read as: sinogram, volume or image
+    read: {}                   # keyword arguments of Data.from_file (optional)
+    output:
+      suffix: _rec             # appended to the name of the input (default: _processed)
+      format: mrc              # the extension of the written files (default: the input extension)
+    steps:
+      - process: Normalize
+      - process: Astra
+        args: {method: sirt, iterations: 50}
+
+Every input file is processed in a separate worker process:
+
+    tomobase-batch spec.yaml "data/*.mrc" -o results -j 8 --memory-limit 16G
+
+Processes that support it split their work into slabs to stay within a memory
+budget, three quarters of the memory limit unless ``--memory-budget`` is given.
+
+A ``summary.json`` with the status, timings and per-step profile of every file
+is written to the output directory. The exit code is 1 if any file failed.
+"""
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .planner import parse_size
+
+def load_spec(filename: str) -> dict:
+    """Read a pipeline spec from a YAML or JSON file.
+
+    Args:
+        filename (str): The spec file, YAML unless the extension is .json
+
+    Returns:
+        dict: The spec
+    """
+    with open(filename) as f:
+        if filename.lower().endswith('.json'):
+            spec = json.load(f)
+        else:
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("Reading YAML specs requires PyYAML, install it with 'pip install pyyaml' or use a JSON spec.")
+            spec = yaml.safe_load(f)
+    if not isinstance(spec, dict) or not spec.get('steps'):
+        raise ValueError(f"The spec {filename} must define a list of steps.")
+    for step in spec['steps']:
+        if 'process' not in step:
+            raise ValueError(f"Every step of the spec must name a process, got {step}.")
+    return spec
+
+
+def expand_inputs(patterns: list) -> list:
+    """Expand file names and glob patterns into a sorted list of unique paths"""
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True))
+        if not matches:
+            raise FileNotFoundError(f"No input matches {pattern}.")
+        files += [os.path.normpath(m) for m in matches if os.path.normpath(m) not in files]
+    return files
+
+
+def output_path(filename: str, spec: dict, directory: str) -> str:
+    """The file the result of an input is written to"""
+    output = spec.get('output', {})
+    stem, ext = os.path.splitext(os.path.basename(os.path.normpath(filename)))
+    ext = output.get('format', ext.lstrip('.')).lstrip('.')
+    return os.path.join(directory, f"{stem}{output.get('suffix', '_processed')}.{ext}")
+
+
+def _data_type(name: str):
+    from .data import Sinogram, Volume, Image
+    types = {'sinogram': Sinogram, 'volume': Volume, 'image': Image}
+    try:
+        return types[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown input type {name}, use one of {', '.join(types)}.")
+
+
+def build_pipeline(spec: dict):
+    """Create a Pipeline from the steps of a spec"""
+    from .pipeline import Pipeline
+    pipeline = Pipeline(**spec.get('pipeline', {}))
+    for step in spec['steps']:
+        pipeline.add(step['process'], *step.get('positional', []), inputs=step.get('inputs'), **step.get('args', {}))
+    return pipeline
+
+
+def _limit_memory(limit: int | None):
+    # Lower the soft address space limit of the worker, allocations beyond it raise MemoryError
+    if limit is None:
+        return
+    try:
+        import resource
+    except ImportError:
+        from .log import logger
+        logger.warning("Memory limits are not supported on this platform and are ignored.")
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def process_file(spec: dict, filename: str, output: str, memory_limit: int | None = None,
+                 cache_path: str | None = None, memory_budget: int | None = None) -> dict:
+    """Read a file, run the pipeline of the spec on it and write the result.
+
+    Args:
+        spec (dict): The pipeline spec, see ``load_spec``
+        filename (str): The input file
+        output (str): The output file
+        memory_limit (int | None): The maximum address space of the process in bytes, not limited if None (default: None)
+        cache_path (str | None): Enable tomobase.cache with this directory if given (default: None)
+        memory_budget (int | None): The budget processes split their work into slabs for, see tomobase.planner (default: None)
+
+    Returns:
+        dict: The summary of the file with the keys input, output, status, error, wall_time and steps
+    """
+    summary = {'input': filename, 'output': output, 'status': 'ok', 'error': None}
+    start = time.perf_counter()
+    try:
+        _limit_memory(memory_limit)
+        from . import profiling, cache, planner
+        if cache_path is not None:
+            cache.enable(cache_path)
+        if memory_budget is not None:
+            planner.set_budget(memory_budget)
+        cls = _data_type(spec.get('input', 'sinogram'))
+        pipeline = build_pipeline(spec)
+        with profiling.profile(memory=False) as profiler:
+            data = cls.from_file(filename, **spec.get('read', {}))
+            result = pipeline.run(data)
+            del data
+            os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+            if hasattr(result, 'to_file'):
+                result.to_file(output, **spec.get('output', {}).get('args', {}))
+            else:
+                # Quantifications return tables
+                result.to_csv(output)
+        records = profiler.to_dataframe()
+        summary['steps'] = records[records['depth'] == 0][['process', 'wall_time', 'cpu_time']].to_dict('records')
+    except MemoryError:
+        summary['status'] = 'failed'
+        summary['error'] = f"MemoryError: the file needs more than the memory limit of {memory_limit} bytes"
+    except Exception as error:
+        summary['status'] = 'failed'
+        summary['error'] = f"{type(error).__name__}: {error}"
+        summary['traceback'] = traceback.format_exc()
+    summary['wall_time'] = time.perf_counter() - start
+    return summary
+
+
+def run_batch(spec: dict, files: list, directory: str, workers: int | None = None, memory_limit: int | None = None,
+              overwrite: bool = False, cache_path: str | None = None, memory_budget: int | None = None) -> dict:
+    """Process many files in parallel worker processes.
+
+    Args:
+        spec (dict): The pipeline spec, see ``load_spec``
+        files (list[str]): The input files
+        directory (str): The output directory
+        workers (int | None): The number of worker processes, the number of CPUs if None (default: None)
+        memory_limit (int | None): The maximum address space of every worker in bytes, not limited if None (default: None)
+        overwrite (bool): Process files whose output already exists (default: False)
+        cache_path (str | None): Enable tomobase.cache in the workers with this directory if given (default: None)
+        memory_budget (int | None): The memory budget of every worker, see tomobase.planner. Three quarters of the memory limit if None (default: None)
+
+    Returns:
+        dict: The run summary, with one entry per file under 'files'
+    """
+    if memory_budget is None and memory_limit is not None:
+        # The address space limit also covers the interpreter and mapped libraries
+        memory_budget = memory_limit * 3 // 4
+    started = time.time()
+    results = {}
+    jobs = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for filename in files:
+            output = output_path(filename, spec, directory)
+            if os.path.exists(output) and not overwrite:
+                results[filename] = {'input': filename, 'output': output, 'status': 'skipped', 'error': None}
+                continue
+            jobs[executor.submit(process_file, spec, filename, output, memory_limit, cache_path, memory_budget)] = filename
+        for i, future in enumerate(as_completed(jobs)):
+            filename = jobs[future]
+            try:
+                results[filename] = future.result()
+            except Exception as error:
+                # The worker died, e.g. it was killed by the operating system
+                results[filename] = {'input': filename, 'status': 'failed', 'error': f"{type(error).__name__}: {error}"}
+            status = results[filename]['status']
+            print(f"[{i + 1}/{len(jobs)}] {filename}: {status}", file=sys.stderr, flush=True)
+
+    entries = [results[f] for f in files]
+    return {
+        'spec': spec,
+        'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(started)),
+        'wall_time': time.time() - started,
+        'workers': workers or os.cpu_count(),
+        'memory_limit': memory_limit,
+        'memory_budget': memory_budget,
+        'processed': sum(e['status'] == 'ok' for e in entries),
+        'skipped': sum(e['status'] == 'skipped' for e in entries),
+        'failed': sum(e['status'] == 'failed' for e in entries),
+        'files': entries,
+    }
+
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='tomobase-batch',
+                                     description='Run a pipeline of tomobase processes over many datasets without a GUI.')
+    parser.add_argument('spec', help='YAML or JSON pipeline spec')
+    parser.add_argument('inputs', nargs='+', help='input files or glob patterns, quote patterns to expand them recursively with **')
+    parser.add_argument('-o', '--output', default='.', help='output directory (default: the current directory)')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='number of worker processes (default: the number of CPUs)')
+    parser.add_argument('-m', '--memory-limit', default=None,
+                        help='address space limit per worker, e.g. 16G. Includes mapped libraries such as CUDA (default: no limit)')
+    parser.add_argument('--memory-budget', default=None,
+                        help='memory processes split their work into slabs to stay within, e.g. 12G (default: 3/4 of the memory limit)')
+    parser.add_argument('--overwrite', action='store_true', help='process files whose output already exists')
+    parser.add_argument('--cache', default=None, metavar='DIR', help='reuse results of identical steps from this cache directory')
+    parser.add_argument('--summary', default=None, help='the run summary file (default: OUTPUT/summary.json)')
+    args = parser.parse_args(argv)
+
+    spec = load_spec(args.spec)
+    files = expand_inputs(args.inputs)
+    summary = run_batch(spec, files, args.output, args.workers, parse_size(args.memory_limit), args.overwrite, args.cache,
+                        parse_size(args.memory_budget))
+
+    filename = args.summary or os.path.join(args.output, 'summary.json')
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+    with open(filename, 'w') as f:
+        json.dump(summary, f, indent=2, default=str)
+    print(f"{summary['processed']} processed, {summary['skipped']} skipped, {summary['failed']} failed. "
+          f"Summary written to {filename}", file=sys.stderr)
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
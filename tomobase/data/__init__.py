@@ -2,5 +2,6 @@ from .image import Image
 from .volume import Volume
 from .sinogram import Sinogram
 from .base import Data
+from . import alignment
 
 all = [Image, Volume, Sinogram, Data]
\ No newline at end of file
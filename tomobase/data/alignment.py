@@ -0,0 +1,126 @@
+"""
+Per-projection affine transforms used to defer alignment resampling.
+
+Every transform is stored as a stack of homogeneous ``(n, 3, 3)`` pull-back
+matrices, one per projection. A pull-back matrix maps a pixel coordinate
+``(x, y, 1)`` of the aligned projection to the coordinate in the raw projection
+that should be sampled, which is the convention used by
+``scipy.ndimage.affine_transform``.
+"""
+import numpy as np
+
+from ..registrations.environment import xp
+
+
+def identity(n: int) -> np.ndarray:
+    """Identity transforms for ``n`` projections.
+
+    Args:
+        n (int): The number of projections
+
+    Returns:
+        numpy.ndarray: An ``(n, 3, 3)`` stack of identity matrices
+    """
+    return np.tile(np.eye(3), (n, 1, 1))
+
+
+def shift_matrices(shifts) -> np.ndarray:
+    """Transforms equivalent to ``scipy.ndimage.shift`` of each projection.
+
+    Args:
+        shifts (numpy.ndarray): The ``(n, 2)`` shifts in pixels along (x, y)
+
+    Returns:
+        numpy.ndarray: An ``(n, 3, 3)`` stack of pull-back matrices
+    """
+    shifts = np.asarray(shifts, dtype=float).reshape(-1, 2)
+    matrices = identity(shifts.shape[0])
+    matrices[:, :2, 2] = -shifts
+    return matrices
+
+
+def rotation_matrices(angles, shape) -> np.ndarray:
+    """Transforms equivalent to ``scipy.ndimage.rotate(reshape=False)`` of each projection.
+
+    Args:
+        angles (numpy.ndarray): The ``(n,)`` in-plane rotations in degrees
+        shape (tuple): The (x, y) shape of a projection, the rotation is about its centre
+
+    Returns:
+        numpy.ndarray: An ``(n, 3, 3)`` stack of pull-back matrices
+    """
+    theta = np.deg2rad(np.asarray(angles, dtype=float).reshape(-1))
+    centre = (np.asarray(shape[-2:], dtype=float) - 1) / 2
+    cos, sin = np.cos(theta), np.sin(theta)
+
+    matrices = identity(theta.shape[0])
+    matrices[:, 0, 0] = cos
+    matrices[:, 0, 1] = sin
+    matrices[:, 1, 0] = -sin
+    matrices[:, 1, 1] = cos
+    matrices[:, :2, 2] = centre - np.einsum('nij,j->ni', matrices[:, :2, :2], centre)
+    return matrices
+
+
+def compose(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Compose two transforms so that ``first`` is applied before ``second``.
+
+    Args:
+        first (numpy.ndarray): The ``(n, 3, 3)`` transforms applied first
+        second (numpy.ndarray): The ``(n, 3, 3)`` transforms applied second
+
+    Returns:
+        numpy.ndarray: The ``(n, 3, 3)`` composite pull-back matrices
+    """
+    return np.matmul(first, second)
+
+
+def rescale(matrices: np.ndarray, factor: float) -> np.ndarray:
+    """Express transforms in the pixel coordinates of projections binned by ``factor``.
+
+    Args:
+        matrices (numpy.ndarray): The ``(n, 3, 3)`` pull-back matrices at full resolution
+        factor (float): The binning factor of the target projections
+
+    Returns:
+        numpy.ndarray: The ``(n, 3, 3)`` pull-back matrices in binned coordinates
+    """
+    # A binned pixel i covers the full resolution pixels factor*i ... factor*i + factor - 1
+    scale = np.array([[factor, 0, (factor - 1) / 2], [0, factor, (factor - 1) / 2], [0, 0, 1]])
+    return np.matmul(np.matmul(np.linalg.inv(scale), matrices), scale)
+
+
+def is_identity(matrices: np.ndarray) -> bool:
+    return bool(np.allclose(matrices, np.eye(3)))
+
+
+def resample(data, matrices: np.ndarray, order: int = 1, mode: str = 'constant', out=None):
+    """Apply per-projection transforms to a stack of projections in a single interpolation pass.
+
+    Args:
+        data (numpy.ndarray | cupy.ndarray): The projections indexed using the (n, x, y) orientation
+        matrices (numpy.ndarray): The ``(n, 3, 3)`` pull-back matrices
+        order (int): The spline interpolation order (default: 1)
+        mode (str): How samples outside the projection are filled, see ``scipy.ndimage.affine_transform`` (default: 'constant')
+        out (numpy.ndarray | cupy.ndarray | None): The output array, may be ``data`` itself to resample in place (default: None)
+
+    Returns:
+        numpy.ndarray | cupy.ndarray: The resampled projections
+    """
+    inplace = out is data
+    if out is None:
+        out = xp.xupy.empty(data.shape, dtype=xp.xupy.result_type(data.dtype, xp.xupy.float32))
+    buffer = xp.xupy.empty(data.shape[1:3], dtype=out.dtype) if inplace else None
+
+    for i in range(data.shape[0]):
+        if np.allclose(matrices[i], np.eye(3)):
+            if not inplace:
+                out[i] = data[i]
+            continue
+        target = buffer if inplace else out[i]
+        xp.scipy.ndimage.affine_transform(data[i], xp.xupy.asarray(matrices[i, :2, :2]),
+                                          offset=xp.xupy.asarray(matrices[i, :2, 2]),
+                                          output=target, order=order, mode=mode)
+        if inplace:
+            out[i] = buffer
+    return out
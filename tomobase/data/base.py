@@ -1,7 +1,7 @@
 import os
 import pathlib
 import numpy as np
-from qtpy.QtWidgets import QApplication, QFileDialog
+from copy import deepcopy
 import collections
 collections.Iterable = collections.abc.Iterable
 
@@ -10,6 +10,9 @@ from abc import ABC, abstractmethod
 from ..log import logger
 from ..registrations.datatypes import TOMOBASE_DATATYPES
 from ..registrations.environment import GPUContext, xp
+from ..registrations.transfers import conversion_helper
+from . import chunked
+from .statistics import DataStatistics
 
 class Data(ABC):
     """
@@ -44,6 +47,37 @@ class Data(ABC):
         # Note these are used to swap between numpy and cupy context
         self._context = GPUContext.NUMPY
         self._device = 0
+        # Cached display pyramid, see multiscale
+        self._multiscale = None
+
+    @property
+    def data(self):
+        """numpy.ndarray | cupy.ndarray: The array of the dataset. Reassigning it invalidates the cached statistics"""
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        if value is not getattr(self, '_data', None):
+            self._data = value
+            self.invalidate()
+
+    @property
+    def statistics(self) -> DataStatistics:
+        """DataStatistics: Cached statistics of the data, see :mod:`tomobase.data.statistics`"""
+        if getattr(self, '_statistics', None) is None:
+            self._statistics = DataStatistics(self)
+        return self._statistics
+
+    @property
+    def version(self) -> int:
+        """int: A counter that increases whenever the data is reassigned or changed by a process"""
+        return getattr(self, '_version', 0)
+
+    def invalidate(self):
+        """Mark the data as changed, e.g. after writing to it in-place. This clears the cached statistics"""
+        self._version = self.version + 1
+        if getattr(self, '_statistics', None) is not None:
+            self._statistics.invalidate()
 
     @classmethod
     def from_file(cls, filename: pathlib.Path | None = None, **kwargs):
@@ -59,6 +93,7 @@ class Data(ABC):
             Data: An instance of the Data class containing the read data
         """
         if filename is None:
+            from qtpy.QtWidgets import QApplication, QFileDialog
             app = QApplication([])
             filename, _ = QFileDialog.getOpenFileName(None, "Select File", "", 
                                     [(f"{ext.upper()} files", f"*.{ext}") for ext in cls._readers.keys()])
@@ -66,16 +101,14 @@ class Data(ABC):
                 raise Exception("No file selected or file could not be found")
             app.quit()
 
-        _, ext = os.path.splitext(filename)
+        _, ext = os.path.splitext(os.path.normpath(filename))
         ext = ext[1:]  # remove the dot
 
         try:
-            reader = cls._readers[ext]
-            reader(filename, **kwargs)
-            data = reader(filename, **kwargs)
-            return data
+            reader = cls._readers[ext.lower()]
         except KeyError:
             raise ValueError(f"The given file type {ext.upper()} is not supported.")
+        return reader(filename, **kwargs)
 
 
     def to_file(self, filename: pathlib.Path | None = None, **kwargs):
@@ -88,6 +121,7 @@ class Data(ABC):
             ValueError: If the file type is not supported or the file is not found
         """
         if filename is None:
+            from qtpy.QtWidgets import QApplication, QFileDialog
             app = QApplication([])
             filename, _ = QFileDialog.getSaveFileName(None, "Save File", "", ";;".join([f"{ext.upper()} files (*.{ext})"
                                                                             for ext in self._writers.keys()]))
@@ -100,6 +134,7 @@ class Data(ABC):
 
         try:
             writer = self._writers[ext]
+            self._materialise()
             writer(self, filename, **kwargs)
         except KeyError:
             raise ValueError(f"The given file type {ext.upper()} is not supported.")
@@ -121,16 +156,48 @@ class Data(ABC):
         class_name_upper = cls.__name__.upper()
         return TOMOBASE_DATATYPES[class_name_upper].value
 
+    @conversion_helper
     def _set_context(self, context:GPUContext | None = None, device:int | None = None):
-        # used to set the context 
-        if context is None:
-            context = xp.context
-        if device is None:
-            device = xp.device
-
+        # used to set the context, without a context the data follows the global context and the conversion
+        # is recorded as implicit, see tomobase.registrations.transfers
         self.data = xp.asarray(self.data, context, device)
-        self._context = context
-        self._device = device
+        self._context = xp.context if context is None else context
+        self._device = xp.device if device is None else device
+
+    def ensure_writable(self):
+        """Make the data writable before changing it in-place.
+
+        Processes called with ``inplace=False`` receive a copy that shares the data of the original as a
+        read-only view, see ``_copy_on_write``. This makes a private copy of the data the first time it is
+        needed, it does nothing when the data is already writable. Processes that write to their input
+        in-place must call it first, writing to the read-only view raises a ValueError. The hooks also call
+        it on the results of ``inplace=False`` calls, so they never share data with the caller.
+        """
+        flags = getattr(self.data, 'flags', None)
+        if flags is not None and not flags.writeable:
+            self.data = self.data.copy()
+
+    def _copy_on_write(self, memo: dict | None = None):
+        # A deep copy that shares the data with this object as a read-only view, the data is only copied
+        # once it is written to, see ensure_writable. Caches derived from the data are not copied, see __getstate__.
+        view = self.data.view()
+        view.flags.writeable = False
+        if memo is None:
+            memo = {}
+        memo[id(self._data)] = view
+        return deepcopy(self, memo)
+
+    def __getstate__(self):
+        # Copies, shallow ones included, and pickles compute their own statistics and display pyramid, the
+        # caches of this object describe its data and point back to it
+        state = self.__dict__.copy()
+        state['_statistics'] = None
+        state['_multiscale'] = None
+        return state
+
+    def _materialise(self):
+        # used to apply any deferred operations to the data before it is consumed, see Sinogram.apply_transforms
+        pass
 
     def layer_metadata(self, metadata: dict = {}):
         """Get the layer metadata in the format required for napari implementation
@@ -169,24 +236,67 @@ class Data(ABC):
         attr['name'] = attributes.get('name', 'Data')
         attr['scale'] = attributes.get('pixelsize' ,(self.pixelsize, self.pixelsize, self.pixelsize))
         attr['colormap'] = attributes.get('colormap', 'gray')
-        attr['contrast_limits'] = attributes.get('contrast_limits', [0, np.max(self.data)*1.5])
+        attr['contrast_limits'] = attributes['contrast_limits'] if 'contrast_limits' in attributes else self._contrast_limits()
         return attr
 
-    def to_data_tuple(self, attributes:dict={}, metadata:dict={}):
+    def _contrast_limits(self):
+        # Estimated from a subsample so that large datasets are not scanned completely
+        return [0, self.statistics.max(subsample=True)*1.5]
+
+    def _multiscale_factors(self) -> tuple:
+        # The downsampling factor along every axis between successive levels of the multiscale pyramid
+        return (2,) * self.data.ndim
+
+    def multiscale(self, min_size: int = 512) -> list:
+        """Get a multiscale pyramid of the data for display.
+
+        The levels are strided views of the data, so they are built without reading or copying it.
+        Data opened from a chunked store uses the downsampled levels of the store instead. The pyramid
+        is cached until the data is replaced.
+
+        Args:
+            min_size (int): Levels are added until the largest downsampled axis is at most this size (default: 512)
+
+        Returns:
+            list: The levels ordered from the full resolution data to the coarsest level
+        """
+        key = (id(self.data), self.data.shape, min_size)
+        if self._multiscale is not None and self._multiscale['key'] == key:
+            return self._multiscale['levels']
+
+        if isinstance(self.data, chunked.ChunkedArray):
+            path = os.path.dirname(self.data.path)
+            levels = [chunked.ChunkedArray(path, i) for i in range(len(chunked.read_metadata(path)['levels']))]
+        else:
+            factors = self._multiscale_factors()
+            levels = [self.data]
+            while max(s for s, f in zip(levels[-1].shape, factors) if f > 1) > min_size:
+                levels.append(levels[-1][tuple(slice(None, None, f) for f in factors)])
+        self._multiscale = {'key': key, 'levels': levels}
+        return levels
+
+    def to_data_tuple(self, attributes:dict={}, metadata:dict={}, multiscale: bool = False):
         """ 
         Builds a Napari Layer Data Tuple
 
         Args:
             attributes (dict): the associated attributes for the layer. Defaults to {}.
             metadata (dict): the associated metadata for the layer. Defaults to {}.
+            multiscale (bool): Pass a multiscale pyramid to napari so that large datasets display interactively, see ``multiscale``. Defaults to False.
 
         Returns:
             tuple: A tuple of (data, attributes, 'image') where data is the data array, attributes is a dictionary of attributes and 'image' is the layer type for napari.
         """
+        self._materialise()
         attributes = self.layer_attributes(attributes)
         metadata = self.layer_metadata(metadata)
         attributes['metadata'] = metadata
-        layerdata = (self.data, attributes, 'image')
+        if multiscale:
+            levels = self.multiscale()
+            attributes['multiscale'] = len(levels) > 1
+            layerdata = (levels if len(levels) > 1 else self.data, attributes, 'image')
+        else:
+            layerdata = (self.data, attributes, 'image')
         return layerdata
     
     @classmethod
@@ -202,11 +312,11 @@ class Data(ABC):
         """
 
         if attributes is None:
-            data = layer.data
+            data = layer.data[0] if getattr(layer, 'multiscale', False) else layer.data
             scale = layer.scale[0]
             layer_metadata = layer.metadata['ct metadata']
         else:
-            data = layer
+            data = layer[0] if attributes.get('multiscale', False) else layer
             scale = attributes['scale'][0]
             layer_metadata = attributes['metadata']['ct metadata']
 
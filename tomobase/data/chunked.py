@@ -0,0 +1,227 @@
+"""
+A chunked, multiscale directory store for large volumes and sinograms.
+
+The store is a directory with a ``metadata.json`` file and one subdirectory per
+resolution level. Every level is split into regular chunks which are stored as
+zlib compressed files named after their chunk index, e.g. ``0/2.0.1``. Level 0
+holds the full resolution data, every next level is downsampled by the
+``factors`` of the store with a block mean. Chunks are only read when they are
+indexed, so processes and viewers can work with the part or level they need.
+"""
+import os
+import json
+import zlib
+import itertools
+import numpy as np
+
+from ..registrations.environment import xp, GPUContext
+
+_METADATA = 'metadata.json'
+
+
+class ChunkedArray:
+    """A lazy, read-only array backed by one level of a chunked store.
+
+    Indexing with integers, slices and integer or boolean arrays only reads and decompresses the chunks
+    that overlap the selection, arrays read the chunks between their smallest and largest index.
+    ``numpy.asarray`` reads the full level.
+
+    Attributes:
+        shape (tuple): The shape of the level
+        dtype (numpy.dtype): The data type
+        chunks (tuple): The shape of a chunk
+    """
+
+    def __init__(self, path: str, level: int = 0):
+        with open(os.path.join(path, _METADATA)) as f:
+            metadata = json.load(f)
+        info = metadata['levels'][level]
+        self.path = os.path.join(path, info['path'])
+        self.shape = tuple(info['shape'])
+        self.chunks = tuple(metadata['chunks'])
+        self.dtype = np.dtype(metadata['dtype'])
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self.shape))
+
+    @property
+    def nbytes(self) -> int:
+        return self.size * self.dtype.itemsize
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __repr__(self):
+        return f"ChunkedArray(shape={self.shape}, dtype={self.dtype}, chunks={self.chunks})"
+
+    def _read_chunk(self, index: tuple) -> np.ndarray:
+        shape = tuple(min(c, s - i * c) for i, c, s in zip(index, self.chunks, self.shape))
+        with open(os.path.join(self.path, '.'.join(map(str, index))), 'rb') as f:
+            return np.frombuffer(zlib.decompress(f.read()), dtype=self.dtype).reshape(shape)
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        if any(k is Ellipsis for k in key):
+            i = key.index(Ellipsis)
+            key = key[:i] + (slice(None),) * (self.ndim - len(key) + 1) + key[i + 1:]
+        key = key + (slice(None),) * (self.ndim - len(key))
+
+        # Read the bounding box of the selection chunk by chunk, steps and integers are applied afterwards
+        bounds = []
+        post = []
+        for k, size in zip(key, self.shape):
+            if isinstance(k, slice):
+                start, stop, step = k.indices(size)
+                if step < 0:
+                    bounds.append((0, size))
+                    post.append(k)
+                else:
+                    bounds.append((start, max(start, stop)))
+                    post.append(slice(None, None, step))
+            elif isinstance(k, (list, np.ndarray)):
+                # Integer or boolean indices read the chunks between the smallest and largest index
+                k = np.asarray(k)
+                if k.dtype == bool:
+                    k = np.flatnonzero(k)
+                k = np.where(k < 0, k + size, k).astype(np.intp)
+                if k.size and (k.min() < 0 or k.max() >= size):
+                    raise IndexError(f"Index {k[(k < 0) | (k >= size)][0]} is out of bounds for an axis of size {size}.")
+                lo = int(k.min()) if k.size else 0
+                bounds.append((lo, int(k.max()) + 1 if k.size else 0))
+                post.append(k - lo)
+            else:
+                k = int(k)
+                k = k + size if k < 0 else k
+                if not 0 <= k < size:
+                    raise IndexError(f"Index {k} is out of bounds for an axis of size {size}.")
+                bounds.append((k, k + 1))
+                post.append(0)
+
+        out = np.empty(tuple(b - a for a, b in bounds), dtype=self.dtype)
+        ranges = [range(a // c, -(-b // c)) for (a, b), c in zip(bounds, self.chunks)]
+        for index in itertools.product(*ranges):
+            chunk = self._read_chunk(index)
+            source = []
+            target = []
+            for i, c, (a, b) in zip(index, self.chunks, bounds):
+                lo = max(a, i * c)
+                hi = min(b, (i + 1) * c)
+                source.append(slice(lo - i * c, hi - i * c))
+                target.append(slice(lo - a, hi - a))
+            out[tuple(target)] = chunk[tuple(source)]
+        return out[tuple(post)]
+
+    def __array__(self, dtype=None, copy=None):
+        data = self[...]
+        return data if dtype is None else data.astype(dtype)
+
+
+def _write_chunks(path: str, level, shape: tuple, chunks: tuple, compression: int):
+    # level is any array-like that supports slicing, it is read one chunk at a time
+    os.makedirs(path, exist_ok=True)
+    for index in itertools.product(*[range(-(-s // c)) for s, c in zip(shape, chunks)]):
+        region = tuple(slice(i * c, min((i + 1) * c, s)) for i, c, s in zip(index, chunks, shape))
+        chunk = np.ascontiguousarray(xp.asarray(level[region], GPUContext.NUMPY))
+        with open(os.path.join(path, '.'.join(map(str, index))), 'wb') as f:
+            f.write(zlib.compress(chunk.tobytes(), compression))
+
+
+class _Downsampled:
+    # A block mean of source evaluated per requested region, stored in the type of the source
+    def __init__(self, source, factors: tuple, dtype):
+        self.source = source
+        self.factors = factors
+        self.dtype = dtype
+
+    def __getitem__(self, region):
+        inner = tuple(slice(r.start * f, r.stop * f) for r, f in zip(region, self.factors))
+        block = np.asarray(self.source[inner], dtype=np.float64)
+        split = []
+        for n, f in zip(block.shape, self.factors):
+            split += [n // f, f]
+        block = block.reshape(split).mean(axis=tuple(range(1, 2 * len(self.factors), 2)))
+        if np.issubdtype(self.dtype, np.integer):
+            block = np.rint(block)
+        return block.astype(self.dtype)
+
+
+def write_store(path: str, data, factors: tuple, chunks: tuple | None = None, levels: int | None = None,
+                metadata: dict = {}, compression: int = 6):
+    """Write a chunked multiscale store.
+
+    Args:
+        path (str): The directory of the store, it is created if it does not exist
+        data (numpy.ndarray | cupy.ndarray | numpy.memmap): The full resolution data, it is read one chunk at a time
+        factors (tuple): The downsampling factor along every axis between successive levels
+        chunks (tuple | None): The shape of a chunk, 64 voxels along every axis if None (default: None)
+        levels (int | None): The number of levels, levels are added until a chunk covers a level if None. Data
+            that fits in a single chunk therefore gets no downsampled levels and ``Data.multiscale`` returns only
+            the full resolution level, pass ``levels`` to force them (default: None)
+        metadata (dict): Additional JSON serialisable metadata stored with the store (default: {})
+        compression (int): The zlib compression level (default: 6)
+    """
+    shape = tuple(data.shape)
+    if chunks is None:
+        chunks = tuple(min(64, s) for s in shape)
+    dtype = np.dtype(data.dtype)
+
+    shapes = [shape]
+    while levels is None or len(shapes) < levels:
+        previous = shapes[-1]
+        if levels is None and all(s <= c or f == 1 for s, c, f in zip(previous, chunks, factors)):
+            break
+        following = tuple(s // f for s, f in zip(previous, factors))
+        if min(following) < 1:
+            break
+        shapes.append(following)
+
+    info = {
+        'shape': list(shape),
+        'dtype': dtype.str,
+        'chunks': list(chunks),
+        'factors': list(factors),
+        'compression': 'zlib',
+        'levels': [{'path': str(i), 'shape': list(s), 'scale': [f ** i for f in factors]} for i, s in enumerate(shapes)],
+    }
+    info.update(metadata)
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, _METADATA), 'w') as f:
+        json.dump(info, f)
+
+    _write_chunks(os.path.join(path, '0'), data, shape, chunks, compression)
+    for i in range(1, len(shapes)):
+        level = _Downsampled(ChunkedArray(path, i - 1), factors, dtype)
+        _write_chunks(os.path.join(path, str(i)), level, shapes[i], chunks, compression)
+
+
+def read_metadata(path: str) -> dict:
+    """Read the metadata of a chunked store.
+
+    Args:
+        path (str): The directory of the store
+
+    Returns:
+        dict: The metadata, including the shape of every level under 'levels'
+    """
+    with open(os.path.join(path, _METADATA)) as f:
+        return json.load(f)
+
+
+def open_store(path: str, level: int = 0):
+    """Open a chunked store lazily.
+
+    Args:
+        path (str): The directory of the store
+        level (int): The resolution level, 0 is full resolution (default: 0)
+
+    Returns:
+        ChunkedArray: The lazy array of the level
+        dict: The metadata of the store
+    """
+    return ChunkedArray(path, level), read_metadata(path)
@@ -1,4 +1,7 @@
-import imageio as iio
+import os
+import re
+import numpy as np
+import xml.etree.ElementTree as ET
 
 from copy import deepcopy
 import collections
@@ -8,11 +11,77 @@ from ..log import logger
 from ..registrations.datatypes import TOMOBASE_DATATYPES
 from ..registrations.environment import xp
 from .base import Data
+from ..lazy import lazy_import
+
+iio = lazy_import('imageio')
+
+# Data types of the pixels in a TIA .ser file
+_SER_DTYPES = {1: '<u1', 2: '<u2', 3: '<u4', 4: '<i1', 5: '<i2', 6: '<i4', 7: '<f4', 8: '<f8'}
+
+
+def _read_emi_tilt(filename):
+    """Read the alpha tilt in degrees from the XML object info embedded in a TIA .emi file"""
+    with open(filename, 'rb') as f:
+        content = f.read()
+    start = content.find(b'<ObjectInfo>')
+    end = content.find(b'</ObjectInfo>')
+    if start < 0 or end < 0:
+        raise ValueError(f"No object info found in {filename}.")
+    root = ET.fromstring(content[start:end + len(b'</ObjectInfo>')].decode('latin-1'))
+    for item in root.iter():
+        label = item.find('Label')
+        value = item.find('Value')
+        if label is not None and value is not None and label.text is not None and label.text.strip() == 'Stage A':
+            return float(value.text)
+    raise ValueError(f"No stage tilt found in {filename}.")
+
+
+def _ser_filename(filename):
+    """The .ser file holding the pixels of the first signal of a .emi file"""
+    return os.path.splitext(filename)[0] + '_1.ser'
+
+
+def _read_ser_header(filename):
+    """Read the offset, shape, dtype and pixel size in nm of the first image in a TIA .ser file
+
+    Returns:
+        tuple: The byte offset of the pixels, the (rows, columns) shape as stored, the numpy dtype and the pixelsize
+    """
+    with open(filename, 'rb') as f:
+        header = np.fromfile(f, dtype='<i2', count=3)
+        version = header[2]
+        f.seek(22)
+        offset_array = np.fromfile(f, dtype='<i8' if version >= 0x0220 else '<i4', count=1).item()
+        f.seek(offset_array)
+        data_offset = np.fromfile(f, dtype='<i8' if version >= 0x0220 else '<i4', count=1).item()
+        f.seek(data_offset)
+        calibration = np.fromfile(f, dtype=np.dtype([('offset_x', '<f8'), ('delta_x', '<f8'), ('element_x', '<i4'),
+                                                     ('offset_y', '<f8'), ('delta_y', '<f8'), ('element_y', '<i4'),
+                                                     ('dtype', '<i2'), ('size_x', '<i4'), ('size_y', '<i4')]), count=1)[0]
+    shape = (int(calibration['size_y']), int(calibration['size_x']))
+    pixelsize = float(calibration['delta_x']) * 1e9  # TIA uses meters
+    return data_offset + 50, shape, np.dtype(_SER_DTYPES[int(calibration['dtype'])]), pixelsize
+
+
+def _read_ser(filename, out=None):
+    """Read the first image of a TIA .ser file in the (x, y) orientation, optionally into a preallocated array"""
+    offset, shape, dtype, pixelsize = _read_ser_header(filename)
+    with open(filename, 'rb') as f:
+        f.seek(offset)
+        data = np.fromfile(f, dtype=dtype, count=shape[0] * shape[1]).reshape(shape)
+    # The transpose makes sure that the orientation is correct in the case where the scanning rotation
+    # was set to -90 (which is the default of the FEI tomo software)
+    if out is None:
+        return data.T.copy(), pixelsize
+    out[...] = data.T
+    return out, pixelsize
+
 
 class Image(Data):
     """ A class for single image datasets.
 
     Supported File Formats:
+        - .emi (with the paired .ser file)
         - .png
         - .jpg
         - .jpeg
@@ -39,19 +108,10 @@ class Image(Data):
 
     @staticmethod
     def _read_emi(filename, **kwargs):
-        # TODO make this method independent of Hyperspy
-        """
-        content = hs.load(filename, lazy=False, reader='emi')
-        data = np.transpose(np.asarray(content.data, dtype=float), (1, 0))   # With transpose we make sure that
-                                                                # the orientation is correct in the
-                                                                # case where the scanning rotation
-                                                                # was set to -90 (which is the
-                                                                # default of the FEI tomo software)
-        pixelsize = content.axes_manager[0].scale  # Hyperspy uses nm
-        im = Image(data, pixelsize)
-        im.metadata['alpha_tilt'] = content.metadata.Acquisition_instrument.TEM.Stage.tilt_alpha
+        data, pixelsize = _read_ser(_ser_filename(filename))
+        im = Image(xp.asarray(data, dtype=float), pixelsize)
+        im.metadata['alpha_tilt'] = _read_emi_tilt(filename)
         return im
-        """
 
     @staticmethod
     def _read_image(filename, **kwargs):
@@ -70,9 +130,12 @@ class Image(Data):
         attr = super().layer_attributes(attributes)
         attr['name'] = attr.get('name', 'Image')
         attr['scale'] = attr.get('pixelsize' ,(self.pixelsize, self.pixelsize))
-        attr['contrast_limits'] = attr.get('contrast_limits', [0, np.max(self.data)*1.5])
         return attr
 
+    def _multiscale_factors(self):
+        # Colour channels are not downsampled
+        return (2, 2) + (1,) * (self.data.ndim - 2)
+
 
     _readers = {}
     _writers = {
@@ -1,28 +1,91 @@
 import os
 import glob
-import h5py
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-import imageio as iio
 
 from copy import deepcopy
-from scipy.io import savemat, loadmat
-import mrcz
 
 
 from ..registrations.datatypes import TOMOBASE_DATATYPES
 from ..registrations.environment import GPUContext, xp
 
-from .image import Image
+from .image import Image, _read_emi_tilt, _read_ser, _read_ser_header, _ser_filename
 from .base import Data
+from . import alignment, tiff, chunked
+from ..lazy import lazy_import
+
+h5py = lazy_import('h5py')
+mrcz = lazy_import('mrcz')
+sio = lazy_import('scipy.io')
+
+def _permute(data, order):
+    # Reorder the first axis in-place such that data becomes data[order], using one projection as buffer
+    done = np.zeros(len(order), dtype=bool)
+    for start in range(len(order)):
+        if done[start] or order[start] == start:
+            done[start] = True
+            continue
+        buffer = data[start].copy()
+        i = start
+        while True:
+            done[i] = True
+            j = order[i]
+            if j == start:
+                data[i] = buffer
+                break
+            data[i] = data[j]
+            i = j
+
+
+# Sinograms returned by select that share the storage of another sinogram, keyed by the id of the array that
+# owns the memory. The views keep that array alive, so an id is not reused while its views exist
+_selections = {}
+
+
+def _storage(array):
+    # The array that owns the memory of a view
+    while isinstance(getattr(array, 'base', None), np.ndarray):
+        array = array.base
+    return array
+
+
+def _register_selection(sino):
+    storage = id(_storage(sino.data))
+    for key in [key for key, views in _selections.items() if not views]:
+        del _selections[key]
+    _selections.setdefault(storage, weakref.WeakSet()).add(sino)
+
+
+def _has_selections(sino) -> bool:
+    # Whether another sinogram returned by select still shares the data of this one
+    storage = _storage(sino.data)
+    return any(view is not sino and _storage(view.data) is storage for view in _selections.get(id(storage), ()))
+
+
+def _as_slice(indices):
+    # A slice selecting the same evenly spaced indices, or None
+    if len(indices) == 0:
+        return slice(0, 0)
+    if len(indices) == 1:
+        return slice(indices[0], indices[0] + 1)
+    steps = np.diff(indices)
+    if np.all(steps == steps[0]) and steps[0] > 0:
+        return slice(indices[0], indices[-1] + 1, steps[0])
+    return None
+
 
 class Sinogram(Data):
     """
     The sinogram is a stack of projection images, indexed using the
-    (n, x, y) orientation. 
+    (n, x, y) orientation. Uncompressed MRC files are opened lazily as a
+    copy-on-write memory map, use ``mmap=False`` to read them into memory.
 
     Supported File Types:
-        - .h5
+        - .h5 (chunked per projection, optionally compressed with ``compression='gzip'`` or ``'lzf'``)
         - .mrc
+        - .tiff (one page per projection)
+        - .chunks (a chunked multiscale directory, opened lazily)
         - .emi
         - .mat (experimental)
 
@@ -30,6 +93,7 @@ class Sinogram(Data):
         data (numpy.ndarray): The sinogram data, indexed using the (n, x, y) orientation.
         angles (numpy.ndarray): The tilt angles in degrees corresponding to the projection images.
         times (numpy.ndarray): The times of acquisition corresponding to the projection images. This defaults to the projection index starting at 1. Otherwise it should be provided in seconds
+        transforms (numpy.ndarray | None): Pending per-projection alignment transforms as ``(n, 3, 3)`` pull-back matrices, see :mod:`tomobase.data.alignment`. None when no transform is pending.
 
 
     """
@@ -53,33 +117,222 @@ class Sinogram(Data):
         elif len(times) != len(angles):
             raise ValueError(("There should be the same number of projection images as times."))
 
-        self.times = times
+        self.times = np.asarray(times)
         self.data = data
         super().__init__(pixelsize, metadata)
         self.angles = np.asarray(angles)
         self.dim_default = 3
+        self.transforms = None
+        # Preallocated storage used by insert, see reserve
+        self._buffer = None
+        self._views = None
+        # Sorted angle and time indices used by sort and select
+        self._index = {}
+        # Cached binned copies of the raw data used for coarse-to-fine alignment, see processes.alignments.pyramid
+        self._pyramid = None
+
+    @property
+    def has_pending_transforms(self) -> bool:
+        """Whether alignment transforms have been recorded but not yet applied to the data"""
+        return self.transforms is not None
+
+    def add_transforms(self, matrices: np.ndarray):
+        """
+        Record per-projection alignment transforms without resampling the data. The transforms are
+        applied after any transform that is already pending.
+
+        Args:
+            matrices (numpy.ndarray): The ``(n, 3, 3)`` pull-back matrices, see :mod:`tomobase.data.alignment`
+        """
+        if self.transforms is None:
+            self.transforms = np.asarray(matrices, dtype=float)
+        else:
+            self.transforms = alignment.compose(self.transforms, matrices)
+
+    def aligned_data(self, matrices: np.ndarray | None = None, order: int = 1):
+        """
+        Get a resampled copy of the data with the pending transforms applied, the sinogram itself is not changed.
+
+        Args:
+            matrices (numpy.ndarray | None): Additional ``(n, 3, 3)`` transforms applied after the pending ones (default: None)
+            order (int): The spline interpolation order (default: 1)
+
+        Returns:
+            numpy.ndarray: The aligned projections
+        """
+        transforms = self.transforms
+        if matrices is not None:
+            transforms = matrices if transforms is None else alignment.compose(transforms, matrices)
+        if transforms is None:
+            return self.data.copy()
+        return alignment.resample(self.data, transforms, order=order)
+
+    def apply_transforms(self, order: int = 1):
+        """
+        Apply all pending transforms to the data in a single interpolation pass.
+
+        Args:
+            order (int): The spline interpolation order (default: 1)
+        """
+        if self.transforms is None:
+            return
+        if not alignment.is_identity(self.transforms):
+            if xp.xupy.issubdtype(self.data.dtype, xp.xupy.floating) and self.data.flags.writeable:
+                alignment.resample(self.data, self.transforms, order=order, out=self.data)
+            else:
+                self.data = alignment.resample(self.data, self.transforms, order=order)
+            self._pyramid = None
+            # The data may have been resampled in-place, cached statistics no longer describe it
+            self.invalidate()
+        self.transforms = None
+
+    def _materialise(self):
+        self.apply_transforms()
+
+    def _copy_on_write(self, memo: dict | None = None):
+        memo = {} if memo is None else memo
+        memo[id(self._pyramid)] = None
+        return super()._copy_on_write(memo)
+
+    def __getstate__(self):
+        # Copies and pickles hold data, angles and times as plain arrays, the storage of insert no longer
+        # backs them and is dropped, see reserve
+        state = super().__getstate__()
+        state['_buffer'] = None
+        state['_views'] = None
+        state.pop('_angle_buffer', None)
+        state.pop('_time_buffer', None)
+        return state
         
     def sort(self, bytime:bool = False):
         """
-        Sort the sinogram by angles or by time
+        Sort the sinogram by angles or by time. When the sinogram owns its data the projections are
+        reordered in-place, one projection at a time, instead of allocating a sorted copy.
         
         Args:
             bytime (bool): Sort by time instead of angles
         """
-        if bytime:
-            indices = np.argsort(self.times)
-            self.times = self.times[indices]
-            self.angles = self.angles[indices] 
-            self.data = self.data[indices,:,:]
+        indices, _ = self._sorted_index('times' if bytime else 'angles')
+        if np.array_equal(indices, np.arange(len(indices))):
+            return
+        if self._owns_storage():
+            _permute(self.data, indices)
+            if self._owns_buffer():
+                self.angles[:] = self.angles[indices]
+                self.times[:] = self.times[indices]
+            else:
+                self.angles = self.angles[indices]
+                self.times = self.times[indices]
+            self.invalidate()
         else:
-            indices = np.argsort(self.angles)
             self.angles = self.angles[indices]
             self.times = self.times[indices]
             self.data = self.data[indices,:,:]
+        if self.transforms is not None:
+            self.transforms = self.transforms[indices]
+        self._index = {}
+        self._pyramid = None
+
+    def _owns_storage(self) -> bool:
+        # Only data that owns its memory and is not shared with a live selection is changed in-place, angles
+        # and times are small and only changed in-place when they are views of the storage of insert
+        if self.data.ndim != 3 or _has_selections(self):
+            return False
+        return self._owns_buffer() or (isinstance(self.data, np.ndarray) and self.data.flags.owndata
+                                       and self.data.flags.writeable)
+
+    def _sorted_index(self, key: str):
+        # The order that sorts the angles or times and the sorted values, cached until the array is replaced
+        values = getattr(self, key)
+        if self._index.get(key) is None or self._index[key][0] is not values:
+            order = np.argsort(values, kind='stable')
+            self._index[key] = (values, order, np.asarray(values)[order])
+        return self._index[key][1:]
+
+    def select(self, angle_range: tuple | None = None, time_range: tuple | None = None, indices=None):
+        """
+        Select a subset of the projections. The subset shares the data of this sinogram whenever the
+        selected projections are evenly spaced in the stack, e.g. for a range of angles of a sorted
+        sinogram, otherwise the selected projections are copied. While a selection that shares the data
+        exists, ``sort`` and ``remove`` on this sinogram copy the data instead of changing it in-place.
+        Ranges are found by a binary search of the sorted angles or times.
+
+        Args:
+            angle_range (tuple | None): Only keep projections with ``min <= angle <= max`` (default: None)
+            time_range (tuple | None): Only keep projections with ``min <= time <= max`` (default: None)
+            indices (slice | numpy.ndarray | None): Only keep these projections (default: None)
+
+        Returns:
+            Sinogram: The selected projections
+        """
+        n = self.data.shape[0]
+        if isinstance(indices, slice):
+            selection = np.arange(n)[indices]
+        elif indices is not None:
+            selection = np.unique(np.arange(n)[np.asarray(indices)])
+        else:
+            selection = np.arange(n)
+
+        for key, bounds in (('angles', angle_range), ('times', time_range)):
+            if bounds is None:
+                continue
+            order, values = self._sorted_index(key)
+            start = np.searchsorted(values, bounds[0], side='left')
+            stop = np.searchsorted(values, bounds[1], side='right')
+            selection = np.intersect1d(selection, order[start:stop], assume_unique=True)
+
+        if isinstance(indices, slice) and angle_range is None and time_range is None:
+            view = indices
+        else:
+            view = _as_slice(selection)
+        sel = view if view is not None else selection
+
+        sino = Sinogram(self.data[sel], self.angles[sel], self.pixelsize, self.times[sel], dict(self.metadata))
+        if self.transforms is not None:
+            sino.transforms = self.transforms[sel]
+        if view is not None:
+            # sort and remove copy the data instead of changing it in-place while the selection exists
+            _register_selection(sino)
+        return sino
+
+    def reserve(self, capacity: int):
+        """
+        Preallocate storage for at least ``capacity`` projections, so that ``insert`` does not need to
+        reallocate during an acquisition. ``data``, ``angles`` and ``times`` become views of the filled
+        part of the storage.
+
+        Args:
+            capacity (int): The number of projections to allocate storage for
+        """
+        if self.data.ndim == 2:
+            self.data = self.data[None]
+        n = self.data.shape[0]
+        if self._owns_buffer() and self._buffer.shape[0] >= capacity:
+            return
+        capacity = max(capacity, n)
+
+        module = np if isinstance(self.data, np.ndarray) else xp.xupy
+        self._buffer = module.empty((capacity, *self.data.shape[1:]), dtype=self.data.dtype)
+        self._buffer[:n] = self.data
+        self._angle_buffer = np.empty(capacity, dtype=np.result_type(self.angles, float))
+        self._angle_buffer[:n] = self.angles
+        self._time_buffer = np.empty(capacity, dtype=np.result_type(self.times, float))
+        self._time_buffer[:n] = self.times
+        self._set_views(n)
+
+    def _owns_buffer(self) -> bool:
+        # False once data, angles or times have been replaced by anything other than the views of the storage
+        return (self._buffer is not None and self.data is self._views[0]
+                and self.angles is self._views[1] and self.times is self._views[2])
+
+    def _set_views(self, n: int):
+        self._views = (self._buffer[:n], self._angle_buffer[:n], self._time_buffer[:n])
+        self.data, self.angles, self.times = self._views
 
     def insert(self, img: np.ndarray, angle: float, time: float | None = None):
         """
-        Insert a new image into the sinogram
+        Insert a new image into the sinogram. The storage grows by doubling its capacity, so adding
+        projections one at a time during an acquisition costs amortised constant time per projection.
         
         Args:
             img (numpy.ndarray): The image to insert
@@ -89,59 +342,114 @@ class Sinogram(Data):
         if time is None:
             time = self.times[-1] + 1
 
-        if self.data.ndim == 2:
-            # If `self.data` is 2D, add a new first axis and stack `img`
-            self.data = np.stack((self.data, img), axis=0)
-        else:
-            # If `self.data` is already 3D, concatenate along the first axis
-            self.data = np.concatenate(    (self.data, img), axis=0)
-        #self.data = np.dstack((self.data, img))
-        self.angles = np.append(self.angles, angle)
-        self.times = np.append(self.times, time)
+        n = self.data.shape[0] if self.data.ndim == 3 else 1
+        if not self._owns_buffer() or self._buffer.shape[0] == n or not np.can_cast(img.dtype, self._buffer.dtype, 'same_kind'):
+            if self.data.ndim == 3 and not np.can_cast(img.dtype, self.data.dtype, 'same_kind'):
+                self.data = self.data.astype(np.result_type(self.data.dtype, img.dtype))
+            self._buffer = None
+            self.reserve(max(2 * n, 1))
+
+        self._buffer[n] = img
+        self._angle_buffer[n] = angle
+        self._time_buffer[n] = time
+        self._set_views(n + 1)
+        if self.transforms is not None:
+            self.transforms = np.concatenate((self.transforms, alignment.identity(1)), axis=0)
+        self._pyramid = None
 
     def remove(self, index: int):
         """
-        Remove an image from the sinogram
+        Remove an image from the sinogram. When the sinogram owns its data the following projections are
+        moved down in-place instead of allocating a new stack.
         
         Args:
             index (int): The index of the image to remove
         """
-        self.data = np.delete(self.data, index, axis=0)
-        self.angles = np.delete(self.angles, index)
-        self.times = np.delete(self.times, index)
+        n = self.data.shape[0]
+        index = index + n if index < 0 else index
+        if self._owns_storage():
+            for i in range(index, n - 1):
+                self.data[i] = self.data[i + 1]
+            if self._owns_buffer():
+                self.angles[index:-1] = self.angles[index + 1:].copy()
+                self.times[index:-1] = self.times[index + 1:].copy()
+                self._set_views(n - 1)
+            else:
+                self.data = self.data[:-1]
+                self.angles = np.delete(self.angles, index)
+                self.times = np.delete(self.times, index)
+            self.invalidate()
+        else:
+            self.data = np.delete(self.data, index, axis=0)
+            self.angles = np.delete(self.angles, index)
+            self.times = np.delete(self.times, index)
+        if self.transforms is not None:
+            self.transforms = np.delete(self.transforms, index, axis=0)
+        self._index = {}
+        self._pyramid = None
 
     @staticmethod
-    def _read_h5(filename):
-        f = h5py.File(filename, 'r')
-        nt = len(f.keys())-2
-        times = np.zeros(nt)
-        angles = np.zeros(nt)
-        for i in range(nt):
-            key = 'image '+str(i)
-            if i == 0:
-                nx, ny = f[key]['HAADF'].shape
-                data = xp.zeros([nx,ny,nt])
-            data[:,:,i] = f[key]['HAADF']
-            times[i] = np.array(f[key]['acquisition timee (s)']).item()
-            angles[i] = np.array(f[key]['alpha tilt (deg)']).item()
-        return Sinogram(data, angles, times=times)
+    def _read_h5(filename, projections: slice | None = None, **kwargs):
+        # Projections can be selected with a slice, only that hyperslab is read from disk
+        if projections is None:
+            projections = slice(None)
+        with h5py.File(filename, 'r') as f:
+            if 'data' not in f:
+                return Sinogram._read_h5_legacy(f, projections)
+            dataset = f['data']
+            data = dataset[projections]
+            angles = f['angles'][projections]
+            times = f['times'][projections] if 'times' in f else None
+            pixelsize = float(dataset.attrs.get('pixelsize', 1.0))
+        return Sinogram(xp.asarray(data), angles, pixelsize, times)
 
     @staticmethod
-    def _read_mrc(filename, **kwargs):
-        data, metadata = mrcz.readMRC(filename)
-        data = xp.asarray(data)
+    def _read_h5_legacy(f, projections):
+        # One group per image as written by the acquisition software
+        indices = range(len(f.keys()) - 2)[projections]
+        nx, ny = f['image 0']['HAADF'].shape
+        data = np.empty((len(indices), nx, ny), dtype=f['image 0']['HAADF'].dtype)
+        times = np.zeros(len(indices))
+        angles = np.zeros(len(indices))
+        for i, index in enumerate(indices):
+            group = f['image ' + str(index)]
+            group['HAADF'].read_direct(data, dest_sel=np.s_[i])
+            times[i] = np.array(group['acquisition timee (s)']).item()
+            angles[i] = np.array(group['alpha tilt (deg)']).item()
+        return Sinogram(xp.asarray(data), angles, times=times)
+
+    def _write_h5(self, filename, compression: str | None = None, compression_opts=None, **kwargs):
+        # Chunked per projection so that single projections can be read back without decompressing the rest
+        data = xp.asarray(self.data, GPUContext.NUMPY)
+        with h5py.File(filename, 'w') as f:
+            dataset = f.create_dataset('data', data=data, chunks=(1, *data.shape[1:]),
+                                       compression=compression, compression_opts=compression_opts,
+                                       shuffle=compression is not None)
+            dataset.attrs['pixelsize'] = self.pixelsize
+            f.create_dataset('angles', data=np.asarray(self.angles, dtype=float))
+            f.create_dataset('times', data=np.asarray(self.times, dtype=float))
+
+    @staticmethod
+    def _read_mrc(filename, mmap: bool = True, **kwargs):
+        # Uncompressed files are memory-mapped copy-on-write, pages are only read from disk when they are accessed
+        # and changes are never written back. MRCZ compressed files are always decompressed into memory.
+        data, metadata = mrcz.readMRC(filename, useMemmap=mmap)
+        if not isinstance(data, np.memmap):
+            data = xp.asarray(data)
         pixelsize = metadata['pixelsize'][0]
+        if 'angles' not in metadata:
+            raise ValueError(f"The file {filename} does not contain tilt angles.")
         angles = metadata['angles']
         if 'times' in metadata:
             times = metadata['times']
         else:
-            times = np.linspace(1, len(angles), len(angles)+1)
+            times = np.linspace(1, len(angles), len(angles))
         return Sinogram(data, angles, pixelsize, times)
 
 
     @staticmethod
     def _read_mat(path):
-        obj = loadmat(path)
+        obj = sio.loadmat(path)
         #if obj has a series or stack key
         
         if 'series' in obj:
@@ -166,43 +474,79 @@ class Sinogram(Data):
     def _write_mrc(self, filename, **kwargs):
         mrcz.writeMRC(self.data, filename, meta={'angles': self.angles, 'times': self.times}, pixelsize=[self.pixelsize, self.pixelsize, self.pixelsize])
 
+    @staticmethod
+    def _read_tiff(filename, projections: slice | None = None, mmap: bool = True, **kwargs):
+        data, metadata = tiff.read_stack(filename, projections, mmap)
+        if 'angles' not in metadata:
+            raise ValueError(f"The file {filename} does not contain tilt angles.")
+        if projections is None:
+            projections = slice(None)
+        angles = np.asarray(metadata['angles'])[projections]
+        times = np.asarray(metadata['times'])[projections] if 'times' in metadata else None
+        return Sinogram(data, angles, metadata.get('pixelsize', 1.0), times)
+
+    def _write_tiff(self, filename, compression: str | None = None, **kwargs):
+        pages = (xp.asarray(self.data[i], GPUContext.NUMPY) for i in range(self.data.shape[0]))
+        metadata = {'angles': np.asarray(self.angles, dtype=float).tolist(),
+                    'times': np.asarray(self.times, dtype=float).tolist(),
+                    'pixelsize': float(self.pixelsize)}
+        tiff.write_stack(filename, pages, self.data.shape, self.data.dtype, metadata, compression)
+
+    @staticmethod
+    def _read_chunked(filename, level: int = 0, **kwargs):
+        # The data is a lazy ChunkedArray, level selects a copy with binned projections
+        data, metadata = chunked.open_store(filename, level)
+        pixelsize = metadata.get('pixelsize', 1.0) * metadata['levels'][level]['scale'][1]
+        return Sinogram(data, np.asarray(metadata['angles']), pixelsize, np.asarray(metadata['times']))
+
+    def _write_chunked(self, filename, chunks: tuple | None = None, levels: int | None = None, **kwargs):
+        # Projections are chunked individually by default and only binned in-plane
+        if chunks is None:
+            chunks = (1, *[min(256, s) for s in self.data.shape[1:]])
+        metadata = {'angles': np.asarray(self.angles, dtype=float).tolist(),
+                    'times': np.asarray(self.times, dtype=float).tolist(),
+                    'pixelsize': float(self.pixelsize)}
+        chunked.write_store(filename, self.data, (1, 2, 2), chunks, levels, metadata)
+
     def _write_mat(self, filename, **kwargs):
         myrec = {'data':self.data, 'angles':self.angles, 'pixelsize':self.pixelsize, 'times':self.times} 
-        savemat(filename, {'obj': myrec})
+        sio.savemat(filename, {'obj': myrec})
     
     @staticmethod
-    def _read_emi_stack(filename, **kwargs):
-        # List all EMI files in the directory of the selected file
+    def _read_emi_stack(filename, max_workers: int | None = None, **kwargs):
+        # List all EMI files in the directory of the selected file once and sort them by the tilt in their headers
         dirname = os.path.dirname(os.path.realpath(filename))
-        filenames = glob.glob(dirname + "*.emi")
-        # Read the first file for image size and metadata
-        im = Image.from_file(filenames[0])
-        data = np.zeros((len(filenames), im.data.shape[0], im.data.shape[1] ))
-        angles = np.zeros(len(filenames))
-        # Set the contents of the first file
-        data[0, :, :] = im.data
-        angles[0] = im.metadata['alpha_tilt']
-        pixelsize = im.pixelsize
-        # Loop over the other files to get all the projection images
-        for i, filename in enumerate(filenames[1:], start=1):
-            im = Image.from_file(filenames[0])
-            data[i, :, :] = im.data
-            angles[i] = im.metadata['alpha_tilt']
-        # Sort the images by tilt angle and return the sinogram
-        sorted_indices = np.argsort(angles)
-        data = data[:, :, sorted_indices]
-        angles = angles[sorted_indices]
-        return Sinogram(data, angles, pixelsize)
+        filenames = sorted(glob.glob(os.path.join(dirname, "*.emi")))
+        angles = np.array([_read_emi_tilt(name) for name in filenames])
+        order = np.argsort(angles)
+        angles = angles[order]
+        filenames = [filenames[i] for i in order]
+
+        # Preallocate the stack in the native pixel type and load the projections concurrently, in angle order
+        _, shape, dtype, pixelsize = _read_ser_header(_ser_filename(filenames[0]))
+        data = np.empty((len(filenames), shape[1], shape[0]), dtype=dtype)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(lambda i: _read_ser(_ser_filename(filenames[i]), out=data[i]), range(len(filenames))))
+        return Sinogram(xp.asarray(data), angles, pixelsize)
 
     _readers = {}
     _writers = {
+        'h5': _write_h5,
+        'hdf5': _write_h5,
         'mrc': _write_mrc,
         'mat': _write_mat,
         'ali': _write_mrc,
+        'tif': _write_tiff,
+        'tiff': _write_tiff,
+        'chunks': _write_chunked,
     }
     
 
 
+    def _multiscale_factors(self):
+        # Projections are only downsampled in-plane
+        return (1,) + (2,) * (self.data.ndim - 1)
+
     def layer_attributes(self, attributes={}):
         attr = super().layer_attributes(attributes)
         attr['name'] = attributes.get('name', 'Sinogram')
@@ -220,13 +564,13 @@ class Sinogram(Data):
     @classmethod
     def from_data_tuple(cls, layer, attributes=None):
         if attributes is None:
-            data = layer.data
+            data = layer.data[0] if getattr(layer, 'multiscale', False) else layer.data
             scale = layer.scale[0]
             times = layer.metadata['ct metadata']['times']
             angles = layer.metadata['ct metadata']['angles']
             layer_metadata = layer.metadata['ct metadata']
         else:
-            data = layer
+            data = layer[0] if attributes.get('multiscale', False) else layer
             scale = attributes['scale'][0]
             layer_metadata = attributes['metadata']['ct metadata']
             times =attributes['metadata']['ct metadata']['times']
@@ -246,4 +590,8 @@ Sinogram._readers = {
     'emi': Sinogram._read_emi_stack,
     'mat': Sinogram._read_mat,
     'h5': Sinogram._read_h5,
+    'hdf5': Sinogram._read_h5,
+    'tif': Sinogram._read_tiff,
+    'tiff': Sinogram._read_tiff,
+    'chunks': Sinogram._read_chunked,
 }
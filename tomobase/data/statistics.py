@@ -0,0 +1,78 @@
+"""
+Cached statistics of the array of a Data object.
+
+The values are computed on first use and kept until the data is reassigned or
+a process has run on the object, see ``Data.invalidate``. Every statistic can
+also be estimated from a strided subsample, which is cached separately and is
+meant for interactive use such as contrast limits.
+"""
+import numpy as np
+
+from ..registrations.environment import xp
+from .chunked import ChunkedArray
+
+
+class DataStatistics:
+    """Cached statistics of the array of a Data object.
+
+    Args:
+        owner (Data): The data object whose array is described
+        samples (int): The approximate number of values used for subsampled estimates (default: 2**20)
+    """
+
+    def __init__(self, owner, samples: int = 2**20):
+        self._owner = owner
+        self._samples = samples
+        self._cache = {}
+
+    def invalidate(self):
+        """Forget all cached values"""
+        self._cache.clear()
+
+    def _array(self, subsample: bool):
+        data = self._owner.data
+        if not subsample:
+            return data
+        if isinstance(data, ChunkedArray):
+            # Chunked stores are estimated from their coarsest level to avoid decompressing every chunk
+            data = np.asarray(self._owner.multiscale()[-1])
+        step = max(1, int(np.ceil((data.size / self._samples) ** (1 / data.ndim))))
+        return data[(slice(None, None, step),) * data.ndim]
+
+    def _get(self, name: str, subsample: bool, compute, *args):
+        key = (name, subsample, *args)
+        if key not in self._cache:
+            self._cache[key] = compute(self._array(subsample), *args)
+        return self._cache[key]
+
+    def min(self, subsample: bool = False) -> float:
+        return self._get('min', subsample, lambda data: float(xp.xupy.min(data)))
+
+    def max(self, subsample: bool = False) -> float:
+        return self._get('max', subsample, lambda data: float(xp.xupy.max(data)))
+
+    def mean(self, subsample: bool = False) -> float:
+        return self._get('mean', subsample, lambda data: float(xp.xupy.mean(data)))
+
+    def std(self, subsample: bool = False) -> float:
+        return self._get('std', subsample, lambda data: float(xp.xupy.std(data)))
+
+    def median(self, subsample: bool = False) -> float:
+        return self._get('median', subsample, lambda data: float(xp.xupy.median(data)))
+
+    def histogram(self, bins: int = 256, subsample: bool = False):
+        """The histogram of the values between the minimum and maximum.
+
+        Args:
+            bins (int): The number of bins (default: 256)
+            subsample (bool): Estimate from a strided subsample (default: False)
+
+        Returns:
+            tuple: The counts and the bin edges, see ``numpy.histogram``
+        """
+        bounds = (self.min(subsample), self.max(subsample))
+        return self._get('histogram', subsample, lambda data, bins: xp.xupy.histogram(data, bins=bins, range=bounds), bins)
+
+    def otsu(self, subsample: bool = False) -> float:
+        """The Otsu threshold of the values"""
+        return self._get('otsu', subsample, lambda data: float(xp.skimage.filters.threshold_otsu(data)))
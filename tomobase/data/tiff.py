@@ -0,0 +1,67 @@
+"""
+Page-by-page reading and writing of multi-page TIFF stacks.
+
+Every page holds one 2D image of the stack, the first page carries the
+metadata of the dataset as a JSON image description. Uncompressed stacks are
+written contiguously so they can be memory-mapped when they are read back.
+"""
+import json
+import numpy as np
+
+from ..lazy import lazy_import
+
+tifffile = lazy_import('tifffile')
+
+
+def read_stack(filename, pages: slice | None = None, mmap: bool = True):
+    """Read a range of pages of a TIFF stack.
+
+    Args:
+        filename (str): The TIFF file
+        pages (slice | None): The pages to read, all pages are read if None (default: None)
+        mmap (bool): Memory-map the file copy-on-write when the pixels are stored uncompressed and contiguously (default: True)
+
+    Returns:
+        numpy.ndarray: The ``(pages, rows, columns)`` stack
+        dict: The metadata stored in the description of the first page
+    """
+    if pages is None:
+        pages = slice(None)
+    with tifffile.TiffFile(filename) as tif:
+        try:
+            metadata = json.loads(tif.pages[0].description)
+        except (ValueError, TypeError):
+            metadata = {}
+        indices = range(len(tif.pages))[pages]
+
+        if mmap:
+            try:
+                # A single page is mapped as a 2D image, it is read as a stack of one page
+                stack = tifffile.memmap(filename, mode='c')
+                return stack.reshape(-1, *stack.shape[-2:])[pages], metadata
+            except ValueError:
+                pass
+
+        first = tif.pages[indices[0]]
+        data = np.empty((len(indices), *first.shape), dtype=first.dtype)
+        for i, index in enumerate(indices):
+            tif.pages[index].asarray(out=data[i])
+    return data, metadata
+
+
+def write_stack(filename, pages, shape: tuple, dtype, metadata: dict = {}, compression: str | None = None):
+    """Write a TIFF stack one page at a time.
+
+    Args:
+        filename (str): The TIFF file
+        pages (Iterable[numpy.ndarray]): The 2D pages, they may be generated lazily
+        shape (tuple): The ``(pages, rows, columns)`` shape of the full stack
+        dtype (numpy.dtype): The data type of the pages
+        metadata (dict): JSON serialisable metadata stored in the description of the first page (default: {})
+        compression (str | None): The compression of each page, e.g. 'zlib' (default: None)
+    """
+    nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    with tifffile.TiffWriter(filename, bigtiff=nbytes > 2**32 - 2**25) as tif:
+        for i, page in enumerate(pages):
+            tif.write(np.ascontiguousarray(page, dtype=dtype), contiguous=compression is None, compression=compression,
+                      metadata=None, description=json.dumps(metadata) if i == 0 else None)
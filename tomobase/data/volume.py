@@ -3,7 +3,13 @@ import copy
 from copy import deepcopy
 
 from .base import Data 
+from . import tiff, chunked
 from ..registrations.datatypes import TOMOBASE_DATATYPES
+from ..registrations.environment import GPUContext, xp
+from ..lazy import lazy_import
+
+h5py = lazy_import('h5py')
+mrcz = lazy_import('mrcz')
 
 def _rescale(data, lower=0, upper=1, inplace=True):
     """Rescale data by scaling it to a given range.
@@ -25,8 +31,9 @@ def _rescale(data, lower=0, upper=1, inplace=True):
     if not inplace:
         data = copy(data)
 
-    minValue = data.data.min()
-    maxValue = data.data.max()
+    data.ensure_writable()
+    minValue = data.statistics.min()
+    maxValue = data.statistics.max()
 
     if minValue == maxValue:
         raise ValueError('Cannot normalize a uniform array.')
@@ -34,6 +41,7 @@ def _rescale(data, lower=0, upper=1, inplace=True):
     data.data -= minValue
     data.data *= (upper - lower) / (maxValue - minValue)
     data.data += lower
+    data.invalidate()
 
     return data
 
@@ -43,7 +51,10 @@ class Volume(Data):
 
     Supported file formats:
         - .rec
-        - .tiff
+        - .mrc
+        - .h5 (chunked per z-slice, optionally compressed with ``compression='gzip'`` or ``'lzf'``)
+        - .tiff (one page per z-slice)
+        - .chunks (a chunked multiscale directory, opened lazily)
 
     Attributes:
         data (numpy.ndarray): The data represented by voxels. The data is indexed using  (y, x, z) notation
@@ -65,6 +76,7 @@ class Volume(Data):
     
     @staticmethod
     def _read_rec(filename, normalize=True, **kwargs):
+        # The data is memory-mapped copy-on-write and exposed as a (y, x, z) view, only normalizing copies it
         with open(filename, 'rb') as f:
             # Data dimensions and type
             nx, ny, nz = np.fromfile(f, count=3, dtype='int32')
@@ -81,26 +93,24 @@ class Volume(Data):
                 raise ValueError("Unsupported datatype in REC data.")
 
             # Pixel size in nm
-            f.seek(10)
-            cell_size = np.fromfile(f, count=1, dtype='int32')
-            pixelsize = cell_size.astype('float32') / nx
+            f.seek(40)
+            cell_size = np.fromfile(f, count=1, dtype='float32')
+            pixelsize = cell_size.item() / nx
 
             # Skip header
             f.seek(92)
             header_size = np.fromfile(f, count=1, dtype='int32')
-            f.seek(1024 + header_size.item())
+            offset = 1024 + header_size.item()
 
-            # Read data
-            data = np.fromfile(f, count=nx*ny*nz, dtype=datatype)
-            data = np.reshape(data, [nx, ny, nz], order='F')
-            data = np.transpose(data, (1, 0, 2))
+        data = np.memmap(filename, dtype=datatype, mode='c', offset=offset, shape=(nx, ny, nz), order='F')
+        data = np.transpose(data, (1, 0, 2))
 
-            if normalize:
-                return _rescale(Volume(data.astype(float), pixelsize=1.0))
-            else:
-                return Volume(data, pixelsize)
+        if normalize:
+            return _rescale(Volume(xp.asarray(data, dtype=float), pixelsize=pixelsize))
+        else:
+            return Volume(data, pixelsize)
 
-    def _write_rec(self, filename, normalize=True, **kwargs):
+    def _write_rec(self, filename, normalize=True, chunksize=2**26, **kwargs):
         # Convert data to (X, Y, Z)
         data = np.transpose(self.data, (1, 0, 2))
 
@@ -109,12 +119,16 @@ class Volume(Data):
         header[:3] = data.shape  # Array dimensions
         if data.dtype == np.uint8 or normalize:
             header[3] = 0
+            dtype = np.uint8
         elif data.dtype == np.int16:
             header[3] = 1
+            dtype = np.int16
         elif data.dtype == np.float32:
             header[3] = 2
+            dtype = np.float32
         elif data.dtype == np.uint16:
             header[3] = 6
+            dtype = np.uint16
         else:
             raise TypeError("Unsupported data type for writing in REC file.")
         # Sampling along X, Y and Z. Same as array dimensions
@@ -123,27 +137,82 @@ class Volume(Data):
         dimensions = self.pixelsize * np.array(data.shape, dtype='float32')
         header[10:13] = dimensions.view('int32')
 
-        data = data.flatten(order='F')
         if normalize:
-            data = data.astype(np.float32)
-            data -= data.min()
-            data *= 255 / data.max()
-            data = data.astype('uint8')
+            lower = np.float32(data.min())
+            upper = np.float32(data.max()) - lower
+            scale = 255 / upper if upper > 0 else 0.0
 
+        # Stream slabs of z-slices, the file stores x fastest followed by y and z
+        nx, ny, nz = data.shape
+        step = max(1, chunksize // (nx * ny * data.itemsize))
         with open(filename, 'wb') as f:
             header.tofile(f)
-            data.tofile(f)
+            for z in range(0, nz, step):
+                slab = np.transpose(data[:, :, z:z + step], (2, 1, 0))
+                if normalize:
+                    slab = slab.astype(np.float32)
+                    slab -= lower
+                    slab *= scale
+                np.ascontiguousarray(slab, dtype=dtype).tofile(f)
+
+    @staticmethod
+    def _read_mrc(filename, mmap: bool = True, **kwargs):
+        # MRC stores the volume as (z, y, x), uncompressed files are memory-mapped copy-on-write
+        data, metadata = mrcz.readMRC(filename, useMemmap=mmap)
+        data = np.transpose(data, (1, 2, 0))
+        return Volume(data, metadata['pixelsize'][0])
+
+    def _write_mrc(self, filename, **kwargs):
+        data = np.ascontiguousarray(np.transpose(self.data, (2, 0, 1)))
+        mrcz.writeMRC(data, filename, pixelsize=[self.pixelsize, self.pixelsize, self.pixelsize], **kwargs)
+
+    @staticmethod
+    def _read_h5(filename, slices: slice | None = None, **kwargs):
+        # A range of z-slices can be selected with a slice, only that hyperslab is read from disk
+        if slices is None:
+            slices = slice(None)
+        with h5py.File(filename, 'r') as f:
+            dataset = f['data']
+            data = dataset[:, :, slices]
+            pixelsize = float(dataset.attrs.get('pixelsize', 1.0))
+        return Volume(data, pixelsize)
+
+    def _write_h5(self, filename, compression: str | None = None, compression_opts=None, **kwargs):
+        data = xp.asarray(self.data, GPUContext.NUMPY)
+        with h5py.File(filename, 'w') as f:
+            dataset = f.create_dataset('data', data=data, chunks=(*data.shape[:2], 1),
+                                       compression=compression, compression_opts=compression_opts,
+                                       shuffle=compression is not None)
+            dataset.attrs['pixelsize'] = self.pixelsize
+
+    @staticmethod
+    def _read_tiff(filename, slices: slice | None = None, mmap: bool = True, **kwargs):
+        # Every page is a z-slice, the (z, y, x) stack is exposed as a (y, x, z) view
+        data, metadata = tiff.read_stack(filename, slices, mmap)
+        return Volume(np.transpose(data, (1, 2, 0)), metadata.get('pixelsize', 1.0))
+
+    def _write_tiff(self, filename, compression: str | None = None, **kwargs):
+        y, x, z = self.data.shape
+        pages = (xp.asarray(self.data[:, :, i], GPUContext.NUMPY) for i in range(z))
+        tiff.write_stack(filename, pages, (z, y, x), self.data.dtype, {'pixelsize': float(self.pixelsize)}, compression)
 
     @staticmethod
-    def _read_tiff(filename, **kwargs):
-        raise NotImplementedError
+    def _read_chunked(filename, level: int = 0, **kwargs):
+        # The data is a lazy ChunkedArray, level selects a downsampled copy
+        data, metadata = chunked.open_store(filename, level)
+        pixelsize = metadata.get('pixelsize', 1.0) * metadata['levels'][level]['scale'][0]
+        return Volume(data, pixelsize)
 
-    def _write_tiff(self, filename, **kwargs):
-        raise NotImplementedError
+    def _write_chunked(self, filename, chunks: tuple | None = None, levels: int | None = None, **kwargs):
+        chunked.write_store(filename, self.data, (2, 2, 2), chunks, levels, {'pixelsize': float(self.pixelsize)})
 
     _readers = {}
     _writers = {
         'rec': _write_rec,
+        'mrc': _write_mrc,
+        'h5': _write_h5,
+        'hdf5': _write_h5,
+        'chunks': _write_chunked,
         'tif': _write_tiff,
         'tiff': _write_tiff,
     }
@@ -155,7 +224,6 @@ class Volume(Data):
         attr['scale'] = attributes.get('pixelsize', (self.pixelsize, self.pixelsize, self.pixelsize))
         attr['colormap'] = attributes.get('colormap', 'magma')
         attr['rendering'] = attributes.get('rendering', 'attenuated_mip')
-        attr['contrast_limits'] = attributes.get('contrast_limits', [0, np.max(self.data)*1.5])
         return attr
 
     
@@ -170,6 +238,10 @@ class Volume(Data):
 
 Volume._readers = {
     'rec': Volume._read_rec,
+    'mrc': Volume._read_mrc,
+    'h5': Volume._read_h5,
+    'hdf5': Volume._read_h5,
+    'chunks': Volume._read_chunked,
     'tif': Volume._read_tiff,
     'tiff': Volume._read_tiff,
 }
@@ -8,13 +8,18 @@ import re
 from functools import wraps
 from tomobase.registrations.environment import xp, GPUContext
 from tomobase.data.base import Data
+from tomobase.registrations.transforms import TOMOBASE_TRANSFORM_CATEGORIES
 from inspect import signature, Parameter
 from typing import Union
 from collections.abc import Callable, Iterable
 import makefun
+import numpy as np
 
 
 from .log import logger
+from . import profiling
+from . import cache
+from . import planner
 
 def phantom_hook(name:str| None= None) -> Callable:
     #use sphynx style
@@ -28,12 +33,18 @@ def phantom_hook(name:str| None= None) -> Callable:
         Callable: The decorated function.
     """
     def decorator(func):
-        if name is None:
-            name = func.__name__.replace('_', ' ')
-        func.tomobase_name = name
-        func.is_tomobase_phantom = True
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key, entry = cache.lookup(func, args, kwargs)
+            if entry is not None:
+                return entry['results']
+            result = func(*args, **kwargs)
+            cache.store(key, result, kwargs)
+            return result
 
-        return func
+        wrapper.tomobase_name = name if name is not None else func.__name__.replace('_', ' ')
+        wrapper.is_tomobase_phantom = True
+        return wrapper
     return decorator
 
 def tiltscheme_hook(name: str) -> Callable:
@@ -60,19 +71,27 @@ def tomobase_hook_process(**kwargs):
         includes (list[enum.DataModules]): a list of data types that the process can handle. Either Numpy Cupy or Torch.
         excludes (list[enum.DataModules]): a list of strings that define the data types that the process cannot handle. Cannot define both includes and excludes
         subcategories (dict(enum.TransformCategory,[list[str]])): a list of strings that define the subcategories of the process. Used when adding the process to the napari menu.
+        kernel (Callable): an optional factory ``kernel(obj, **kwargs)`` returning a function that applies the process element-wise to a slab of ``obj.data``. Used by tomobase.pipeline to fuse consecutive element-wise steps into a single pass.
+        kernel_statistics (bool): whether the kernel uses statistics of ``obj``, such steps can only start a fused pass (default: False)
+        cacheable (bool): whether results may be reused from tomobase.cache when it is enabled. Processes that draw random numbers must set this to False (default: True)
+        memory (Callable): an optional model ``memory(shape, dtype, **kwargs)`` of the bytes the process allocates for input data of ``shape`` and ``dtype``, its output included. Used by tomobase.planner to estimate the peak memory of a call.
+        slabbed (bool): whether the process splits its work with tomobase.planner to stay within the memory budget. Calls of other processes with a memory model log a warning when they are estimated to exceed the budget (default: False)
     """
     use_numpy = kwargs.get("use_numpy", False)
     isquantification = kwargs.get("isquantification", False)
     units = kwargs.get("units", None)
+    # Alignment processes handle deferred transforms themselves, every other process consumes materialised data
+    materialise = kwargs.get("category", None) != TOMOBASE_TRANSFORM_CATEGORIES.ALIGN.value
+    cacheable = kwargs.get("cacheable", True)
     def decorator(obj):
         if inspect.isfunction(obj):
-                wrapper = _function_wrapper(obj, use_numpy, isquantification, units)
+                wrapper = _function_wrapper(obj, use_numpy, isquantification, units, materialise, cacheable)
         obj = _registration(wrapper, **kwargs)
         return obj
     return decorator
 
 
-def _function_wrapper(func, use_numpy, isquantification, units=None):
+def _function_wrapper(func, use_numpy, isquantification, units=None, materialise=True, cacheable=True):
     original_sig = signature(func)
     params = list(original_sig.parameters.values())
 
@@ -112,22 +131,24 @@ def _function_wrapper(func, use_numpy, isquantification, units=None):
         if use_numpy:
             xp.set_context(GPUContext.NUMPY, 0)
         context = xp.get_context()
-        for key, value in kwargs.items():
-            if isinstance(value, dict):
-                for subkey, subvalue in value.items():
-                    if isinstance(subvalue, Data):
-                        if not inplace:
-                            subvalue = deepcopy(subvalue)
-                        subvalue.set_context()
-            if isinstance(value, Data):
+        with profiling.record(func.__name__, kwargs) as call:
+            key, entry = cache.lookup(func, args, kwargs) if cacheable else (None, None)
+            if entry is not None:
+                results = cache.restore(entry, kwargs, inplace)
+            else:
+                _check_budget(wrapper, kwargs)
+                # Processes that write to their inputs in-place must call ensure_writable first, inputs of
+                # calls with inplace=False share the data of the caller read-only
+                kwargs = _prepare_inputs(kwargs, inplace, materialise)
+                results = _run(func, isquantification, object_name if isquantification else None, units, args, kwargs)
                 if not inplace:
-                    kwargs[key] = deepcopy(value)
-                kwargs[key].set_context()
-        if isquantification:
-            results = _quantify(func, object_name, units, *args, **kwargs)
-        else:
-            results = func(*args, **kwargs)
-        xp.set_context(context)
+                    _detach(results)
+                cache.store(key, results, kwargs)
+            # Processes may have written to the data in-place, cached statistics are no longer valid
+            for item in _data_inputs(kwargs):
+                item.invalidate()
+            call.output(results)
+        xp.set_context(context["context"], context["device"])
         if isinstance(results, tuple) and verbose_outputs == False:
             return results[0]
         else:
@@ -135,6 +156,62 @@ def _function_wrapper(func, use_numpy, isquantification, units=None):
 
     return wrapper
 
+def _check_budget(process, kwargs):
+    # The main input is the first Data argument, the memory models take the other arguments
+    for key, value in kwargs.items():
+        if isinstance(value, Data):
+            others = {k: v for k, v in kwargs.items() if k != key}
+            planner.check(process, value, **others)
+            return
+
+
+def _prepare_input(value, inplace, materialise):
+    if not isinstance(value, Data):
+        return value
+    if not inplace:
+        # Share the data read-only unless the data cannot be made read-only (e.g. cupy), see _detach
+        if not isinstance(value.data, np.ndarray):
+            value = deepcopy(value)
+        else:
+            value = value._copy_on_write()
+    value._set_context()
+    if materialise:
+        value._materialise()
+    return value
+
+
+def _prepare_inputs(kwargs, inplace, materialise):
+    prepared = {}
+    for key, value in kwargs.items():
+        if isinstance(value, dict):
+            prepared[key] = {subkey: _prepare_input(subvalue, inplace, materialise) for subkey, subvalue in value.items()}
+        else:
+            prepared[key] = _prepare_input(value, inplace, materialise)
+    return prepared
+
+
+def _detach(results):
+    # Results of calls with inplace=False may still be read-only views of the data of the caller, e.g. when the
+    # process returned its input unchanged. They are copied so that the caller owns writable, independent data
+    for item in (results if isinstance(results, tuple) else (results,)):
+        for value in (item.values() if isinstance(item, dict) else (item,)):
+            if isinstance(value, Data):
+                value.ensure_writable()
+
+
+def _data_inputs(kwargs):
+    for value in kwargs.values():
+        for item in (value.values() if isinstance(value, dict) else [value]):
+            if isinstance(item, Data):
+                yield item
+
+
+def _run(func, isquantification, object_name, units, args, kwargs):
+    if isquantification:
+        return _quantify(func, object_name, units, *args, **kwargs)
+    return func(*args, **kwargs)
+
+
 def _quantify(func, object_name, units, *args, **kwargs):
     object = kwargs.pop(object_name, None)
     if not isinstance(object, dict):
@@ -184,6 +261,12 @@ def _registration(obj, **kwargs):
     obj.tomobase_category = kwargs.get("category", None)
     obj.tomobase_subcategories = deepcopy(kwargs.get("subcategories", []))
     obj.tomobase_quantification = kwargs.get("isquantification", False)
+    # Optional element-wise kernel factory used by tomobase.pipeline to fuse steps, see Pipeline
+    obj.tomobase_kernel = kwargs.get("kernel", None)
+    obj.tomobase_kernel_statistics = kwargs.get("kernel_statistics", False)
+    obj.tomobase_cacheable = kwargs.get("cacheable", True)
+    obj.tomobase_memory = kwargs.get("memory", None)
+    obj.tomobase_slabbed = kwargs.get("slabbed", False)
     if obj.tomobase_category is None:
         raise ValueError("category is required")
     
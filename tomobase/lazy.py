@@ -0,0 +1,81 @@
+"""
+Deferred imports of heavy optional backends.
+
+Modules such as astra, h5py, mrcz, plotly and magicgui take tens to hundreds
+of milliseconds to import. They are only needed by a few processes and file
+formats, so tomobase refers to them through proxies that import the module
+the first time one of its attributes is used:
+
+    astra = lazy_import('astra')
+    astra.creators.create_vol_geom(...)   # astra is imported here
+"""
+import importlib
+
+
+class LazyModule:
+    """A proxy of a module that is imported when one of its attributes is first accessed.
+
+    Args:
+        name (str): The absolute name of the module, e.g. 'scipy.optimize'
+    """
+
+    def __init__(self, name: str):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            module = importlib.import_module(self.__dict__['_name'])
+            self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._load(), name, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'imported' if self.__dict__['_module'] is not None else 'not imported'
+        return f"<lazy module '{self.__dict__['_name']}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Refer to a module without importing it until it is used.
+
+    Args:
+        name (str): The absolute name of the module
+
+    Returns:
+        LazyModule: A proxy of the module
+    """
+    return LazyModule(name)
+
+
+def lazy_callable(module: str, name: str):
+    """Refer to a function or class of a module without importing the module until it is called.
+
+    Args:
+        module (str): The absolute name of the module
+        name (str): The name of the callable in the module
+
+    Returns:
+        Callable: A function forwarding its arguments to the callable
+    """
+    proxy = LazyModule(module)
+
+    def call(*args, **kwargs):
+        return getattr(proxy, name)(*args, **kwargs)
+    call.__name__ = name
+    call.__qualname__ = name
+    call.__doc__ = f"Deferred {module}.{name}, see its documentation."
+    return call
+
+
+# Progress bars of processes, magicgui shows them in napari and falls back to tqdm elsewhere
+tqdm = lazy_callable('magicgui.tqdm', 'tqdm')
+trange = lazy_callable('magicgui.tqdm', 'trange')
@@ -2,8 +2,7 @@ import numpy as np
 from ..data import Volume
 from ..hooks import phantom_hook
 
-from magicgui import magicgui
-from magicgui.tqdm import trange, tqdm
+from ..lazy import trange, tqdm
 
 @phantom_hook()
 def get_nanorod(dim:int=512,length:int=300,radius:int=100,proportion:float=0.5,intensity:float=0.3):
@@ -35,21 +34,24 @@ def get_nanorod(dim:int=512,length:int=300,radius:int=100,proportion:float=0.5,i
     L = length - 2*radius
 
     z1, z2 = dim//2 - L//2, dim//2 + L//2
-    for i in tqdm(range(dim), label="building nanorod slice by slice"):
-        if i >= z1 and i <= z2:
-            obj[:,:,i] = img
-
-    sphere = np.zeros((dim,dim,dim),dtype=np.float32)
-    X,Y,Z = np.meshgrid(x,y,z)
-    sphere1 = (X**2 + Y**2 + Z**2) <= pradius**2
-    a,b,c = pradius*proportion, pradius*proportion, pradius
-    sphere2 = ((X**2)/(a**2) + (Y**2)/(b**2) + (Z**2)/(c**2)) <= 1
-    sphere[sphere1>0] = intensity
-    sphere[sphere2>0] = 1
-
     y1,y2 = dim//2 + radius, dim//2 - radius
     xz1,xz2 = dim//2 - radius, dim//2 + radius
     top_limit,bottom_limit  = z2+radius, z1-radius
-    obj[xz1:xz2, xz1:xz2, z2:top_limit] = sphere[xz1:xz2, xz1:xz2, dim//2:y1] 
-    obj[xz1:xz2, xz1:xz2, bottom_limit:z1] = sphere[xz1:xz2, xz1:xz2, y2:dim//2]
+
+    # The caps are cut from the slices of a sphere of the radius of the rod, every slice is built from the 2D
+    # grid instead of a 3D meshgrid of the whole volume
+    a,b,c = pradius*proportion, pradius*proportion, pradius
+    def sphere(j):
+        plane = np.zeros((dim,dim),dtype=np.float32)
+        plane[(X**2 + Y**2 + z[j]**2) <= pradius**2] = intensity
+        plane[((X**2)/(a**2) + (Y**2)/(b**2) + (z[j]**2)/(c**2)) <= 1] = 1
+        return plane[xz1:xz2, xz1:xz2]
+
+    for i in tqdm(range(max(0, min(z1, bottom_limit)), min(dim, max(z2 + 1, top_limit))), label="building nanorod slice by slice"):
+        if i >= z1 and i <= z2:
+            obj[:,:,i] = img
+        if i >= z2 and i < top_limit:
+            obj[xz1:xz2, xz1:xz2, i] = sphere(dim//2 + i - z2)
+        if i >= bottom_limit and i < z1:
+            obj[xz1:xz2, xz1:xz2, i] = sphere(y2 + i - bottom_limit)
     return Volume(obj)
@@ -0,0 +1,213 @@
+"""
+Lazy execution of chains and graphs of registered processes.
+
+A :class:`Pipeline` records processes from ``TOMOBASE_PROCESSES`` as the nodes of
+a directed acyclic graph and only runs them when a result is requested.
+Consecutive element-wise steps that provide a ``kernel`` (see
+``tomobase_hook_process``), such as ``normalize``, ``background_subtract_median``
+and ``poisson_noise``, are fused into a single pass that streams slabs of
+projections or slices through all of the steps, so the data is read and written
+once for the whole group instead of once per step.
+
+Example:
+
+    pipe = Pipeline()
+    pipe.add('Normalize')
+    pipe.add('Poisson Noise', rescale=1000)
+    pipe.add('Astra', method='sirt', iterations=50)
+    volume = pipe.run(sino)
+"""
+import inspect
+from copy import deepcopy
+import numpy as np
+
+from .registrations.processes import TOMOBASE_PROCESSES
+from .registrations.environment import xp
+from .data.base import Data
+from .log import logger
+from . import profiling
+
+# Node id of the data passed to Pipeline.run
+INPUT = -1
+
+
+def _lookup(process):
+    # Find a registered process by its display name or function name
+    if callable(process):
+        return process
+    for _, category in TOMOBASE_PROCESSES.items():
+        for _, item in category.items():
+            if process in (item.name, item.value.__name__):
+                return item.value
+    raise ValueError(f"No registered process named {process}.")
+
+
+class _Node:
+    def __init__(self, process, args, kwargs, inputs):
+        self.process = process
+        self.args = args
+        self.kwargs = kwargs
+        self.inputs = inputs
+
+    @property
+    def kernel(self):
+        return getattr(self.process, 'tomobase_kernel', None)
+
+    @property
+    def uses_statistics(self) -> bool:
+        return getattr(self.process, 'tomobase_kernel_statistics', False)
+
+    def kernel_arguments(self) -> dict:
+        # The arguments of the process other than the data object, with the defaults filled in
+        parameters = list(inspect.signature(self.process).parameters.values())
+        bound = inspect.signature(self.process).bind_partial(None, *self.args, **self.kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        arguments.pop(parameters[0].name)
+        arguments.pop('inplace', None)
+        arguments.pop('verbose_outputs', None)
+        return arguments
+
+
+class Pipeline:
+    """A lazily evaluated graph of registered processes.
+
+    Args:
+        slab_size (int): The approximate number of bytes of input per slab when a fused group of element-wise steps is streamed (default: 2**27)
+    """
+
+    def __init__(self, slab_size: int = 2**27):
+        self.slab_size = slab_size
+        self._nodes = []
+
+    def add(self, process, *args, inputs: list | int | None = None, **kwargs) -> int:
+        """Add a process to the pipeline.
+
+        Args:
+            process (Callable | str): A registered process or its name, e.g. 'Normalize' or 'normalize'
+            *args: Positional arguments passed to the process after the data
+            inputs (list | int | None): The node ids whose results are passed as the data arguments, the previously added node or the pipeline input if None (default: None)
+            **kwargs: Keyword arguments passed to the process
+
+        Returns:
+            int: The id of the node, used as input of later nodes or to request its result from ``run``
+        """
+        if inputs is None:
+            inputs = [len(self._nodes) - 1]
+        elif isinstance(inputs, int):
+            inputs = [inputs]
+        for i in inputs:
+            if not INPUT <= i < len(self._nodes):
+                raise ValueError(f"Unknown input node {i}, nodes must be added after their inputs.")
+        self._nodes.append(_Node(_lookup(process), args, kwargs, list(inputs)))
+        return len(self._nodes) - 1
+
+    def _groups(self, needed: set, outputs: list) -> list:
+        # Partition the needed nodes into groups in topological order, consecutive element-wise nodes form one group
+        # unless an intermediate result is requested
+        consumers = {i: [j for j in needed if i in self._nodes[j].inputs] for i in needed}
+        groups = []
+        for i in sorted(needed):
+            node = self._nodes[i]
+            previous = node.inputs[0]
+            if (groups and node.kernel is not None and not node.uses_statistics and len(node.inputs) == 1
+                    and groups[-1][-1] == previous and self._nodes[previous].kernel is not None
+                    and consumers[previous] == [i] and previous not in outputs):
+                groups[-1].append(i)
+            else:
+                groups.append([i])
+        return groups
+
+    def run(self, data: Data, outputs: list | int | None = None):
+        """Run the processes needed for the requested results.
+
+        The input data is never changed. Intermediate results are released as soon as every node that
+        consumes them has run, and processes whose input is not used elsewhere run in-place.
+
+        Args:
+            data (Data): The input data
+            outputs (list | int | None): The node ids whose results are returned, the last node if None (default: None)
+
+        Returns:
+            The result of the requested node, or a list of results when a list of ids is given
+        """
+        single = not isinstance(outputs, list)
+        if outputs is None:
+            outputs = [len(self._nodes) - 1]
+        elif single:
+            outputs = [outputs]
+
+        # Only nodes that the outputs depend on are run
+        needed = set()
+        stack = list(outputs)
+        while stack:
+            i = stack.pop()
+            if i != INPUT and i not in needed:
+                needed.add(i)
+                stack.extend(self._nodes[i].inputs)
+
+        remaining = {}
+        for i in needed:
+            for j in self._nodes[i].inputs:
+                remaining[j] = remaining.get(j, 0) + 1
+        for i in outputs:
+            remaining[i] = remaining.get(i, 0) + 1
+
+        results = {INPUT: data}
+        for group in self._groups(needed, outputs):
+            head = self._nodes[group[0]]
+            owned = all(j != INPUT and remaining[j] == 1 for j in head.inputs)
+            if len(group) > 1 or (head.kernel is not None and isinstance(results[head.inputs[0]], Data)):
+                logger.debug(f"Pipeline: streaming nodes {group} in a single pass")
+                result = self._run_fused(group, results[head.inputs[0]], owned)
+            else:
+                args = [results[j] for j in head.inputs] + list(head.args)
+                result = head.process(*args, inplace=owned, **head.kwargs)
+            results[group[-1]] = result
+
+            for j in head.inputs:
+                remaining[j] -= 1
+                if remaining[j] == 0 and j != INPUT:
+                    del results[j]
+
+        if single:
+            return results[outputs[0]]
+        return [results[i] for i in outputs]
+
+    def _run_fused(self, group: list, obj: Data, owned: bool) -> Data:
+        name = '+'.join(self._nodes[i].process.__name__ for i in group)
+        with profiling.record(name, {'obj': obj}) as call:
+            # Pending transforms are applied to the working copy, the input of the caller is not changed
+            if owned:
+                result = obj
+            else:
+                result = obj._copy_on_write() if isinstance(obj.data, np.ndarray) else deepcopy(obj)
+            result._materialise()
+
+            # Build every kernel from the object entering the group, only the first may use its statistics
+            kernels = [self._nodes[i].kernel(result, **self._nodes[i].kernel_arguments()) for i in group]
+
+            def apply(block):
+                for kernel in kernels:
+                    block = kernel(block)
+                return block
+
+            source = result.data
+            n = source.shape[0]
+            # The bytes of one plane, data without planes is streamed as a single empty slab
+            plane = source.nbytes // n if n else 0
+            step = max(1, self.slab_size // max(1, plane))
+
+            first = apply(xp.asarray(source[:step]))
+            if owned and isinstance(source, np.ndarray) and source.flags.writeable and first.dtype == source.dtype:
+                target = source
+            else:
+                target = xp.xupy.empty((n, *first.shape[1:]), dtype=first.dtype)
+            target[:step] = first
+            for start in range(step, n, step):
+                target[start:start + step] = apply(xp.asarray(source[start:start + step]))
+
+            result.data = target
+            result.invalidate()
+            call.output(result)
+        return result
@@ -0,0 +1,229 @@
+"""
+Memory-budget planning of registered processes.
+
+Processes that allocate several full-size temporaries can register a model of
+their working memory with ``tomobase_hook_process(memory=...)``. The model
+estimates the bytes a process allocates, its output included and its input
+excluded, for input data of a given shape and dtype. ``estimate`` then
+predicts the peak memory of a call before it is made.
+
+When a budget is configured, processes that support it run in slabs along an
+axis. Each slab is padded with a halo of neighbouring voxels, so filters and
+interpolations near the slab edges see the same context as on the full data.
+The slabs are as large as the budget allows, and data that fits the budget is
+processed in one piece as before:
+
+    from tomobase import planner
+    with planner.budget('48G'):
+        volume = beamdamage(volume)
+
+Slabbing is opt-in. A process runs in slabs when it splits its work with
+``slabs`` or ``map_slabs`` and is registered with ``slabbed=True``. Other
+processes with a memory model, such as the reconstructions, are run on the
+whole data, and the hooks log a warning when ``estimate`` exceeds the budget.
+
+The budget can also be set with the TOMOBASE_MEMORY_BUDGET environment
+variable, e.g. TOMOBASE_MEMORY_BUDGET=48G, or with ``--memory-budget`` of
+tomobase-batch.
+"""
+import os
+import contextlib
+import numpy as np
+
+from .log import logger
+from .lazy import tqdm
+from .registrations.environment import xp
+
+_UNITS = {'': 1, 'K': 2**10, 'M': 2**20, 'G': 2**30, 'T': 2**40}
+
+
+def parse_size(size: str | int | None) -> int | None:
+    """Parse a size such as '512M' or '16G' into bytes, None is passed through"""
+    if size is None or isinstance(size, int):
+        return size
+    text = size.strip().upper().removesuffix('B')
+    unit = text[-1] if text and text[-1] in _UNITS else ''
+    try:
+        return int(float(text[:len(text) - len(unit)]) * _UNITS[unit])
+    except ValueError:
+        raise ValueError(f"Cannot parse the size {size}, use e.g. 512M or 16G.")
+
+
+_budget = parse_size(os.environ.get('TOMOBASE_MEMORY_BUDGET') or None)
+
+
+def set_budget(size: str | int | None) -> int | None:
+    """Set the memory budget of processes that can run in slabs.
+
+    Args:
+        size (str | int | None): The budget in bytes or as a size such as '48G', unlimited if None
+
+    Returns:
+        int | None: The budget in bytes
+    """
+    global _budget
+    _budget = parse_size(size)
+    return _budget
+
+
+def get_budget() -> int | None:
+    """The memory budget in bytes, None if it is unlimited"""
+    return _budget
+
+
+@contextlib.contextmanager
+def budget(size: str | int | None):
+    """Set the memory budget inside a ``with`` block.
+
+    Args:
+        size (str | int | None): The budget in bytes or as a size such as '48G', unlimited if None
+    """
+    global _budget
+    previous = _budget
+    try:
+        yield set_budget(size)
+    finally:
+        _budget = previous
+
+
+def estimate(process, data, **kwargs) -> int | None:
+    """Estimate the peak memory of a call of a registered process.
+
+    Args:
+        process (Callable): The registered process
+        data (Data | ndarray): The main input of the process
+        **kwargs: The other arguments of the call
+
+    Returns:
+        int | None: The input plus the working memory in bytes, None if the process has no memory model
+    """
+    memory = getattr(process, 'tomobase_memory', None)
+    if memory is None:
+        return None
+    array = getattr(data, 'data', data)
+    return int(array.nbytes) + int(memory(tuple(array.shape), np.dtype(array.dtype), **kwargs))
+
+
+def check(process, data, **kwargs) -> int | None:
+    """Warn when a call of a process that does not run in slabs is estimated to exceed the budget.
+
+    Args:
+        process (Callable): The registered process
+        data (Data | ndarray): The main input of the process
+        **kwargs: The other arguments of the call
+
+    Returns:
+        int | None: The estimate in bytes, None if no budget is set or the process has no memory model or runs in slabs
+    """
+    if _budget is None or getattr(process, 'tomobase_slabbed', False):
+        return None
+    peak = estimate(process, data, **kwargs)
+    if peak is not None and peak > _budget:
+        logger.warning(f"{getattr(process, 'tomobase_name', process.__name__)} is estimated to need {peak} bytes for "
+                       f"data of {tuple(getattr(data, 'data', data).shape)}, more than the memory budget of {_budget} "
+                       f"bytes. It cannot run in slabs and is run on the whole data.")
+    return peak
+
+
+def _padded(shape: tuple, axis: int, length: int, halo: int) -> tuple:
+    shape = list(shape)
+    shape[axis] = min(shape[axis], length + 2 * halo)
+    return tuple(shape)
+
+
+def slab_length(shape: tuple, dtype, memory, axis: int = 0, halo: int = 0, resident: int = 0) -> int:
+    """The number of planes along an axis that can be processed at once within the budget.
+
+    Args:
+        shape (tuple): The shape of the data
+        dtype (numpy.dtype): The data type
+        memory (Callable): ``memory(shape, dtype)`` the working memory in bytes of a block of the shape
+        axis (int): The axis the data is split along (default: 0)
+        halo (int): The planes of context added on either side of a slab (default: 0)
+        resident (int): The bytes held for the whole call, e.g. the input and the assembled output (default: 0)
+
+    Returns:
+        int: The slab length, the size of the axis if the data fits the budget or no budget is set
+    """
+    size = shape[axis]
+    if _budget is None or resident + memory(shape, dtype) <= _budget:
+        return size
+    available = _budget - resident
+    if memory(_padded(shape, axis, 1, halo), dtype) > available:
+        logger.warning(f"A single plane of {shape} with a halo of {halo} needs more than the memory budget of "
+                       f"{_budget} bytes, the data is processed one plane at a time.")
+        return 1
+    # The working memory grows with the slab length, find the longest slab that fits
+    low, high = 1, size
+    while low < high:
+        length = (low + high + 1) // 2
+        if memory(_padded(shape, axis, length, halo), dtype) <= available:
+            low = length
+        else:
+            high = length - 1
+    return low
+
+
+def slabs(data, memory, axis: int = 0, halo: int = 0, resident: int | None = None, label: str = 'Slab'):
+    """Split data into slabs that can be processed within the memory budget.
+
+    Args:
+        data (ndarray): The data
+        memory (Callable): ``memory(shape, dtype)`` the working memory in bytes of a block of the shape
+        axis (int): The axis the data is split along (default: 0)
+        halo (int): The planes of context added on either side of a slab (default: 0)
+        resident (int | None): The bytes held for the whole call, the size of the data if None (default: None)
+        label (str): The label of the progress bar shown when there is more than one slab (default: 'Slab')
+
+    Yields:
+        tuple: The slab with its halo as a view of the data, the index of the slab without its halo in the
+            slab, and the index of the slab in the data
+    """
+    size = data.shape[axis]
+    resident = data.nbytes if resident is None else resident
+    length = slab_length(tuple(data.shape), np.dtype(data.dtype), memory, axis, halo, resident)
+    starts = range(0, size, length)
+    if len(starts) > 1:
+        logger.info(f"Processing {tuple(data.shape)} in {len(starts)} slabs of {length} planes along axis {axis} "
+                    f"to stay within the memory budget of {_budget} bytes")
+        starts = tqdm(starts, label=label)
+
+    before = (slice(None),) * axis
+    for start in starts:
+        stop = min(start + length, size)
+        lo, hi = max(0, start - halo), min(size, stop + halo)
+        yield (data[before + (slice(lo, hi),)],
+               before + (slice(start - lo, stop - lo),),
+               before + (slice(start, stop),))
+
+
+def map_slabs(func, data, memory, axis: int = 0, halo: int = 0, label: str = 'Slab', offset: bool = False):
+    """Apply a function to data slab by slab within the memory budget.
+
+    The function is called once on the full data if it fits the budget. Otherwise it is called on every slab
+    with its halo and the results without the halo are assembled into the output.
+
+    Args:
+        func (Callable): ``func(block)`` returning an array of the shape of the block
+        data (ndarray): The data
+        memory (Callable): ``memory(shape, dtype)`` the working memory in bytes of a block of the shape, its result included
+        axis (int): The axis the data is split along (default: 0)
+        halo (int): The planes of context added on either side of a slab (default: 0)
+        label (str): The label of the progress bar shown when there is more than one slab (default: 'Slab')
+        offset (bool): Call ``func(block, start)`` with the index of the first plane of the block in the data,
+            e.g. to draw the same random numbers for every plane however the data is split (default: False)
+
+    Returns:
+        ndarray: The result
+    """
+    out = None
+    # The input and the assembled output are held for the whole call
+    for block, inner, region in slabs(data, memory, axis, halo, 2 * data.nbytes, label):
+        args = (region[axis].start - inner[axis].start,) if offset else ()
+        if block.shape[axis] == data.shape[axis]:
+            return func(block, *args)
+        result = func(block, *args)[inner]
+        if out is None:
+            out = xp.xupy.empty(data.shape, dtype=result.dtype)
+        out[region] = result
+    return out
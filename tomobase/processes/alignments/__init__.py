@@ -1,5 +1,6 @@
 from .translation import align_sinogram_xcorr, align_sinogram_center_of_mass, weight_by_angle
 from .rotation import align_tilt_axis_rotation, align_tilt_axis_shift
+from .projection_matching import align_projection_matching
 
 __all__ = [
     "align_sinogram_xcorr",
@@ -7,4 +8,5 @@ __all__ = [
     "weight_by_angle",
     "align_tilt_axis_rotation",
     "align_tilt_axis_shift",
+    "align_projection_matching",
 ]
\ No newline at end of file
@@ -0,0 +1,161 @@
+import numpy as np
+
+from ...hooks import tomobase_hook_process
+from ...registrations.transforms import TOMOBASE_TRANSFORM_CATEGORIES
+from ...data import Sinogram, alignment
+from ...utils import _get_projector, _circle_mask
+from ...log import logger
+
+from ...lazy import lazy_import, trange
+
+astra = lazy_import('astra')
+
+_subcategories = ['Projection Matching']
+
+
+def _reconstruct(data, angles, iterations, initial, use_gpu):
+    # SIRT of every (n, y) slice along x, warm started from the previous volume
+    n, x, y = data.shape
+    mask = _circle_mask(y)
+    maxc = float(data.max())
+
+    vol = np.empty((x, y, y), dtype=np.float32) if initial is None else initial
+    with _get_projector(y, y, angles, use_gpu) as proj_id:
+        vol_geom = astra.projector.volume_geometry(proj_id)
+        proj_geom = astra.projector.projection_geometry(proj_id)
+        for i in range(x):
+            sino_id = astra.data2d.create('-sino', proj_geom, data[:, i, :])
+            vol_id = astra.data2d.create('-vol', vol_geom, 0.0 if initial is None else initial[i])
+            cfg = astra.astra_dict('SIRT_CUDA' if use_gpu else 'SIRT')
+            cfg['ProjectorId'] = proj_id
+            cfg['ProjectionDataId'] = sino_id
+            cfg['ReconstructionDataId'] = vol_id
+            cfg['option'] = {'MinConstraint': 0.0, 'MaxConstraint': maxc}
+            alg_id = astra.algorithm.create(cfg)
+            astra.algorithm.run(alg_id, iterations)
+            vol[i] = astra.data2d.get(vol_id) * mask
+            astra.algorithm.delete(alg_id)
+            astra.data2d.delete([sino_id, vol_id])
+    return vol
+
+
+def _reproject(vol, angles, use_gpu):
+    x, y, _ = vol.shape
+    reproj = np.empty((len(angles), x, y), dtype=np.float32)
+    with _get_projector(y, y, angles, use_gpu) as proj_id:
+        for i in range(x):
+            sino_id, reproj[:, i, :] = astra.creators.create_sino(vol[i], proj_id)
+            astra.astra.delete(sino_id)
+    return reproj
+
+
+def _batched_shifts(reference, moving, max_shift):
+    # Shifts that move every projection onto its reference, estimated for all projections with one batched FFT
+    xcorr = np.real(np.fft.ifft2(np.fft.fft2(reference, axes=(1, 2)) * np.conj(np.fft.fft2(moving, axes=(1, 2))), axes=(1, 2)))
+    n, x, y = xcorr.shape
+    fx = np.rint(np.fft.fftfreq(x) * x)
+    fy = np.rint(np.fft.fftfreq(y) * y)
+    window = (np.abs(fx)[:, None] <= max_shift) & (np.abs(fy)[None, :] <= max_shift)
+    xcorr = np.where(window[None], xcorr, -np.inf)
+
+    peak = np.argmax(xcorr.reshape(n, -1), axis=1)
+    px, py = np.unravel_index(peak, (x, y))
+    shifts = np.stack((fx[px], fy[py]), axis=1)
+
+    # Parabolic sub-pixel refinement of the peak along each axis
+    rows = np.arange(n)
+    for axis, (index, size) in enumerate(((px, x), (py, y))):
+        before = [px, py]
+        after = [px, py]
+        before[axis] = (index - 1) % size
+        after[axis] = (index + 1) % size
+        c0 = xcorr[rows, px, py]
+        cm = xcorr[rows, before[0], before[1]]
+        cp = xcorr[rows, after[0], after[1]]
+        denominator = cm - 2 * c0 + cp
+        valid = np.isfinite(cm) & np.isfinite(cp) & (denominator < 0)
+        shifts[valid, axis] += 0.5 * (cm[valid] - cp[valid]) / denominator[valid]
+    return shifts
+
+
+def _angle_offsets(data, reproj, vol, angles, step, use_gpu):
+    # Gauss-Newton step of the reprojection error of every projection, the derivative of the reprojection with
+    # respect to its angle is a central difference over a small fraction of the step
+    h = step / 4
+    derivative = (_reproject(vol, angles + h, use_gpu) - _reproject(vol, angles - h, use_gpu)) / (2 * h)
+    curvature = np.sum(derivative ** 2, axis=(1, 2))
+    offsets = np.zeros_like(angles)
+    valid = curvature > 0
+    offsets[valid] = np.sum((data - reproj) * derivative, axis=(1, 2))[valid] / curvature[valid]
+    return np.clip(offsets, -step, step)
+
+
+@tomobase_hook_process(name='Projection Matching', category=TOMOBASE_TRANSFORM_CATEGORIES.ALIGN.value, subcategories=_subcategories, use_numpy=True)
+def align_projection_matching(sino: Sinogram, iterations: int = 5, reconstruction_iterations: int = 20,
+                              max_shift: float = 0.0, estimate_angles: bool = True, angle_step: float = 0.5,
+                              tolerance: float = 0.1, use_gpu: bool = True, deferred: bool = False):
+    """Align every projection to reprojections of its own reconstruction.
+
+    Each outer iteration reconstructs the aligned sinogram with SIRT, warm started from the previous
+    reconstruction, reprojects it, and estimates a shift for every projection by cross-correlating it
+    with its reprojection. The tilt angle of every projection is refined as well, by a Gauss-Newton step
+    on the difference between the projection and its reprojection. Angle errors are partly absorbed by
+    the reconstruction, so they converge more slowly than the shifts and need more outer iterations and a
+    lower tolerance to be resolved to a fraction of a degree. The projectors are cached between iterations.
+
+    Args:
+        sino (Sinogram): The projection data
+        iterations (int): The maximum number of outer iterations (default: 5)
+        reconstruction_iterations (int): The number of SIRT iterations per outer iteration (default: 20)
+        max_shift (float): The largest shift in pixels searched per outer iteration, a quarter of the projection size is used if 0 (default: 0.0)
+        estimate_angles (bool): Also refine the tilt angle of every projection, the mean and the range of the angles are kept (default: True)
+        angle_step (float): The largest angle correction in degrees per outer iteration (default: 0.5)
+        tolerance (float): Stop once the largest update is below this many pixels or degrees (default: 0.1)
+        use_gpu (bool): Use a GPU if it is available (default: True)
+        deferred (bool): Only record the shifts on the sinogram, they are applied with any other pending alignment in a single interpolation pass by ``Sinogram.apply_transforms`` (default: False)
+        inplace (bool): Whether to do the alignment in-place in the input data object (default: True)
+
+    Returns:
+        Sinogram: The result
+        shifts (np.ndarray): The (n, 2) shifts in pixels
+        angle_offsets (np.ndarray): The corrections added to the tilt angles in degrees
+    """
+    use_gpu = use_gpu and astra.use_cuda()
+    n = sino.data.shape[0]
+    if max_shift <= 0:
+        max_shift = min(sino.data.shape[1:3]) / 4
+
+    shifts = np.zeros((n, 2))
+    angles = np.asarray(sino.angles, dtype=float).copy()
+    vol = None
+    for i in trange(iterations, label='Projection matching'):
+        data = sino.aligned_data(alignment.shift_matrices(shifts)).astype(np.float32)
+        vol = _reconstruct(data, angles, reconstruction_iterations, vol, use_gpu)
+        reproj = _reproject(vol, angles, use_gpu)
+
+        update = _batched_shifts(reproj, data, max_shift)
+        # The mean shift only moves the reconstruction, remove it to keep the volume centred
+        update -= update.mean(axis=0)
+        shifts += update
+        change = np.abs(update).max()
+
+        # The first reconstructions are too smooth to resolve angles, they are refined once the warm start has converged further
+        if estimate_angles and i > 0:
+            offsets = _angle_offsets(data, reproj, vol, angles, angle_step, use_gpu)
+            # A common offset only rotates the reconstruction and a scaling of the tilt range is barely
+            # constrained by the projections, the corrections are kept free of both
+            offsets -= np.polyval(np.polyfit(angles, offsets, 1), angles)
+            angles += offsets
+            change = max(change, np.abs(offsets).max())
+
+        logger.debug(f'Projection matching iteration {i}: largest update {change}')
+        if change < tolerance and (not estimate_angles or i > 0):
+            break
+
+    angle_offsets = angles - sino.angles
+    sino.angles = angles
+    sino.add_transforms(alignment.shift_matrices(shifts))
+    if not deferred:
+        sino.apply_transforms()
+
+    return sino, shifts, angle_offsets
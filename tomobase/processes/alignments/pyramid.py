@@ -0,0 +1,42 @@
+from ...data import Sinogram, alignment
+from ..image_processing.scaling import bin
+
+
+def get_pyramid(sino: Sinogram, levels: int = 1):
+    """Get a coarse-to-fine multiscale pyramid of a sinogram.
+
+    Each level halves the size of the projection images using the ``bin`` process. The binned data is
+    cached on the sinogram so successive alignment steps reuse it, as long as the raw data is not
+    resampled (use ``deferred=True`` on the alignment processes). Pending alignment transforms of the
+    sinogram are rescaled to every level.
+
+    Args:
+        sino (Sinogram): The projection data
+        levels (int): The number of levels including the full resolution data (default: 1)
+
+    Returns:
+        list[tuple[int, Sinogram]]: The (binning factor, sinogram) pairs ordered from the coarsest level to the full resolution sinogram
+    """
+    key = (id(sino.data), sino.data.shape)
+    if sino._pyramid is None or sino._pyramid['key'] != key:
+        sino._pyramid = {'key': key, 'levels': []}
+    cache = sino._pyramid['levels']
+
+    previous = sino if len(cache) == 0 else cache[-1]
+    while len(cache) < levels - 1:
+        x, y = previous.data.shape[1:3]
+        if min(x, y) < 4:
+            break
+        # Crop a trailing row or column so that the level can be binned by 2
+        level = Sinogram(previous.data[:, :x - x % 2, :y - y % 2], previous.angles, previous.pixelsize, previous.times)
+        level = bin(level, 2)
+        cache.append(level)
+        previous = level
+
+    pyramid = [(1, sino)]
+    for i, level in enumerate(cache[:levels - 1], start=1):
+        factor = 2 ** i
+        level.angles = sino.angles
+        level.transforms = None if sino.transforms is None else alignment.rescale(sino.transforms, factor)
+        pyramid.append((factor, level))
+    return pyramid[::-1]
@@ -2,23 +2,47 @@
 import numpy as np
 from copy import copy
 
-from scipy.ndimage import center_of_mass, shift, rotate
-from scipy.optimize import minimize_scalar
 
 from ...hooks import tomobase_hook_process
 from ...registrations.transforms import TOMOBASE_TRANSFORM_CATEGORIES
 from ...registrations.environment import xp
 
-from ...data import Sinogram
+from ...data import Sinogram, alignment
+from .pyramid import get_pyramid
 from ..reconstruct import astra_reconstruct
 from ..forward_project import project
 from ...log import logger
 
-from magicgui.tqdm import trange, tqdm
+from ...lazy import lazy_import, trange, tqdm
+
+optimize = lazy_import('scipy.optimize')
 
 _subcategories= ['Tilt Axis']
+
+
+def _reprojection_search(sino, candidates, matrices, method, label, **kwargs):
+    # Pick the candidate transform whose reconstruction best reproduces the projections
+    mse = np.zeros(len(candidates))
+    trial = copy(sino)
+    trial.transforms = None
+    for i in tqdm(range(len(candidates)), label=label):
+        # Every candidate is resampled once from the raw data together with any pending alignment
+        trial.data = sino.aligned_data(matrices(candidates[i], sino.data.shape))
+        reproj = project(astra_reconstruct(trial, method, **kwargs), sino.angles)
+        mse[i] = np.mean((trial.data - reproj.data) ** 2)
+    return candidates[np.argmin(mse)]
+
+
+def _shift_matrices(value, shape):
+    return alignment.shift_matrices(np.tile((value, 0), (shape[0], 1)))
+
+
+def _rotation_matrices(value, shape):
+    return alignment.rotation_matrices(np.full(shape[0], value), shape[1:])
+
+
 @tomobase_hook_process(name='Tilt Shift', category=TOMOBASE_TRANSFORM_CATEGORIES.ALIGN.value, subcategories=_subcategories, use_numpy=True)
-def align_tilt_axis_shift(sino: Sinogram, method:str='fbp', offsets:float=0.0, **kwargs):
+def align_tilt_axis_shift(sino: Sinogram, method:str='fbp', offsets:float=0.0, levels:int=1, deferred:bool=False, **kwargs):
     """Align the tilt axis shift of a sinogram using reprojection
 
     Args:
@@ -26,6 +50,8 @@ def align_tilt_axis_shift(sino: Sinogram, method:str='fbp', offsets:float=0.0, *
         method (str): The reconstruction algorithm (default: 'fbp')
         offsets (np.ndarray): A list of offsets to try in pixels, if None is given it will use ``numpy.arange(-10, 11)`` (default: None)
         offset (float): A pre-calculated offset in pixels, this is useful for aligning multiple sinograms simultaneously (default: None)
+        levels (int): The number of pyramid levels, the offsets are searched on the coarsest level and refined by a pixel on every finer level (default: 1)
+        deferred (bool): Only record the shift on the sinogram, it is applied with any other pending alignment in a single interpolation pass by ``Sinogram.apply_transforms`` (default: False)
         inplace (bool): Whether to do the alignment in-place in the input data object (default: True)
         extend_return (bool): If True, the return value will be a tuple with the offset in the second item (default: False)
         kwargs (dict): Other keyword arguments are passed to ``reconstruct`` see astra reconstruct
@@ -37,28 +63,31 @@ def align_tilt_axis_shift(sino: Sinogram, method:str='fbp', offsets:float=0.0, *
     offset = None
     if offsets == 0.0:
         offsets = np.arange(-10, 11)
-    mse = np.zeros(len(offsets))
-    sino_shifted = copy(sino)
 
-    for i in tqdm(range(len(offsets)), label='Aligning tilt axis shift'):
-        sino_shifted.data = shift(sino.data, (0, offsets[i], 0))
-        reproj = project(astra_reconstruct(sino_shifted, method, **kwargs), sino.angles)
-        mse[i] = np.mean((sino_shifted.data - reproj.data) ** 2)
-    offset = offsets[np.argmin(mse)]
+    for i, (factor, level) in enumerate(get_pyramid(sino, levels)):
+        if i == 0:
+            candidates = np.asarray(offsets) if factor == 1 else np.unique(np.rint(np.asarray(offsets) / factor))
+        else:
+            candidates = 2 * offset + np.array([-1, 0, 1])
+        offset = _reprojection_search(level, candidates, _shift_matrices, method, 'Aligning tilt axis shift', **kwargs)
 
-    sino.data = shift(sino.data, (0, offset, 0))
+    sino.add_transforms(_shift_matrices(offset, sino.data.shape))
+    if not deferred:
+        sino.apply_transforms()
 
     return sino, offset
 
 
 @tomobase_hook_process(name='Tilt Rotation', category=TOMOBASE_TRANSFORM_CATEGORIES.ALIGN.value, subcategories=_subcategories, use_numpy=True)
-def align_tilt_axis_rotation(sino:Sinogram, method:str='fbp', angle:float=0.0, **kwargs):
+def align_tilt_axis_rotation(sino:Sinogram, method:str='fbp', angle:float=0.0, levels:int=1, deferred:bool=False, **kwargs):
     """Align the tilt axis rotation of a sinogram using reprojection
     Args:
         sino (Sinogram): The projection data
         method (str): The reconstruction algorithm (default: 'fbp')
         angle (float): A pre-calculated angle in degrees, this is useful for aligning multiple sinograms simultaneously (default: None)
         angles (np.ndarray): A list of angles to try in degrees, if None is given it will use ``numpy.arange(-4, 5)`` (default: None)
+        levels (int): The number of pyramid levels, the angles are searched on the coarsest level and refined with half the angular step on every finer level (default: 1)
+        deferred (bool): Only record the rotation on the sinogram, it is applied with any other pending alignment in a single interpolation pass by ``Sinogram.apply_transforms`` (default: False)
         inplace (bool): Whether to do the alignment in-place in the input data object (default: True)
         extend_return (bool): If True, the return value will be a tuple with the angle in the second item (default: False)
         kwargs (dict): Other keyword arguments are passed to ``reconstruct`` see astra reconstruct
@@ -71,22 +100,22 @@ def align_tilt_axis_rotation(sino:Sinogram, method:str='fbp', angle:float=0.0, *
     #TODO: Add context shifting
     angles=None
 
-
     if angle == 0.0:
         if angles is None:
             angles = np.arange(-4, 5)
-        mse = np.zeros(len(angles))
-        sino_rot = copy(sino)
+        step = np.min(np.diff(np.unique(angles))) if len(angles) > 1 else 1.0
 
-        for i in tqdm(range(len(angles)), label='Aligning tilt axis rotation'):
-            sino_rot.data = rotate(sino.data, angles[i], reshape=False)
-            reproj = project(astra_reconstruct(sino_rot, method, **kwargs),
-                            sino.angles)
-            mse[i] = np.mean((sino_rot.data - reproj.data) ** 2)
-            
-        angle = angles[np.argmin(mse)]
+        for i, (factor, level) in enumerate(get_pyramid(sino, levels)):
+            if i == 0:
+                candidates = np.asarray(angles)
+            else:
+                step = step / 2
+                candidates = angle + np.array([-step, 0, step])
+            angle = _reprojection_search(level, candidates, _rotation_matrices, method, 'Aligning tilt axis rotation', **kwargs)
 
-    sino.data = rotate(sino.data, angle, reshape=False)
+    sino.add_transforms(_rotation_matrices(angle, sino.data.shape))
+    if not deferred:
+        sino.apply_transforms()
 
     return sino, angle
 
@@ -123,9 +152,9 @@ def backlash_correct(sino: Sinogram, tolerance:float= 10.0, method:str='bounded'
     value = 0
 
     if method == 'bounded':
-        result = minimize_scalar(objective_function, value, args=(sino, indices), bounds=(-tolerance, +tolerance), method=method)
+        result = optimize.minimize_scalar(objective_function, value, args=(sino, indices), bounds=(-tolerance, +tolerance), method=method)
     else:
-        result = minimize_scalar(objective_function, value, args=(sino, indices), method=method)
+        result = optimize.minimize_scalar(objective_function, value, args=(sino, indices), method=method)
         
     sino.angles[indices] += result.x
     logger.debug(f'Final Error: {result.fun}, Angle Shift: {result.x}')
@@ -1,21 +1,50 @@
-import copy
+import numpy as np
 
 from ...hooks import tomobase_hook_process
 from ...registrations.transforms import TOMOBASE_TRANSFORM_CATEGORIES
-from ...registrations.environment import xp
-from ...registrations.progress import progresshandler
-from ...data import Sinogram
+from ...registrations.environment import xp, GPUContext
+from ...data import Sinogram, alignment
+from .pyramid import get_pyramid
+from ..weighting import angular_weights, apply_angular_weights
 
-from magicgui.tqdm import trange, tqdm
+from ...lazy import trange, tqdm
 
 _subcategories=['Translation']
+
+
+def _xcorr_shifts(data, radius=None):
+    # Cumulative shifts between consecutive projections, the peak search is limited to +-radius pixels when given
+    xupy = xp.backend().xupy
+    shifts = xupy.zeros((data.shape[0], 2))
+    if radius is not None:
+        size = data.shape[1:3]
+        grid = xupy.meshgrid(*[xupy.rint(xupy.fft.fftfreq(n) * n) for n in size], indexing='ij')
+        window = (xupy.abs(grid[0]) <= radius) & (xupy.abs(grid[1]) <= radius)
+    fft_fixed = xupy.fft.fft2(data[0, :, :])
+    for i in tqdm(range(data.shape[0] - 1), label='Calculating shifts with cross-correlation'):
+        fft_moving = xupy.fft.fft2(data[i + 1, :, :])
+        xcorr = xupy.real(xupy.fft.ifft2(xupy.multiply(fft_fixed, xupy.conj(fft_moving))))
+        fft_fixed = fft_moving
+        if radius is not None:
+            xcorr = xupy.where(window, xcorr, -xupy.inf)
+        rel_shift = xupy.asarray(xupy.unravel_index(xupy.argmax(xcorr), xcorr.shape))
+        shifts[i + 1, :] = shifts[i, :] + rel_shift
+
+    # Shifts are periodic, use the smallest equivalent shift as the data is no longer rolled
+    size = xupy.asarray(data.shape[1:3])[None, :]
+    shifts = xupy.rint(shifts).astype(int)
+    return (shifts + size // 2) % size - size // 2
+
+
 @tomobase_hook_process(name='Align Sinogram XCorrelation', category=TOMOBASE_TRANSFORM_CATEGORIES.ALIGN.value, subcategories=_subcategories)
-def align_sinogram_xcorr(sino: Sinogram, shifts=None):
+def align_sinogram_xcorr(sino: Sinogram, shifts=None, levels: int = 1, deferred: bool = False):
     """Align the projection images using cross-correlation
     Arguments:
         sino (Sinogram): The projection data
         inplace (bool): Whether to do the alignment in-place in the input data object (default: True)
         shifts (np.ndarray): A list of shifts to apply in pixels, if None is given it will be calculated (default: None)
+        levels (int): The number of pyramid levels, the shifts are estimated on the coarsest level and refined within a few pixels on every finer level (default: 1)
+        deferred (bool): Only record the shifts on the sinogram, they are applied with any other pending alignment in a single interpolation pass by ``Sinogram.apply_transforms`` (default: False)
         extend_return (bool): If True, the return value will be a tuple with the shifts in the second item (default: False)
     Returns:
         Sinogram: The result
@@ -23,38 +52,50 @@ def align_sinogram_xcorr(sino: Sinogram, shifts=None):
     """
 
     if shifts is None:
-        shifts = xp.xupy.zeros((sino.data.shape[0], 2))
-        fft_fixed = xp.xupy.fft.fft2(sino.data[0, :, :])
-        for i in tqdm(range(sino.data.shape[0] - 1), label='Calculating shifts with cross-correlation'):
-            fft_moving = xp.xupy.fft.fft2(sino.data[i + 1, :, :])
-            xcorr = xp.xupy.fft.ifft2(xp.xupy.multiply(fft_fixed, xp.xupy.conj(fft_moving)))
-            fft_fixed = fft_moving
-            rel_shift = xp.xupy.asarray(xp.xupy.unravel_index(xp.xupy.argmax(xcorr), xcorr.shape))
-            shifts[i + 1, :] = shifts[i, :] + rel_shift
-
-        shifts %= xp.xupy.asarray(sino.data.shape[1:])[None, :]
-        shifts = xp.xupy.rint(shifts).astype(int)
-
-    for i in tqdm(range(sino.data.shape[0]), label='Aligning sinogram with cross-correlation'):
-        sino.data[i, :, :] = xp.xupy.roll(sino.data[i, :, :], shifts[i, :], axis=(0, 1))
+        shifts = xp.xupy.zeros((sino.data.shape[0], 2), dtype=int)
+        for i, (factor, level) in enumerate(get_pyramid(sino, levels)):
+            if i == 0:
+                data = level.aligned_data() if level.has_pending_transforms else level.data
+                radius = None
+            else:
+                matrices = alignment.shift_matrices(xp.asarray(shifts, GPUContext.NUMPY) / factor)
+                data = level.aligned_data(matrices)
+                radius = 2
+            shifts = shifts + _xcorr_shifts(data, radius) * factor
+    else:
+        size = xp.xupy.asarray(sino.data.shape[1:])[None, :]
+        shifts = (xp.xupy.asarray(shifts) + size // 2) % size - size // 2
+
+    sino.add_transforms(alignment.shift_matrices(xp.asarray(shifts, GPUContext.NUMPY)))
+    if not deferred:
+        sino.apply_transforms()
 
     return sino, shifts
 
 
 @tomobase_hook_process(name='Centre of Mass', category=TOMOBASE_TRANSFORM_CATEGORIES.ALIGN.value, subcategories=_subcategories)
-def align_sinogram_center_of_mass(sino: Sinogram):
+def align_sinogram_center_of_mass(sino: Sinogram, levels: int = 1, deferred: bool = False):
     """Align the projection images using the center of mass
     Arguments:
         sino (Sinogram): The projection data
         inplace (bool): Whether to do the alignment in-place in the input data object (default: True)
+        levels (int): The number of pyramid levels, the centre of mass is linear so it is only measured on the coarsest level and scaled to full resolution (default: 1)
+        deferred (bool): Only record the shift on the sinogram, it is applied with any other pending alignment in a single interpolation pass by ``Sinogram.apply_transforms`` (default: False)
         extend_return (bool): If True, the return value will be a tuple with the offset in the second item (default: False)
     Returns:
         Sinogram: The result
         offset (xp.ndarray): The offset in pixels
     """
 
-    offset = xp.xupy.asarray(sino.data.shape[1:]) / 2 - xp.scipy.ndimage.center_of_mass(xp.xupy.sum(sino.data, axis=0))
-    sino.data = xp.xupy.shift(sino.data, (0, offset[0], offset[1]))
+    factor, level = get_pyramid(sino, levels)[0]
+    data = level.aligned_data() if level.has_pending_transforms else level.data
+    centre = xp.xupy.asarray(xp.scipy.ndimage.center_of_mass(xp.xupy.sum(data, axis=0)))
+    offset = xp.xupy.asarray(sino.data.shape[1:]) / 2 - (centre * factor + (factor - 1) / 2)
+
+    offset = xp.asarray(offset, GPUContext.NUMPY)
+    sino.add_transforms(alignment.shift_matrices(np.tile(offset, (sino.data.shape[0], 1))))
+    if not deferred:
+        sino.apply_transforms()
     return sino, offset
 
 
@@ -70,27 +111,12 @@ def weight_by_angle(sino: Sinogram):
         weights (xp.ndarray): The weights in pixels
     """
 
-    #Dont bother progress tracking for short processes
-    indices = xp.xupy.argsort(sino.angles)
-    sino.angles = sino.angles[indices]
-    sino.data = sino.data[indices, :, :]
-    weights = xp.xupy.ones_like(sino.angles)
-
-    sorted_angles = copy.deepcopy(sino.angles) + 90
-    n_angles = len(sorted_angles)
-
-    for i in range(len(sorted_angles)):
-        if i == 0:
-            weights[i] = 0.5 * (180 - sorted_angles[n_angles - 1] + sorted_angles[i + 1])
-        elif i == len(sorted_angles) - 1:
-            weights[i] = 0.5 * (180 - sorted_angles[n_angles - 2] + sorted_angles[0])
-        else:
-            weights[i] = 0.5 * ((sorted_angles[i + 1] - sorted_angles[i]) + (sorted_angles[i] - sorted_angles[i - 1]))
-    ratio = 180 / (n_angles - 1)
-    weights = weights / ratio
-
-    for i in range(sino.data.shape[0]):
-        sino.data[i, :, :] = sino.data[i, :, :] * weights[i]
+    sino.sort()
+    weights = angular_weights(sino.angles)
+    if not xp.xupy.issubdtype(sino.data.dtype, xp.xupy.floating):
+        sino.data = sino.data.astype(xp.xupy.float32)
+    sino.ensure_writable()
+    apply_angular_weights(sino.data, weights)
 
     return sino, weights
 
@@ -1,19 +1,33 @@
+import math
+import numpy as np
 
 from ...data import Volume
 from ...registrations.transforms import TOMOBASE_TRANSFORM_CATEGORIES
 from ...hooks import tomobase_hook_process
 from ...registrations.environment import xp
+from ... import planner
 
-from magicgui.tqdm import tqdm
+from ...lazy import tqdm
 
-def _knockon(volume, knockon):
+# The width of the smoothing of the displacement field and the radius of its kernel in widths
+_SIGMA = 10
+_TRUNCATE = 4.0
+
+def _noise(shape, seed: tuple, start):
+    # Uniform noise in [-1, 1) for the planes of a block starting at plane start of the volume. Every plane is
+    # drawn from its own generator, so a slab gets the same numbers as the whole volume, see beamdamage
+    planes = [np.random.default_rng((*seed, start + j)).random(shape[1:]) for j in range(shape[0])]
+    return xp.asarray(np.stack(planes) * 2 - 1, xp.context)
+
+
+def _knockon(volume, knockon, seed: tuple, start=0):
     kernel = xp.xupy.ones((3, 3, 3))
     mask = (volume != 0).astype(int)
     pmask = xp.scipy.ndimage.convolve(mask, kernel, mode='constant', cval=0.0)
     mask_interior = (pmask >= 27)
 
     pmask = xp.xupy.power(knockon, pmask/3)
-    seed = xp.xupy.random.rand(*volume.shape)
+    seed = (_noise(volume.shape, seed, start) + 1) / 2
     
     mask[pmask > seed] = 0
     mask[mask_interior] = 1
@@ -22,41 +36,61 @@ def _knockon(volume, knockon):
     return volume
 
 
-def _deform(obj, deform, normalize=True):
-    #something isnt quite right here the size keeps getting bigger 
-    sig = 10
-    coord = xp.xupy.indices(obj.shape, dtype= xp.xupy.float32)
-    seed = (xp.xupy.random.rand(3, *obj.shape) * 2) - 1
-    seed_list = [xp.scipy.ndimage.gaussian_filter(seed[i], sig) for i in range(3)]
+def _deform(obj, deform, seed: tuple, start=0):
+    # A smooth random displacement field of magnitude deform, so every voxel moves by deform voxels
+    field = xp.xupy.moveaxis(_noise((obj.shape[0], 3, *obj.shape[1:]), seed, start), 1, 0)
+    seed_list = [xp.scipy.ndimage.gaussian_filter(field[i], _SIGMA, truncate=_TRUNCATE) for i in range(3)]
     amplitude = xp.xupy.sqrt(sum(seed_list[i] ** 2 for i in range(3)))
 
-    mask = (obj != 0).astype(int)
-    count = xp.xupy.sum(mask)
-
     for i in range(3):
-        seed[i] = (seed[i] * deform) / amplitude
-    coord = coord + seed
-    obj = xp.scipy.ndimage.map_coordinates(obj, coord, order=1, mode='constant', cval=0.0)
-    
-    if normalize:
-        obj_flat = obj.flatten()
-        nonzero_indices = xp.xupy.where(obj_flat != 0)[0]
-        nonzero_values = obj_flat[nonzero_indices]
-        sorted_indices = xp.xupy.argsort(nonzero_values)
-        if len(nonzero_values) <= count:
-            threshold_value = xp.xupy.min(nonzero_values)
-        else:
-            threshold_value = nonzero_values[sorted_indices[-count]]
-        obj_flat[obj_flat < threshold_value] = 0
-        obj = obj_flat.reshape(obj.shape)
-        obj[obj>0] = 1
+        field[i] = (seed_list[i] * deform) / amplitude
+    # Temporaries are released as soon as they are used, see _beamdamage_memory
+    del seed_list, amplitude
+    coord = xp.xupy.indices(obj.shape, dtype= xp.xupy.float32)
+    coord = coord + field
+    del field
+    return xp.scipy.ndimage.map_coordinates(obj, coord, order=1, mode='constant', cval=0.0)
+
 
+def _normalize(obj, count):
+    # Keep the count largest values as the occupied volume, count is taken from the whole volume before it is
+    # deformed, so this runs on the whole volume
+    if count == 0:
+        return obj
+    nonzero_values = obj[obj != 0]
+    if len(nonzero_values) <= count:
+        threshold_value = xp.xupy.min(nonzero_values)
+    else:
+        k = len(nonzero_values) - count
+        nonzero_values.partition(k)
+        threshold_value = nonzero_values[k]
+    del nonzero_values
+    obj[obj < threshold_value] = 0
+    obj[obj>0] = 1
     return obj
 
-@tomobase_hook_process(name='Beam Damage', category=TOMOBASE_TRANSFORM_CATEGORIES.DEFORM.value)
+def _beamdamage_memory(shape, dtype, **kwargs):
+    # The random field, its three filtered components and the temporaries of their amplitude are held at once,
+    # 72 bytes per voxel, the deformed volume is of the input dtype. Knock-on damage and normalize need less
+    return int(np.prod(shape)) * (72 + np.dtype(dtype).itemsize)
+
+
+def _knockon_memory(shape, dtype, **kwargs):
+    # The integer mask and its convolution, the probabilities, the random numbers and the damaged block
+    return int(np.prod(shape)) * (34 + np.dtype(dtype).itemsize)
+
+
+@tomobase_hook_process(name='Beam Damage', category=TOMOBASE_TRANSFORM_CATEGORIES.DEFORM.value, cacheable=False,
+                       memory=_beamdamage_memory, slabbed=True)
 def beamdamage(volume: Volume, knock_on: float = 0.01, elastic_deform:float=0.1, normalize:bool=True):
     """Apply beam damage simulation to a volume.
 
+    Every voxel is displaced by elastic_deform voxels along a smooth random field. When a memory budget is set
+    with tomobase.planner and the volume does not fit it, the volume is damaged in slabs along y. The random
+    numbers of every plane are derived from a single seed per call, and each slab has a halo covering the
+    smoothing of the field, the displacement and the knock-on neighbourhood, so the result does not depend
+    on the slabs. normalize always runs on the whole volume.
+
     Args:
         volume (Volume): The input volume to be deformed.
         knock_on (float, optional): The knock-on effect strength. Defaults to 0.01.
@@ -66,9 +100,14 @@ def beamdamage(volume: Volume, knock_on: float = 0.01, elastic_deform:float=0.1,
     Returns:
         Volume: The deformed volume.
     """
-    
-    volume.data = _deform(volume.data, elastic_deform, normalize)
-    volume.data = _knockon(volume.data, knock_on)
+    # Drawn from the global generator, so numpy.random.seed makes the damage reproducible
+    seed = int(np.random.randint(2**31))
+    count = xp.xupy.count_nonzero(volume.data)
+    halo = max(int(_TRUNCATE * _SIGMA + 0.5), math.ceil(elastic_deform) + 1)
+    data = planner.map_slabs(lambda block, start: _deform(block, elastic_deform, (seed, 0), start), volume.data,
+                             _beamdamage_memory, axis=0, halo=halo, label='Elastic Deformation', offset=True)
+    if normalize:
+        data = _normalize(data, count)
+    volume.data = planner.map_slabs(lambda block, start: _knockon(block, knock_on, (seed, 1), start), data,
+                                    _knockon_memory, axis=0, halo=1, label='Knock-on Damage', offset=True)
     return volume
-
-
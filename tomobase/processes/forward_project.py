@@ -1,4 +1,3 @@
-import astra
 import numpy as np
 
 from tomobase.utils import _create_projector
@@ -7,8 +6,9 @@ from tomobase.log import logger
 from tomobase.hooks import tomobase_hook_process
 from tomobase.registrations.transforms import TOMOBASE_TRANSFORM_CATEGORIES
 
-from magicgui import magicgui
-from magicgui.tqdm import trange
+from tomobase.lazy import lazy_import, trange
+
+astra = lazy_import('astra')
 
 
 @tomobase_hook_process(name='Project', category=TOMOBASE_TRANSFORM_CATEGORIES.PROJECT.value, use_numpy=True)
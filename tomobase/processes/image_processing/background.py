@@ -1,8 +1,7 @@
 import numpy as np
 from copy import deepcopy, copy
 
-from scipy.ndimage import  binary_dilation
-from skimage.filters import threshold_otsu
+from ...lazy import lazy_callable
 
 from ...hooks import tomobase_hook_process
 from ...data import Sinogram, Image, Data
@@ -12,9 +11,20 @@ from ...registrations.environment import xp, GPUContext
 import io
 from typing import Union
 
+binary_dilation = lazy_callable('scipy.ndimage', 'binary_dilation')
+threshold_otsu = lazy_callable('skimage.filters', 'threshold_otsu')
+
 
 _subcategories = ['Background Corrections']
-@tomobase_hook_process(category=TOMOBASE_TRANSFORM_CATEGORIES.IMAGE_PROCESSING.value, subcategories=_subcategories)
+
+
+def _background_subtract_median_kernel(image: Data):
+    median = image.statistics.median()
+    return lambda data: xp.xupy.where(data < median, 0, data)
+
+
+@tomobase_hook_process(category=TOMOBASE_TRANSFORM_CATEGORIES.IMAGE_PROCESSING.value, subcategories=_subcategories,
+                       kernel=_background_subtract_median_kernel, kernel_statistics=True)
 def background_subtract_median(image: Data):
     """Subtract the median of the sinogram from the sinogram."
 
@@ -25,7 +35,8 @@ def background_subtract_median(image: Data):
         Data: The resulting image data
     """
     
-    median = xp.xupy.median(image.data)
+    median = image.statistics.median()
+    image.ensure_writable()
     image.data[image.data<median] = 0
 
     return image
@@ -6,7 +6,7 @@ from ...registrations.environment import xp
 from ...data import Sinogram, Data
 
 from typing import Union, Tuple
-from magicgui.tqdm import tqdm
+from ...lazy import tqdm
 
 
 _subcategories = ['Misalignment']
@@ -23,7 +23,12 @@ def gaussian_filter(obj: Data, gaussian_sigma:float=1,):
     obj.data = xp.scipy.ndimage.gaussian_filter(obj.data, gaussian_sigma)
     return obj
 
-@tomobase_hook_process(category=TOMOBASE_TRANSFORM_CATEGORIES.IMAGE_PROCESSING.value, subcategories=_subcategories)
+def _poisson_noise_kernel(obj: Data, rescale: float = True):
+    return lambda data: xp.xupy.random.poisson(data*rescale)
+
+
+@tomobase_hook_process(category=TOMOBASE_TRANSFORM_CATEGORIES.IMAGE_PROCESSING.value, subcategories=_subcategories,
+                       kernel=_poisson_noise_kernel, cacheable=False)
 def poisson_noise(obj: Data, 
                   rescale:float=True):
     """Add Poisson noise to the sinogram.
@@ -40,7 +45,8 @@ def poisson_noise(obj: Data,
 
 
 
-@tomobase_hook_process(category=TOMOBASE_TRANSFORM_CATEGORIES.IMAGE_PROCESSING.value, subcategories=_subcategories)
+@tomobase_hook_process(category=TOMOBASE_TRANSFORM_CATEGORIES.IMAGE_PROCESSING.value, subcategories=_subcategories,
+                       cacheable=False)
 def translational_misalignment(sino: Sinogram, offset:float=0.25):
     """ Apply a random translational misalignment to the sinogram.
     Arguments:
@@ -51,15 +57,16 @@ def translational_misalignment(sino: Sinogram, offset:float=0.25):
         sino (Sinogram): The result
         shifts (ndarray): The shifts applied to each projection (only if extend_return is True)
     """
-    
-    shifts = xp.xupy.zeros((sino.data.shape[0], 2))
+    sino.ensure_writable()
+    xupy = xp.backend().xupy
+    shifts = xupy.zeros((sino.data.shape[0], 2))
     for i in tqdm(range(sino.data.shape[0]), label='Translational Misalignment'):
         if i == 0:
             shifts[i, :] = 0
             continue
-        image_offset_x = int(xp.xupy.round(sino.data.shape[1] * xp.xupy.random.uniform(-offset, offset)))
-        image_offset_y = int(xp.xupy.round(sino.data.shape[2] * xp.xupy.random.uniform(-offset, offset)))
-        sino.data[i, :, :] = xp.xupy.roll(sino.data[i, :, :], (image_offset_x, image_offset_y), axis=(0, 1))
+        image_offset_x = int(xupy.round(sino.data.shape[1] * xupy.random.uniform(-offset, offset)))
+        image_offset_y = int(xupy.round(sino.data.shape[2] * xupy.random.uniform(-offset, offset)))
+        sino.data[i, :, :] = xupy.roll(sino.data[i, :, :], (image_offset_x, image_offset_y), axis=(0, 1))
         shifts[i, :] = (image_offset_x, image_offset_y)
 
 
@@ -67,7 +74,8 @@ def translational_misalignment(sino: Sinogram, offset:float=0.25):
 
     
     
-@tomobase_hook_process(category=TOMOBASE_TRANSFORM_CATEGORIES.IMAGE_PROCESSING.value, subcategories=_subcategories)
+@tomobase_hook_process(category=TOMOBASE_TRANSFORM_CATEGORIES.IMAGE_PROCESSING.value, subcategories=_subcategories,
+                       cacheable=False)
 def rotational_misalignment(sino: Sinogram, 
                             tilt_theta:float = 3,
                             tilt_alpha:float=2, 
@@ -86,6 +94,7 @@ def rotational_misalignment(sino: Sinogram,
         rotations (ndarray): The rotations applied to each projection (only if extend_return is True)
     """
 
+    sino.ensure_writable()
     angles_original =  deepcopy(sino.angles)  
     rotations = xp.xupy.zeros(sino.data.shape[0])
     for i in tqdm(range(sino.data.shape[0]), label='Rotational Misalignment'):
@@ -5,7 +5,16 @@ from ...hooks import tomobase_hook_process
 
 
 _subcategories =['Image Scaling']
-@tomobase_hook_process(name='Normalize', category=TOMOBASE_TRANSFORM_CATEGORIES.IMAGE_PROCESSING.value, subcategories=_subcategories)
+
+
+def _normalize_kernel(sino: Sinogram):
+    lower = sino.statistics.min()
+    scale = 1 / (sino.statistics.max() - lower)
+    return lambda data: (data - lower) * scale
+
+
+@tomobase_hook_process(name='Normalize', category=TOMOBASE_TRANSFORM_CATEGORIES.IMAGE_PROCESSING.value, subcategories=_subcategories,
+                       kernel=_normalize_kernel, kernel_statistics=True)
 def normalize(sino: Sinogram):
     """Normalize the sinogram data to the range [0, 1].
     
@@ -16,7 +25,8 @@ def normalize(sino: Sinogram):
         Sinogram: The result
 
     """
-    sino.data = (sino.data - xp.xupy.min(sino.data)) / (xp.xupy.max(sino.data) - xp.xupy.min(sino.data))
+    lower = sino.statistics.min()
+    sino.data = (sino.data - lower) / (sino.statistics.max() - lower)
     return sino
 
 @tomobase_hook_process(name='Bin Data', category=TOMOBASE_TRANSFORM_CATEGORIES.IMAGE_PROCESSING.value, subcategories=_subcategories)
@@ -1,12 +1,11 @@
-import logging
 import time
-import progressbar
-from qtpy.QtCore import QObject, Signal
 
 from tomobase.registrations.base import ItemDictNonSingleton, ItemDict, Item
 from tomobase.registrations.environment import xp
 
-import plotly.graph_objects as go
+from tomobase.lazy import lazy_import
+
+go = lazy_import('plotly.graph_objects')
 
 
 def concatenate(df, *args, **kwargs):
@@ -1,27 +1,43 @@
+import numpy as np
 from tomobase.data import Data, Volume
 from tomobase.registrations.environment import xp
 from tomobase.registrations.transforms import TOMOBASE_TRANSFORM_CATEGORIES
 from tomobase.hooks import tomobase_hook_process
+from tomobase import planner
 
 subcategory = ['Phyiscal Properties']
-@tomobase_hook_process(name='Surface Area', category=TOMOBASE_TRANSFORM_CATEGORIES.QUANTIFICATION.value, subcategories=subcategory, isquantification=True)
-def surface_area(volume: Volume, threshold: float = 0.0, ):
-    if xp.xupy.isclose(threshold, 0.0):
-        threshold = xp.skimage.filters.threshold_otsu(volume.data)
-    mask = xp.xupy.zeros_like(volume.data)
-    mask[volume.data > threshold] = 1
+
+def _surface(data, threshold):
+    # Voxels with both foreground and background in their 3x3x3 neighbourhood
+    mask = xp.xupy.zeros_like(data)
+    mask[data > threshold] = 1
 
     kernel = xp.xupy.ones((3, 3, 3))
     mask= xp.scipy.ndimage.convolve(mask, kernel, mode='constant', cval=0.0)/27
     mask[mask == 1] = 0
     mask[mask > 0] = 1
-    value = xp.xupy.sum(mask) * volume.pixelsize**2
+    return mask
+
+def _surface_area_memory(shape, dtype, **kwargs):
+    # The mask, its convolution and the scaled convolution in the input dtype, and the comparisons
+    return int(np.prod(shape)) * (3 * np.dtype(dtype).itemsize + 2)
+
+@tomobase_hook_process(name='Surface Area', category=TOMOBASE_TRANSFORM_CATEGORIES.QUANTIFICATION.value, subcategories=subcategory, isquantification=True,
+                       memory=_surface_area_memory, slabbed=True)
+def surface_area(volume: Volume, threshold: float = 0.0, ):
+    if xp.xupy.isclose(threshold, 0.0):
+        threshold = volume.statistics.otsu()
+    # Counted in slabs with a halo of one voxel when the volume does not fit the memory budget of tomobase.planner
+    count = 0
+    for block, inner, _ in planner.slabs(volume.data, _surface_area_memory, axis=0, halo=1, label='Surface Area'):
+        count += xp.xupy.sum(_surface(block, threshold)[inner])
+    value = count * volume.pixelsize**2
     return value
 
 @tomobase_hook_process(name='Volume', category=TOMOBASE_TRANSFORM_CATEGORIES.QUANTIFICATION.value, subcategories=subcategory, isquantification=True)
 def volume(volume: Volume, threshold: float = 0.0):
     if xp.xupy.isclose(threshold, 0.0):
-        threshold = xp.skimage.filters.threshold_otsu(volume.data)
+        threshold = volume.statistics.otsu()
     mask = xp.xupy.zeros_like(volume.data)
     mask[volume.data > threshold] = 1
     value = xp.xupy.sum(mask) * volume.pixelsize**3
@@ -30,7 +46,7 @@ def volume(volume: Volume, threshold: float = 0.0):
 @tomobase_hook_process(name='Surface Area Volume Ratio', category=TOMOBASE_TRANSFORM_CATEGORIES.QUANTIFICATION.value, subcategories=subcategory, isquantification=True)
 def sav(volume: Volume, threshold: float = 0.0):
     if xp.xupy.isclose(threshold, 0.0):
-        threshold = xp.skimage.filters.threshold_otsu(volume.data)
+        threshold = volume.statistics.otsu()
     sa = surface_area(volume, threshold)
     vol = volume(volume, threshold)
     value = sa / vol
@@ -46,7 +62,7 @@ def alloying(volume: Volume, reference:Volume, materiala:float=0.0, materialb:fl
     Returns:
         float: The alloying value.
     """
-    std_reference = xp.xupy.std(reference.data)
+    std_reference = reference.statistics.std()
     if xp.xupy.isclose(std_homogenized, 0.0) and xp.xupy.isclose(std_reference, 0.0):
         materiala_count = reference.data[xp.xupy.isclose(reference.data, materiala)].count()
         materiala_sum = reference.data[xp.xupy.isclose(reference.data, materiala)].sum()
@@ -60,6 +76,6 @@ def alloying(volume: Volume, reference:Volume, materiala:float=0.0, materialb:fl
         homogenized_data *= (materiala_sum + materialb_sum)/(materiala_count + materialb_count)
 
         std_homogenized = xp.xupy.std(homogenized_data)
-    std_volume = xp.xupy.std(volume.data)
+    std_volume = volume.statistics.std()
     value = (std_volume - std_reference)/(std_homogenized - std_reference)
     return value
\ No newline at end of file
@@ -13,8 +13,8 @@ def ssim( image:Data, reference:Data):
         data_range = 255
     elif image.data.dtype == xp.xupy.float32 or image.data.dtype == xp.xupy.float64:
         data_range = 1.0
-        if image.data.max() > 1.0:
-            data_range = image.data.max() - image.data.min()
+        if image.statistics.max() > 1.0:
+            data_range = image.statistics.max() - image.statistics.min()
     value = xp.skimage.metrics.structural_similarity(image.data, reference.data, data_range=data_range)
     return value
 
@@ -24,8 +24,8 @@ def psnr(image:Data, reference:Data):
         data_range = 255
     elif image.data.dtype == xp.xupy.float32 or image.data.dtype == xp.xupy.float64:
         data_range = 1.0
-        if image.data.max() > 1.0:
-            data_range = image.data.max() - image.data.min()
+        if image.statistics.max() > 1.0:
+            data_range = image.statistics.max() - image.statistics.min()
     value = xp.skimage.metrics.peak_signal_noise_ratio(image.data, reference.data, data_range=data_range)
     return value
 
@@ -42,7 +42,7 @@ def mae(image:Data, reference:Data):
 @tomobase_hook_process(name='Signal To Noise',category=TOMOBASE_TRANSFORM_CATEGORIES.QUANTIFICATION.value, subcategories=_subcategory, isquantification=True)
 def snr(Image:Data):
     #Normalize Prior to Using
-    value = 10*xp.xupy.log10((xp.xupy.mean(Image.data)**2)/(xp.xupy.std(Image.data)**2))
+    value = 10*xp.xupy.log10((Image.statistics.mean()**2)/(Image.statistics.std()**2))
     return value
 
 
@@ -1,17 +1,29 @@
-import astra
 import numpy as np
-from copy import deepcopy
-from scipy import ndimage
 
 from ..utils import _create_projector, _get_default_iterations, _circle_mask
+from .weighting import angular_weights
 from ..data import Volume, Sinogram
 from ..hooks import tomobase_hook_process
 from ..registrations.transforms import TOMOBASE_TRANSFORM_CATEGORIES
 
 from ..log import  logger
-from magicgui.tqdm import tqdm, trange
+from ..lazy import lazy_import, tqdm, trange
 
-@tomobase_hook_process(name='OpTomo', category=TOMOBASE_TRANSFORM_CATEGORIES.RECONSTRUCT.value, use_numpy=True)
+astra = lazy_import('astra')
+
+def _reconstruct_memory(shape, dtype, **kwargs):
+    # The float64 volume of (x, y, y) voxels, built slice by slice from the sinogram of (n, x, y)
+    n, x, y = shape
+    return x * y * y * 8 + y * y
+
+
+def _optomo_memory(shape, dtype, **kwargs):
+    # The reconstruction and the sorted copy of the sinogram
+    return _reconstruct_memory(shape, dtype) + int(np.prod(shape)) * np.dtype(dtype).itemsize
+
+
+@tomobase_hook_process(name='OpTomo', category=TOMOBASE_TRANSFORM_CATEGORIES.RECONSTRUCT.value, use_numpy=True,
+                       memory=_optomo_memory)
 def optomo_reconstruct(sino:Sinogram, iterations:int=0, use_gpu:bool=True, weighted:bool=False):
     """Reconstruct a volume from a given sinogram using SIRT ASTRA. Allows for projections to be weighted by angular distribution.
     Arguments:
@@ -31,21 +43,8 @@ def optomo_reconstruct(sino:Sinogram, iterations:int=0, use_gpu:bool=True, weigh
     data = sino.data[indices, : ,:]
     data = np.transpose(data, (1,0,2)) # ASTRA expects (z, n, d)
  
-    weights= np.ones_like(sino.angles)
-    if weighted == True:
-        sorted_angles = deepcopy(sino.angles) +  90
-        n_angles = len(sorted_angles)
-        for i in range(len(sorted_angles)):
-            if i == 0:
-                weights[i] = 0.5*(180 - sorted_angles[n_angles-1] + sorted_angles[i+1])
-            elif i == len(sorted_angles)-1:
-                weights[i] = 0.5*(180 - sorted_angles[n_angles-2] + sorted_angles[0])
-            else:
-                weights[i] = 0.5*((sorted_angles[i+1] - sorted_angles[i]) + (sorted_angles[i] - sorted_angles[i-1]))
-        ratio = 180/(n_angles-1)
-        weights = weights/ratio
-    
-    
+    weights = angular_weights(sino.angles)[:, None] if weighted else 1.0
+
     use_gpu = use_gpu and astra.use_cuda()
 
     if iterations is None:
@@ -58,12 +57,7 @@ def optomo_reconstruct(sino:Sinogram, iterations:int=0, use_gpu:bool=True, weigh
     vol = np.zeros((z, d, d))
     default_mask = _circle_mask(d)
 
-    mask = None
-    if mask is None:
-        mask = np.ones((z, d, d), dtype=bool)
-    else:
-        mask = np.transpose(mask, (2, 1, 0))  # ASTRA expects (z, y, x)
-
+    maxc = sino.statistics.max()
     W = astra.OpTomo(proj_id)
     domain_shape = np.ones((d, d))
     range_shape = np.ones((n, d))
@@ -76,13 +70,13 @@ def optomo_reconstruct(sino:Sinogram, iterations:int=0, use_gpu:bool=True, weigh
 
     for i in trange(z, label='Reconstruction Slice'):
         for j in trange(iterations,label='Reconstruction Iteration'):
-            A = np.transpose(np.transpose(np.reshape(W*vol[i, :, :], (n, d)), (1,0))*weights,(1,0)) 
-            B = np.transpose(np.reshape(np.transpose(data[i, :, :],(1,0))*weights,(d,n)), (1,0))
+            A = np.reshape(W*vol[i, :, :], (n, d))*weights
+            B = data[i, :, :]*weights
             D = R*(B - A)
             vol[i, :, :] += C*np.reshape(W.T*D,(d,d))
-            vol[i, :, :] = np.reshape(np.minimum(vol[i, :, :], data.max()), (d, d))
+            vol[i, :, :] = np.reshape(np.minimum(vol[i, :, :], maxc), (d, d))
             vol[i, :, :] = np.reshape(np.maximum(vol[i, :, :], 0), (d, d))
-            vol[i, :, :] = vol[i, :, :] * (default_mask & mask[i, :, :])
+            vol[i, :, :] = vol[i, :, :] * default_mask
 
     volume = Volume(np.transpose(vol, (2, 1,0)), sino.pixelsize)  # ASTRA gives (z, y, x)
     astra.astra.delete(proj_id)
@@ -90,7 +84,8 @@ def optomo_reconstruct(sino:Sinogram, iterations:int=0, use_gpu:bool=True, weigh
     return volume
 
 
-@tomobase_hook_process(name='Astra', category=TOMOBASE_TRANSFORM_CATEGORIES.RECONSTRUCT.value, use_numpy=True)
+@tomobase_hook_process(name='Astra', category=TOMOBASE_TRANSFORM_CATEGORIES.RECONSTRUCT.value, use_numpy=True,
+                       memory=_reconstruct_memory)
 def astra_reconstruct(sino:Sinogram, method:str='sirt', iterations:int=0, use_gpu:bool=True):
     """Reconstruct a volume from a given sinogram.
 
@@ -106,9 +101,6 @@ def astra_reconstruct(sino:Sinogram, method:str='sirt', iterations:int=0, use_gp
             for the given algorithm (default: None)
         use_gpu (bool)
             Use a GPU if it is available (default: True)
-        mask (numpy.ndarray)
-            Boolean mask that indicates which voxels should be used in the
-            reconstruction (default: None)
 
     Returns:
         Volume
@@ -139,19 +131,13 @@ def astra_reconstruct(sino:Sinogram, method:str='sirt', iterations:int=0, use_gp
     vol = np.empty((z, d, d))
     default_mask = _circle_mask(d)
 
-    mask = None
-    if mask is None:
-        mask = np.ones((z, d, d), dtype=bool)
-    else:
-        mask = np.transpose(mask, (2, 1, 0))  # ASTRA expects (z, y, x)
-
-
+    maxc = sino.statistics.max()
     for i in trange(z, label='Reconstruction Slice'):
         vol_id, vol[i, :, :] = astra.creators.create_reconstruction(
             method, proj_id, data[i, :, :], iterations,
             use_minc='yes', minc=0.0,           # min is zero
-            use_maxc='yes', maxc=data.max(),    # max voxel can't be larger than max from sino
-            use_mask='yes', mask=default_mask & mask[i, :, :],
+            use_maxc='yes', maxc=maxc,    # max voxel can't be larger than max from sino
+            use_mask='yes', mask=default_mask,
         )
         astra.astra.delete(vol_id)
         
@@ -0,0 +1,50 @@
+import numpy as np
+from functools import lru_cache
+
+from ..registrations.environment import xp, GPUContext
+
+
+@lru_cache(maxsize=32)
+def _cached_weights(key: bytes) -> np.ndarray:
+    angles = np.sort(np.frombuffer(key, dtype=np.float64))
+    n = angles.shape[0]
+    if n < 2:
+        weights = np.ones(n)
+    else:
+        # The tilt range wraps around with a period of 180 degrees
+        extended = np.concatenate(([angles[-1] - 180], angles, [angles[0] + 180]))
+        spacing = np.diff(extended)
+        weights = 0.5 * (spacing[1:] + spacing[:-1]) / (180 / (n - 1))
+    weights.setflags(write=False)
+    return weights
+
+
+def angular_weights(angles) -> np.ndarray:
+    """Get the weight of every projection from the angular distance to its neighbours.
+
+    The weights are normalised such that an evenly spaced tilt series over the full 180 degrees has a
+    weight of one for every projection. The result is cached per set of angles so repeated
+    reconstructions of the same tilt series do not recompute it.
+
+    Args:
+        angles (numpy.ndarray): The tilt angles in degrees
+
+    Returns:
+        numpy.ndarray: The read-only weights in the order of the sorted angles
+    """
+    angles = np.ascontiguousarray(xp.asarray(angles, GPUContext.NUMPY), dtype=np.float64)
+    return _cached_weights(angles.tobytes())
+
+
+def apply_angular_weights(data, weights):
+    """Scale every projection of the (n, x, y) data in-place by its weight.
+
+    Args:
+        data (numpy.ndarray | cupy.ndarray): The floating point projections sorted by angle
+        weights (numpy.ndarray): The weights from ``angular_weights``
+
+    Returns:
+        numpy.ndarray | cupy.ndarray: The weighted data
+    """
+    data *= xp.xupy.asarray(weights, dtype=data.dtype)[:, None, None]
+    return data
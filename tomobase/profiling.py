@@ -0,0 +1,159 @@
+"""
+Timing and memory instrumentation of registered processes.
+
+Every call of a ``tomobase_hook_process`` function is recorded while a
+:class:`ProcessProfiler` is active. Nothing is measured otherwise.
+
+Example:
+
+    with profile() as profiler:
+        sino = project(volume, angles)
+        volume = astra_reconstruct(sino)
+    print(profiler.summary())
+"""
+import time
+import tracemalloc
+
+from .data.base import Data
+from .lazy import lazy_import
+
+pd = lazy_import('pandas')
+
+_profilers = []
+# Peak allocations of the calls in progress, used to report the peak of nested calls correctly
+_frames = []
+
+
+def _nbytes(value) -> int:
+    if isinstance(value, Data):
+        return int(getattr(value.data, 'nbytes', 0))
+    if isinstance(value, dict):
+        return sum(_nbytes(item) for item in value.values())
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(item) for item in value)
+    return 0
+
+
+class ProcessProfiler:
+    """Records the wall time, CPU time, peak allocation and data sizes of every process call.
+
+    Peak allocations are measured with ``tracemalloc`` and only include memory allocated through
+    Python, such as numpy arrays, GPU memory is not included. Tracing slows down allocation heavy code,
+    use ``memory=False`` to only record times and sizes.
+
+    Args:
+        memory (bool): Record the peak allocation of every call (default: True)
+
+    Attributes:
+        records (list[dict]): One entry per call with the keys process, depth, start, wall_time, cpu_time, peak_memory, input_bytes and output_bytes
+    """
+
+    def __init__(self, memory: bool = True):
+        self.memory = memory
+        self.records = []
+        self._started_tracing = False
+
+    def __enter__(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        _profilers.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        _profilers.remove(self)
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return False
+
+    def to_dataframe(self) -> 'pd.DataFrame':
+        """Get the run log with one row per process call"""
+        columns = ['process', 'depth', 'start', 'wall_time', 'cpu_time', 'peak_memory', 'input_bytes', 'output_bytes']
+        return pd.DataFrame(self.records, columns=columns)
+
+    def summary(self) -> 'pd.DataFrame':
+        """Get the number of calls, total times and the largest peak allocation per process, slowest first"""
+        df = self.to_dataframe()
+        summary = df.groupby('process').agg(calls=('wall_time', 'size'), wall_time=('wall_time', 'sum'),
+                                            cpu_time=('cpu_time', 'sum'), peak_memory=('peak_memory', 'max'),
+                                            input_bytes=('input_bytes', 'sum'), output_bytes=('output_bytes', 'sum'))
+        return summary.sort_values('wall_time', ascending=False)
+
+    def clear(self):
+        """Forget all records"""
+        self.records = []
+
+
+def profile(memory: bool = True) -> ProcessProfiler:
+    """Profile every process call inside a ``with`` block.
+
+    Args:
+        memory (bool): Record the peak allocation of every call (default: True)
+
+    Returns:
+        ProcessProfiler: The profiler, use it as a context manager
+    """
+    return ProcessProfiler(memory)
+
+
+class _Call:
+    # Measures a single process call for every active profiler
+    def __init__(self, name: str, kwargs: dict):
+        self.name = name
+        self.input_bytes = _nbytes(list(kwargs.values()))
+        self.output_bytes = 0
+
+    def output(self, results):
+        self.output_bytes = _nbytes(results)
+
+    def __enter__(self):
+        self.tracing = tracemalloc.is_tracing()
+        if self.tracing:
+            self.base, peak = tracemalloc.get_traced_memory()
+            if _frames:
+                _frames[-1] = max(_frames[-1], peak)
+            tracemalloc.reset_peak()
+            _frames.append(0)
+        self.start = time.time()
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        wall_time = time.perf_counter() - self.wall
+        cpu_time = time.process_time() - self.cpu
+        peak_memory = None
+        if self.tracing and tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, _frames.pop())
+            peak_memory = peak - self.base
+            if _frames:
+                _frames[-1] = max(_frames[-1], peak)
+        record = {'process': self.name, 'depth': len(_frames), 'start': self.start, 'wall_time': wall_time,
+                  'cpu_time': cpu_time, 'peak_memory': peak_memory, 'input_bytes': self.input_bytes,
+                  'output_bytes': self.output_bytes}
+        for profiler in _profilers:
+            profiler.records.append(record)
+        return False
+
+
+class _NoCall:
+    def output(self, results):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_CALL = _NoCall()
+
+
+def record(name: str, kwargs: dict):
+    """Measure a process call if a profiler is active, used by the ``tomobase_hook_process`` wrapper"""
+    if not _profilers:
+        return _NO_CALL
+    return _Call(name, kwargs)
@@ -1,8 +1,11 @@
 from ..log import logger
 import os
+import functools
 import importlib
+import importlib.util
 import inspect
 from collections.abc import Iterable
+from .manifest import load_manifest, LazyHook
 from colorama import Fore, Style, init
 init(autoreset=True)
 
@@ -54,12 +57,31 @@ class Item(object):
             _dict = {}
             return _dict.items()
 
-class ItemDictNonSingleton():      
+@functools.lru_cache(maxsize=4096)
+def normalise_key(key: str) -> str:
+    """The key under which a name is stored in an ItemDict, e.g. 'Bin Data' -> 'BIN_DATA'"""
+    return key.upper().replace(' ', '_')
+
+
+def _hashable(value) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+class ItemDictNonSingleton():
+    # Attributes of the dictionary itself, every other attribute is stored as an item
+    _attributes = ('_index', '_dict', '_values', '_module', '_folder', '_hook', '_item_class')
+
     def __init__(self, **kwargs):
         
         # Note For Developers check setattr otherwise youll include your variables as dict keys and this will mess the whole dict up
         self._index = 0
         self._dict = {}
+        # Reverse index of the hashable item values, value -> normalised key, kept consistent by _store and __delitem__
+        self._values = {}
         self._item_class = kwargs.get('item_class', Item)
         
         #Default Values for using the plugins system 
@@ -70,20 +92,15 @@ class ItemDictNonSingleton():
         reserved_keys = ['_index', '_dict', '_module', '_folder', '_hook', '_item_class', 'item_class']
         for key, value in kwargs.items():
             if key not in reserved_keys:
-                newkey = key.upper()
-                newkey = newkey.replace(' ', '_')
-                if value is None:
-                    value = self._index
-                self._dict[newkey] = self._item_class(value, key)
-                self._index += 1
+                self[key] = value
             
     def __setattr__(self, key, value):
-        if key in ['_index', '_dict', '_module', '_folder', '_hook', '_item_class']:
+        if key in self._attributes:
             # Allow these keys to be set as attributes
             super().__setattr__(key, value)
         else:
             # Add other keys to the internal dictionary
-            self._dict[key] = value
+            self._store(key, value)
 
     def __getattr__(self, key):
         try:
@@ -95,37 +112,90 @@ class ItemDictNonSingleton():
         return self._dict[key]
     
     def __setitem__(self, key, value):
-        if key in self._dict:
+        if normalise_key(key) in self._dict:
             pass
         else:
             if value is None:
                 value = self._index
-            newkey = key.upper()
-            newkey = newkey.replace(' ', '_')
-            self._dict[newkey] = self._item_class(value, key)
+            self._store(normalise_key(key), self._item_class(value, key))
             self._index += 1
+
+    def __delitem__(self, key):
+        item = self._dict.pop(normalise_key(key))
+        value = getattr(item, 'value', None)
+        if _hashable(value) and self._values.get(value) == normalise_key(key):
+            del self._values[value]
+
+    def __contains__(self, key):
+        return normalise_key(key) in self._dict
+
+    def _store(self, key, item):
+        self._dict[key] = item
+        value = getattr(item, 'value', None)
+        # The first item registered with a value is found by loc and key, as with a linear scan
+        if _hashable(value) and value not in self._values:
+            self._values[value] = key
         
     def __len__(self):
         return self._index
-    
-    def loc(self, index):
+
+    def _find(self, index):
+        # The key of the item with the given value, the index is rebuilt if an item value was changed in place
+        if _hashable(index):
+            key = self._values.get(index)
+            if key is not None and key in self._dict and self._dict[key].value == index:
+                return key
         for key, item in self._dict.items():
             if item.value == index:
-                return self._dict[key]
+                if _hashable(index):
+                    self._reindex()
+                return key
+        return None
+
+    def _reindex(self):
+        self._values = {}
+        for key, item in self._dict.items():
+            value = getattr(item, 'value', None)
+            if _hashable(value) and value not in self._values:
+                self._values[value] = key
+
+    def loc(self, index):
+        key = self._find(index)
+        if key is not None:
+            return self._dict[key]
         logger.warning(f"Index {index} not found in the dictionary")
         
     def items(self):
         return self._dict.items()
     
     def key(self, index):
-        for key, item in self._dict.items():
-            if item.value == index:
-                return key
+        key = self._find(index)
+        if key is not None:
+            return key
         logger.warning(f"Index {index} not found in the dictionary")
+
+    def register(self, name: str, value=None):
+        """Add an item unless its normalised name is already registered.
+
+        Args:
+            name (str): The display name of the item, it is stored under its upper case name with underscores
+            value: The value of the item, the next integer index if None (default: None)
+
+        Returns:
+            Item: The registered item, or the existing item with the same name
+        """
+        self[name] = value
+        return self._dict[normalise_key(name)]
         
-    def append(self, **kwargs):
-        for key, value in kwargs.items():
+    def append(self, items: dict | None = None, **kwargs):
+        """Register several items at once from a mapping of names to values and/or keyword arguments"""
+        for key, value in {**(items or {}), **kwargs}.items():
             self[key] = value
+
+    def remove(self, name: str):
+        """Remove an item by its name, unknown names are ignored"""
+        if name in self:
+            del self[name]
                 
     def help(self):
         msg = "\n"
@@ -135,22 +205,26 @@ class ItemDictNonSingleton():
 
             
     def update(self):
+        """Register the hooks of every module in the plugin folder. Modules are not imported, the hooks are
+        read from a cached manifest and registered as lazy proxies, see tomobase.registrations.manifest"""
         spec = importlib.util.find_spec(self._module)
         if spec is None or spec.origin is None:
             raise ImportError(f"Cannot find the {self._module} package")
 
         path = os.path.dirname(spec.origin)
-        tiltscheme_path = os.path.join(path, self._folder)
-        for root, _, files in os.walk(tiltscheme_path):
-            for filename in files:
-                if filename.endswith('.py'):
-                    module_path = os.path.relpath(os.path.join(root, filename), start=path)
-                    module_name = self._module+'.'+ module_path.replace(os.sep, '.')[:-3]
-                    module = importlib.import_module(module_name)
-                    for name, obj in inspect.getmembers(module):
-                        if inspect.isclass(obj) or inspect.isfunction(obj):
-                            if hasattr(obj, self._hook):
-                                self._update_item(obj)
+        for entry in load_manifest(self._module, self._folder, path):
+            if entry.get('dynamic', False):
+                self._update_module(entry['module'])
+            elif entry['hook'] == self._hook:
+                self._update_item(LazyHook(entry))
+
+    def _update_module(self, module_name):
+        # Import a module and register its hooks directly, used for modules the manifest cannot describe
+        module = importlib.import_module(module_name)
+        for name, obj in inspect.getmembers(module):
+            if inspect.isclass(obj) or inspect.isfunction(obj):
+                if hasattr(obj, self._hook):
+                    self._update_item(obj)
                             
     def _update_item(self, obj):
         self[obj.tomobase_name] = obj
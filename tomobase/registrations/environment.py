@@ -1,14 +1,35 @@
+import sys
 import enum
+import types
+import weakref
 import logging
 import numpy as np
-import pandas as pd
+from typing import NamedTuple
 from tomobase.log import logger
+from tomobase.registrations.transfers import TransferTracker, conversion_helper, convert
 
 class GPUContext(enum.Enum):
     CUPY = 1
     NUMPY = 2
 
 
+class Backend(NamedTuple):
+    """The modules of a backend, bound once so tight loops avoid the dispatch of the ``xp`` proxies.
+
+    Attributes:
+        xupy (module): The array module, numpy or cupy
+        scipy (module): The scientific module, scipy or cupyx.scipy
+        skimage (module): The image processing module
+        df (BackendProxy): The DataFrame module, resolved when it is first used
+        context (GPUContext): The context the modules belong to
+    """
+    xupy: types.ModuleType
+    scipy: types.ModuleType
+    skimage: types.ModuleType
+    df: 'BackendProxy'
+    context: GPUContext
+
+
 class EnvironmentContext:
     _instance = None
 
@@ -22,19 +43,47 @@ class EnvironmentContext:
         self._cupy_available = False
         self.context = GPUContext.NUMPY
         self.device = 0
-        self.device_count = 1
+        self._device_count = None
 
-        import numpy as np
-        import pandas as pd
-        import scipy
-        import skimage
+        # pandas and the optional cupy backend are only imported when they are first used. The proxies
+        # follow the current context, set_context swaps the module getters and clears what they resolved
+        self._modules = {'xupy': _numpy, 'scipy': _scipy, 'df': _pandas, 'skimage': _skimage}
+        self._backend = None
+        self._xupy = BackendProxy(lambda: self._modules['xupy']())
+        self._scipy = BackendProxy(lambda: self._modules['scipy']())
+        self._df = BackendProxy(lambda: self._modules['df']())
+        self._skimage = BackendProxy(lambda: self._modules['skimage']())
 
-        self._xupy = BackendProxy(lambda:np)
-        self._scipy = BackendProxy(lambda:scipy)
-        self._df = BackendProxy(lambda:pd)
-        self._skimage = BackendProxy(lambda:skimage)
+    def backend(self) -> Backend:
+        """
+        Return the modules of the current context. Bind them once at the start of a process, e.g.
+        ``xupy = xp.backend().xupy``, to call them in loops without the dispatch of ``xp.xupy``.
+        The modules are only valid until the context is changed.
+        """
+        if self._backend is None:
+            self._backend = Backend(self._modules['xupy'](), self._modules['scipy'](), self._modules['skimage'](),
+                                    self._df, self.context)
+        return self._backend
+
+    def _set_modules(self, **modules):
+        # Processes set and restore the context on every call, resolved attributes are only cleared on a real change
+        if all(self._modules[name] is getter for name, getter in modules.items()):
+            return
+        self._modules.update(modules)
+        self._backend = None
+        BackendProxy.invalidate()
 
-        self.check_cupy()
+    @property
+    def device_count(self) -> int:
+        """
+        Return the number of GPUs, cupy is imported the first time this is used.
+        """
+        if self._device_count is None:
+            self._device_count = 1
+            if self.check_cupy():
+                import cupy as cp
+                self._device_count = cp.cuda.runtime.getDeviceCount()
+        return self._device_count
     
     @property
     def df(self):
@@ -70,7 +119,6 @@ class EnvironmentContext:
             try:
                 import cupy as cp
                 self._cupy_available = True
-                self.device_count = cp.cuda.runtime.getDeviceCount()
             except ModuleNotFoundError:
                 self._cupy_available = False
                 logging.warning("CUPY module not found. Please install it via Conda or pip.")
@@ -89,24 +137,15 @@ class EnvironmentContext:
                 else:
                     self.context = GPUContext.CUPY
                     self.device = device
-                    import cupyx.scipy as cupyx_scipy
                     #import cudf
                     #import cucim.skimage as skimage
-                    self._xupy = BackendProxy(lambda:cp)
-                    self._scipy = BackendProxy(lambda: cupyx_scipy)
-                    #self._df = BackendProxy(lambda: cudf)
-                    #self._skimage = BackendProxy(lambda: skimage)
+                    self._set_modules(xupy=_cupy, scipy=_cupyx_scipy)
+                    #self._set_modules(df=lambda: cudf, skimage=lambda: skimage)
 
         elif context == GPUContext.NUMPY:
             self.context = GPUContext.NUMPY
             self.device = device
-            import numpy as np
-            import scipy
-            import skimage
-            self._xupy = BackendProxy(lambda: np)
-            self._scipy = BackendProxy(lambda: scipy)
-            self._df = BackendProxy(lambda: pd)
-            self._skimage = BackendProxy(lambda: skimage)
+            self._set_modules(xupy=_numpy, scipy=_scipy, df=_pandas, skimage=_skimage)
 
         else:
             logging.warning("Unknown context. Context unchanged.")
@@ -128,7 +167,7 @@ class EnvironmentContext:
             #import cudf
             pass
 
-        if isinstance(data, pd.DataFrame):
+        if isinstance(data, self.df.DataFrame):
             if context == GPUContext.CUPY:
                 return xp.df.from_pandas(data)
             
@@ -143,53 +182,125 @@ class EnvironmentContext:
             logger.warning(f"Unsupported data conversion. Data is of type {type(data)}. No Change made.")
             return data
         
-    def asarray(self, data, context=None, device=None):
+    def track_transfers(self, strict: bool = False) -> TransferTracker:
+        """
+        Record the conversions made by asarray inside a ``with`` block, see tomobase.registrations.transfers.
+        In strict mode conversions without an explicit context or dtype raise ImplicitConversionError.
+        """
+        return TransferTracker(strict)
+
+    @conversion_helper
+    def asarray(self, data, context=None, device=None, dtype=None):
+        """
+        Convert an array to the given context and dtype, the data is only copied when it has to be.
+        Conversions are recorded while a TransferTracker is active.
 
+        :param data: A numpy or cupy array, or an array-like such as a chunked store
+        :param context: The target context, the current context if None. Passing it marks the conversion as explicit
+        :param device: The target device, the current device if None
+        :param dtype: The target dtype, the dtype is kept if None. Passing it marks the conversion as explicit
+        """
+        explicit = context is not None or dtype is not None
         if context is None:
             context = self.context
         if device is None: #Not used atm but may in future
             device = self.device
 
-        if self._cupy_available:
-            import cupy as cp
+        if not isinstance(data, np.ndarray):
+            # cupy arrays can only exist once cupy has been imported, so it is never imported here
+            cp = sys.modules.get('cupy')
+            if cp is not None and isinstance(data, cp.ndarray):
+                if context == GPUContext.NUMPY:
+                    data = convert('device->host', data.nbytes, explicit, data.get)
+                return self._astype(data, dtype)
 
-        if isinstance(data, np.ndarray):
-            if context == GPUContext.CUPY:
-                return xp.xupy.asarray(data)
-            else:
+            if not hasattr(data, '__array__'):
+                logger.warning(f"Unsupported data conversion. Data is of type {type(data)}. No Change made.")
                 return data
+            # Lazy array-likes such as tomobase.data.chunked.ChunkedArray are read when they are converted
+            source = data
+            data = convert('array-like->host', getattr(source, 'nbytes', 0), explicit, lambda: np.asarray(source))
 
-        elif isinstance(data, cp.ndarray):
-            if context == GPUContext.NUMPY:
-                return data.get()
-            else:
-                return data
-            
-        else:
-            logger.warning(f"Unsupported data conversion. Data is of type {type(data)}. No Change made.")
+        if context == GPUContext.CUPY:
+            import cupy as cp
+            host = data
+            data = convert('host->device', host.nbytes, explicit, lambda: cp.asarray(host))
+        return self._astype(data, dtype)
+
+    @conversion_helper
+    def _astype(self, data, dtype):
+        if dtype is None or data.dtype == np.dtype(dtype):
             return data
-            
-        
+        return convert('dtype', data.nbytes, True, lambda: data.astype(dtype))
+
+
+
+def _numpy():
+    return np
+
+
+def _scipy():
+    import scipy
+    return scipy
+
+
+def _cupy():
+    import cupy
+    return cupy
+
+
+def _cupyx_scipy():
+    import cupyx.scipy
+    return cupyx.scipy
+
+
+def _pandas():
+    import pandas
+    return pandas
+
+
+def _skimage():
+    import skimage
+    return skimage
+
 
 class BackendProxy:
+    # Every proxy, so that set_context can clear the attributes they resolved
+    _proxies = weakref.WeakSet()
+
     def __init__(self, context_getter):
         """
         Initialize the proxy with a function to get the current backend context.
         :param context_getter: A callable that returns the current backend module (e.g., numpy or cupy).
         """
         self._context_getter = context_getter
+        BackendProxy._proxies.add(self)
 
     def __getattr__(self, name):
         """
-        Dynamically resolve attributes or submodules.
+        Dynamically resolve attributes or submodules. The result is stored on the proxy, so later accesses
+        are plain attribute lookups until the context changes.
         """
         backend = self._context_getter()  # Get the current backend (numpy, cupy, scipy, or cupyx)
         attr = getattr(backend, name)  # Get the attribute from the backend
 
         # If the attribute is a module (e.g., scipy.ndimage), wrap it in another BackendProxy
-        if isinstance(attr, type(backend)):
-            return BackendProxy(lambda: getattr(self._context_getter(), name))
+        if isinstance(attr, types.ModuleType):
+            attr = BackendProxy(lambda: getattr(self._context_getter(), name))
 
+        self.__dict__[name] = attr
         return attr
 
+    def _clear(self):
+        for name in [name for name in self.__dict__ if name != '_context_getter']:
+            del self.__dict__[name]
+
+    @classmethod
+    def invalidate(cls):
+        """
+        Forget the resolved attributes of every proxy, used when the context changes.
+        """
+        for proxy in list(cls._proxies):
+            proxy._clear()
+
 xp = EnvironmentContext()
\ No newline at end of file
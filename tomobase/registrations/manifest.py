@@ -0,0 +1,256 @@
+"""
+A manifest of the hooks of a plugin folder, read from the source without importing it.
+
+``ItemDict.update`` used to import every module of a folder and inspect its
+members to find the processes, phantoms and tilt schemes. Instead the
+decorators are now read from the syntax tree of every file, which gives the
+name, category, subcategories and docstring of every hook. The registries are
+populated with :class:`LazyHook` proxies that only import the module when the
+hook is first called or an attribute of the real object is needed.
+
+The manifest is cached as JSON in the user cache directory and rebuilt when a
+file of the folder is added, removed or modified. Modules whose decorators
+cannot be resolved statically, e.g. because a name or category is computed, are
+marked dynamic and are imported and inspected as before.
+"""
+import os
+import ast
+import json
+import inspect
+import importlib
+
+from ..log import logger
+
+# Bump when the layout of a manifest entry changes to invalidate cached manifests
+_VERSION = 1
+
+# The decorators of tomobase.hooks and the attribute they set on the object they register
+_HOOKS = {
+    'tomobase_hook_process': 'is_tomobase_process',
+    'phantom_hook': 'is_tomobase_phantom',
+    'tiltscheme_hook': 'is_tomobase_tiltscheme',
+}
+
+
+class _Dynamic(Exception):
+    pass
+
+
+def _cache_file(module: str, folder: str) -> str:
+    base = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(base, 'tomobase', 'registry', f"{module}.{folder.replace(os.sep, '.')}.json")
+
+
+def _fingerprint(path: str, root: str) -> list:
+    files = []
+    for directory, _, filenames in os.walk(path):
+        for filename in filenames:
+            if filename.endswith('.py'):
+                stat = os.stat(os.path.join(directory, filename))
+                files.append([os.path.relpath(os.path.join(directory, filename), start=root), stat.st_mtime_ns, stat.st_size])
+    return sorted(files)
+
+
+def _literal(node, constants: dict):
+    # A literal, or the name of a module level constant
+    if isinstance(node, ast.Name):
+        if node.id not in constants:
+            raise _Dynamic(node.id)
+        return constants[node.id]
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        raise _Dynamic(ast.dump(node))
+
+
+def _category(node) -> str:
+    # TOMOBASE_TRANSFORM_CATEGORIES.<KEY>.value
+    if (isinstance(node, ast.Attribute) and node.attr == 'value' and isinstance(node.value, ast.Attribute)
+            and isinstance(node.value.value, ast.Name) and node.value.value.id == 'TOMOBASE_TRANSFORM_CATEGORIES'):
+        return node.value.attr
+    raise _Dynamic(ast.dump(node))
+
+
+def _decorator_name(node) -> str | None:
+    if not isinstance(node, ast.Call):
+        return None
+    func = node.func
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    if isinstance(func, ast.Name):
+        return func.id
+    return None
+
+
+def _entry(definition, decorator, hook: str, module: str, constants: dict) -> dict:
+    kwargs = {k.arg: k.value for k in decorator.keywords if k.arg is not None}
+    if any(k.arg is None for k in decorator.keywords):
+        raise _Dynamic('**kwargs')
+    entry = {
+        'module': module,
+        'attribute': definition.name,
+        'hook': _HOOKS[hook],
+        'kind': 'class' if isinstance(definition, ast.ClassDef) else 'function',
+        'doc': ast.get_docstring(definition, clean=False),
+    }
+    name = _literal(decorator.args[0] if decorator.args else kwargs['name'], constants) \
+        if decorator.args or 'name' in kwargs else None
+
+    # The same naming rules as the decorators of tomobase.hooks
+    if hook == 'tomobase_hook_process':
+        if 'category' not in kwargs:
+            raise _Dynamic('category')
+        if name is None or name == definition.name:
+            name = definition.name.replace('_', ' ').title()
+        subcategories = _literal(kwargs['subcategories'], constants) if 'subcategories' in kwargs else []
+        entry['category'] = _category(kwargs['category'])
+        entry['subcategories'] = list(subcategories) + [name]
+    elif hook == 'phantom_hook':
+        if name is None:
+            name = definition.name.replace('_', ' ')
+    elif name is None:
+        raise _Dynamic('name')
+    entry['name'] = name
+    return entry
+
+
+def _scan_file(filename: str, module: str) -> list:
+    with open(filename, 'rb') as f:
+        tree = ast.parse(f.read(), filename=filename)
+
+    constants = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            try:
+                constants[node.targets[0].id] = ast.literal_eval(node.value)
+            except ValueError:
+                pass
+
+    entries = []
+    try:
+        for node in tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+                for decorator in node.decorator_list:
+                    hook = _decorator_name(decorator)
+                    if hook in _HOOKS:
+                        entries.append(_entry(node, decorator, hook, module, constants))
+    except _Dynamic as error:
+        logger.debug(f"The hooks of {module} cannot be read statically ({error}), it is imported to register them")
+        return [{'module': module, 'dynamic': True}]
+    return entries
+
+
+def build_manifest(package: str, folder: str, root: str) -> list:
+    """Read the hooks of every module of a folder from its source.
+
+    Args:
+        package (str): The package the folder belongs to, e.g. 'tomobase'
+        folder (str): The folder of the modules relative to the package, e.g. 'processes'
+        root (str): The directory of the package
+
+    Returns:
+        list[dict]: One entry per hook with the keys module, attribute, hook, kind, name and doc, and for processes category and subcategories. Modules that must be imported have a single entry with dynamic set to True.
+    """
+    entries = []
+    for directory, _, filenames in sorted(os.walk(os.path.join(root, folder))):
+        for filename in sorted(filenames):
+            if filename.endswith('.py'):
+                path = os.path.join(directory, filename)
+                module = package + '.' + os.path.relpath(path, start=root).replace(os.sep, '.')[:-3]
+                try:
+                    entries += _scan_file(path, module)
+                except SyntaxError:
+                    entries.append({'module': module, 'dynamic': True})
+    return entries
+
+
+def load_manifest(package: str, folder: str, root: str) -> list:
+    """Get the manifest of a folder, from the cache if no module has changed since it was built.
+
+    Args:
+        package (str): The package the folder belongs to, e.g. 'tomobase'
+        folder (str): The folder of the modules relative to the package, e.g. 'processes'
+        root (str): The directory of the package
+
+    Returns:
+        list[dict]: The entries, see ``build_manifest``
+    """
+    fingerprint = _fingerprint(os.path.join(root, folder), root)
+    filename = _cache_file(package, folder)
+    try:
+        with open(filename) as f:
+            cached = json.load(f)
+        if cached['version'] == _VERSION and cached['root'] == root and cached['fingerprint'] == fingerprint:
+            return cached['entries']
+    except (OSError, ValueError, KeyError):
+        pass
+
+    entries = build_manifest(package, folder, root)
+    try:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        temporary = f"{filename}.{os.getpid()}.tmp"
+        with open(temporary, 'w') as f:
+            json.dump({'version': _VERSION, 'root': root, 'fingerprint': fingerprint, 'entries': entries}, f)
+        os.replace(temporary, filename)
+    except OSError as error:
+        logger.debug(f"The registry manifest could not be cached: {error}")
+    return entries
+
+
+class LazyHook:
+    """A registered process, phantom or tilt scheme whose module is imported when it is first used.
+
+    The attributes needed to build menus, such as ``tomobase_name``, ``tomobase_category``,
+    ``tomobase_subcategories``, ``__name__`` and ``__doc__``, are read from the manifest. Calling the
+    proxy or accessing any other attribute imports the module and uses the real object.
+
+    Args:
+        entry (dict): The manifest entry of the hook
+    """
+
+    def __init__(self, entry: dict):
+        self._entry = entry
+        self._object = None
+        self.__name__ = entry['attribute']
+        self.__qualname__ = entry['attribute']
+        self.__module__ = entry['module']
+        self.__doc__ = entry.get('doc')
+        self.tomobase_name = entry['name']
+        setattr(self, entry['hook'], True)
+        if 'subcategories' in entry:
+            self.tomobase_subcategories = list(entry['subcategories'])
+
+    @property
+    def tomobase_category(self):
+        # Only processes have a category, like the objects registered by the other hooks
+        if 'category' not in self._entry:
+            raise AttributeError('tomobase_category')
+        from .transforms import TOMOBASE_TRANSFORM_CATEGORIES
+        return TOMOBASE_TRANSFORM_CATEGORIES[self._entry['category']].value
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the module of the hook has been imported"""
+        return self._object is not None
+
+    def load(self):
+        """Import the module and get the real object"""
+        if self._object is None:
+            module = importlib.import_module(self._entry['module'])
+            self._object = getattr(module, self._entry['attribute'])
+        return self._object
+
+    @property
+    def __signature__(self):
+        return inspect.signature(self.load())
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith('__') or name in ('_entry', '_object'):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __repr__(self):
+        return f"<lazy {self._entry['kind']} {self._entry['module']}.{self._entry['attribute']}>"
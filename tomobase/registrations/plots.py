@@ -82,12 +82,12 @@ class PlotHandler(ItemDict, QObject):
 
     def add_subsignal(self, signal, subsignal):
         signal = signal.upper().replace(' ', '_')
-        if signal not in self._dict:
+        if signal not in self:
             self.add_signal(signal)
 
-        if subsignal not in self._dict:
+        subsignal_key = subsignal.upper().replace(' ', '_')
+        if subsignal not in self:
             self[subsignal] = ProgressBar()
-            subsignal_key = subsignal.upper().replace(' ', '_')
             self.added_subsignal.emit(signal, subsignal)
         return self[subsignal_key].value
 
@@ -95,7 +95,7 @@ class PlotHandler(ItemDict, QObject):
         signal = signal.upper().replace(' ', '_')
         if signal in self._dict:
             self[signal].value.finish()
-            del self._dict[signal]
+            del self[signal]
             self.removed.emit(signal)
 
 plottinghandler = PlotHandler()
\ No newline at end of file
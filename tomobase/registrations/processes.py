@@ -21,7 +21,7 @@ class ProcessItemDict(ItemDict):
                 if key not in self._dict:
                     self[key] = ItemDictNonSingleton()
                 self[key][obj.tomobase_name] = obj
-                TOMOBASE_TRANSFORM_CATEGORIES[key].build_heierarchy(obj.tomobase_subcategories)
+                TOMOBASE_TRANSFORM_CATEGORIES[key].build_heierarchy(list(obj.tomobase_subcategories))
 
     def help(self):
         msg = "\nAvailable processes:\n"
@@ -87,9 +87,9 @@ class ProgressHandler(ItemDict, QObject):
             subsignal = coolname.generate_slug(2)
 
         signal_key = signal.upper().replace(' ', '_')
-        if subsignal not in self._dict:
+        subsignal_key = subsignal.upper().replace(' ', '_')
+        if subsignal not in self:
             self[subsignal] = ProgressBar()
-            subsignal_key = subsignal.upper().replace(' ', '_')
             if self[signal_key].value.inheritor is None:
                 self[subsignal_key].value.inheritor = signal
             else:
@@ -101,7 +101,7 @@ class ProgressHandler(ItemDict, QObject):
         signal = item.name.upper().replace(' ', '_')
         if signal in self._dict:
             self[signal].value.finish()
-            del self._dict[signal]
+            del self[signal]
             self.removed.emit(signal)
 
 progresshandler = ProgressHandler()  
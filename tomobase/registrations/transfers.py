@@ -0,0 +1,115 @@
+"""
+Accounting of array conversions made by ``xp.asarray``.
+
+Conversions between backends (host to device and back), reads of lazy
+array-likes such as chunked stores, and dtype changes all copy the data.
+While a :class:`TransferTracker` is active, every conversion is recorded with
+its kind, size, duration and the call site that requested it. In strict mode,
+conversions that were not explicitly requested raise
+:class:`ImplicitConversionError`. Explicit means that the caller passed a
+context or dtype. Implicit means that the conversion followed from the global
+context.
+
+Example:
+
+    with xp.track_transfers() as transfers:
+        volume = astra_reconstruct(sino)
+    print(transfers.summary())
+"""
+import os
+import sys
+import time
+
+_trackers = []
+# Code objects of functions that convert on behalf of their caller, the call site is the frame that called them
+_helpers = set()
+
+
+class ImplicitConversionError(RuntimeError):
+    """Raised in strict mode when an array is converted without an explicit context or dtype"""
+
+
+def conversion_helper(func):
+    """Mark a function that calls ``xp.asarray`` on behalf of its caller, such as ``Data._set_context``.
+    Conversions are attributed to the caller of the function instead."""
+    _helpers.add(func.__code__)
+    return func
+
+
+def _call_site() -> str:
+    frame = sys._getframe(1)
+    here = __file__
+    while frame is not None and (frame.f_code in _helpers or frame.f_code.co_filename == here):
+        frame = frame.f_back
+    if frame is None:
+        return '<unknown>'
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno} ({frame.f_code.co_name})"
+
+
+class TransferTracker:
+    """Records every conversion made by ``xp.asarray`` while it is active.
+
+    Args:
+        strict (bool): Raise ImplicitConversionError on conversions without an explicit context or dtype (default: False)
+
+    Attributes:
+        records (list[dict]): One entry per conversion with the keys site, kind, nbytes, time and explicit
+    """
+
+    def __init__(self, strict: bool = False):
+        self.strict = strict
+        self.records = []
+
+    def __enter__(self):
+        _trackers.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        _trackers.remove(self)
+        return False
+
+    @property
+    def nbytes(self) -> int:
+        """The total number of bytes converted"""
+        return sum(record['nbytes'] for record in self.records)
+
+    def to_dataframe(self):
+        """Get the conversions as a DataFrame with one row per conversion"""
+        import pandas as pd
+        return pd.DataFrame(self.records, columns=['site', 'kind', 'nbytes', 'time', 'explicit'])
+
+    def summary(self):
+        """Get the number of conversions, bytes and time per call site and kind, largest first"""
+        df = self.to_dataframe()
+        summary = df.groupby(['site', 'kind']).agg(count=('nbytes', 'size'), nbytes=('nbytes', 'sum'), time=('time', 'sum'))
+        return summary.sort_values('nbytes', ascending=False)
+
+    def clear(self):
+        """Forget all records"""
+        self.records = []
+
+
+def convert(kind: str, nbytes: int, explicit: bool, conversion):
+    """Run a conversion, recording it for every active tracker.
+
+    Args:
+        kind (str): The kind of conversion, e.g. 'host->device', 'device->host', 'array-like->host' or 'dtype'
+        nbytes (int): The number of bytes of the source array
+        explicit (bool): Whether the caller requested the conversion explicitly
+        conversion (Callable): Performs the conversion and returns the result
+
+    Returns:
+        The result of the conversion
+    """
+    if not _trackers:
+        return conversion()
+    site = _call_site()
+    if not explicit and any(tracker.strict for tracker in _trackers):
+        raise ImplicitConversionError(f"Implicit {kind} conversion of {nbytes} bytes at {site}. "
+                                      f"Pass the context or dtype to xp.asarray to make it explicit.")
+    start = time.perf_counter()
+    result = conversion()
+    record = {'site': site, 'kind': kind, 'nbytes': int(nbytes), 'time': time.perf_counter() - start, 'explicit': explicit}
+    for tracker in _trackers:
+        tracker.records.append(record)
+    return result
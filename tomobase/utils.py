@@ -1,5 +1,10 @@
-import astra
 import numpy as np
+import contextlib
+from collections import OrderedDict, Counter
+
+from .lazy import lazy_import
+
+astra = lazy_import('astra')
 
 
 def _circle_mask(n):
@@ -26,3 +31,32 @@ def _create_projector(x, y, angles, use_gpu):
         proj_id = astra.creators.create_projector('linear', proj_geom, vol_geom)
     return proj_id
 
+
+
+
+_projectors = OrderedDict()
+# The number of callers using each cached projector, projectors in use are never deleted
+_in_use = Counter()
+
+@contextlib.contextmanager
+def _get_projector(x, y, angles, use_gpu, maxsize=8):
+    # Projectors are cached by geometry, the least recently used one that is not in use is deleted once more
+    # than maxsize are alive
+    key = (x, y, np.asarray(angles, dtype=float).tobytes(), use_gpu)
+    if key in _projectors:
+        _projectors.move_to_end(key)
+    else:
+        _projectors[key] = _create_projector(x, y, np.asarray(angles, dtype=float), use_gpu)
+    _in_use[key] += 1
+    try:
+        yield _projectors[key]
+    finally:
+        _in_use[key] -= 1
+        if _in_use[key] == 0:
+            del _in_use[key]
+        _evict_projectors(maxsize)
+
+
+def _evict_projectors(maxsize):
+    for key in [key for key in _projectors if key not in _in_use][:max(0, len(_projectors) - maxsize)]:
+        astra.astra.delete(_projectors.pop(key))